@@ -1,92 +1,1128 @@
 
 
+import warnings
 import numpy as np
 import matplotlib.pyplot as plt
 import scipy.sparse as sp
-from scipy.sparse.linalg import eigsh, cg
-from scipy.linalg import eig
-#from sksparse.cholmod import cholesky
+from scipy.sparse.linalg import eigsh, cg, splu, lobpcg, LinearOperator
+from scipy.signal import lfilter, lfiltic
+from scipy.sparse.csgraph import reverse_cuthill_mckee, connected_components, shortest_path
+from scipy.linalg import eig, eigh, ldl, cho_factor, cho_solve, lu_factor, lu_solve, cholesky_banded, cho_solve_banded
 
 class Computer():
     """
     This class is used for combining common computers on different class into gloabl computer
     """
 
-    def StiffnessMatrixAssembler(UnConstrainedDoF,Members,StiffnessMatrixType, NormalForce = None):
-        
-        unconstrained_dofs = UnConstrainedDoF
-        num_dofs = len(unconstrained_dofs)
-        NoMembers = len(Members)
+    def StiffnessMatrixAssembler(UnConstrainedDoF,Members,StiffnessMatrixType, NormalForce = None, Sparse = False, MemberIndex = None, Pattern = None):
+        """
+        Assembles the global matrix of StiffnessMatrixType over the DoFs in UnConstrainedDoF.
+        MemberIndex is the optional precomputed (M, 6) equation number array of the members (-1 for DoFs
+        which are not assembled, see Model.MemberEquationIndex); it is rebuilt from the DoF numbers if not given.
+        With a Pattern from SymbolicAssembly only the numeric step is done.
+        """
         
-        # Create a DoF mapping for quick lookup
-        dof_index = {dof: i for i, dof in enumerate(unconstrained_dofs)}
+        if Pattern is not None:
+            return Computer.NumericAssembly(Pattern, Computer.ElementMatrixTensor(Members, StiffnessMatrixType, NormalForce), Sparse = Sparse)
+
+        if Sparse == True:
+            return Computer.SparseStiffnessMatrixAssembler(UnConstrainedDoF, Members, StiffnessMatrixType, NormalForce, MemberIndex = MemberIndex)
+
+        num_dofs = len(UnConstrainedDoF)
         
         # Initialize stiffness matrix as a NumPy array
         C1 = np.zeros((num_dofs, num_dofs))
+        if len(Members) == 0:
+            return C1
         
-        # Precompute Second Order Global Stiffness Matrices for all members
-        if(NormalForce == None):        
-            member_matrices = [
-            np.array(getattr(Members[mn],StiffnessMatrixType)())
-            for mn in range(NoMembers)
-            ]
-        else:
-            member_matrices = [
-            np.array(getattr(Members[mn],StiffnessMatrixType)(NormalForce[mn]))
-            for mn in range(NoMembers)
-            ]
-
-        # Loop efficiently over members and DoFs
-        for mn in range(NoMembers):
-            member = Members[mn]
-            dof_numbers = member.DoFNumber()
-            K_local = member_matrices[mn]
-
-            for mc in range(6):
-                if dof_numbers[mc] in dof_index:
-                    row = dof_index[dof_numbers[mc]]
-                    for mr in range(6):
-                        if dof_numbers[mr] in dof_index:
-                            col = dof_index[dof_numbers[mr]]
-                            C1[row, col] += K_local[mc, mr]
+        # Precompute Global Matrices for all members in one batched call
+        member_matrices = Computer.ElementMatrixTensor(Members, StiffnessMatrixType, NormalForce)
+        rows, cols, values = Computer.AssemblyTriplets(UnConstrainedDoF, Members, member_matrices, MemberIndex)
+
+        # Scatter all member entries at once, repeated (row, col) pairs are summed
+        np.add.at(C1, (rows, cols), values)
 
         return C1
+
+    def MemberEquationIndex(UnConstrainedDoF, Members):
+        """ (M, 6) equation numbers of the member DoFs in UnConstrainedDoF, -1 for DoFs which are not assembled """
+        member_dofs = np.array([member.DoFNumber() for member in Members], dtype=int).reshape(-1, 6)
+        unconstrained_dofs = np.asarray(UnConstrainedDoF, dtype=int)
+        lookup_size = max(member_dofs.max(initial=0), unconstrained_dofs.max(initial=0)) + 1
+        dof_index = np.full(lookup_size, -1, dtype=int)
+        dof_index[unconstrained_dofs] = np.arange(len(unconstrained_dofs))
+        return dof_index[member_dofs]
+
+    def AssemblyTriplets(UnConstrainedDoF, Members, member_matrices, MemberIndex = None):
+        """ Row, column and value arrays of all (M, 6, 6) member entries which fall on assembled DoFs """
+        if MemberIndex is None:
+            MemberIndex = Computer.MemberEquationIndex(UnConstrainedDoF, Members)
+        NoMembers = len(MemberIndex)
+
+        # Entry (mc, mr) of a member matrix goes to (MemberIndex[mc], MemberIndex[mr])
+        rows = np.repeat(MemberIndex, 6, axis=1)
+        cols = np.tile(MemberIndex, (1, 6))
+        values = member_matrices.reshape(NoMembers, 36)
+        mask = (rows >= 0) & (cols >= 0)
+        return rows[mask], cols[mask], values[mask]
+
+    def SparseStiffnessMatrixAssembler(UnConstrainedDoF, Members, StiffnessMatrixType, NormalForce = None, Format = "csr", MemberIndex = None):
+        """
+        Assembles the global matrix as a scipy.sparse matrix. Row, column and value triplets of all
+        members are built in one vectorized pass and duplicates are summed by the COO -> CSR/CSC conversion.
+        DoFs which are not in UnConstrainedDoF are dropped, exactly as in the dense StiffnessMatrixAssembler.
+        """
+        num_dofs = len(UnConstrainedDoF)
+        NoMembers = len(Members)
+
+        if NoMembers == 0:
+            return sp.csr_matrix((num_dofs, num_dofs)) if Format == "csr" else sp.csc_matrix((num_dofs, num_dofs))
+
+        # Stacked member matrices (M, 6, 6) scattered on their equation numbers
+        member_matrices = Computer.ElementMatrixTensor(Members, StiffnessMatrixType, NormalForce)
+        rows, cols, values = Computer.AssemblyTriplets(UnConstrainedDoF, Members, member_matrices, MemberIndex)
+
+        C1 = sp.coo_matrix((values, (rows, cols)), shape=(num_dofs, num_dofs))
+        if Format == "csc":
+            return C1.tocsc()
+        return C1.tocsr()
    
+    def SymbolicAssembly(UnConstrainedDoF, Members, MemberIndex = None):
+        """
+        Symbolic assembly step: the CSR pattern (indptr, indices) of the global matrix over UnConstrainedDoF and
+        the scatter map from the stacked (M, 36) element entries to the nnz slots (-1 for dropped entries).
+        The pattern only depends on the DoF connectivity, so it is shared by stiffness, geometric and mass matrices.
+        """
+        num_dofs = len(UnConstrainedDoF)
+        if MemberIndex is None:
+            MemberIndex = Computer.MemberEquationIndex(UnConstrainedDoF, Members)
+        MemberIndex = np.asarray(MemberIndex, dtype=int).reshape(-1, 6)
+        NoMembers = len(MemberIndex)
+
+        rows = np.repeat(MemberIndex, 6, axis=1)
+        cols = np.tile(MemberIndex, (1, 6))
+        mask = (rows >= 0) & (cols >= 0)
+
+        # the sorted unique (row, col) keys are the CSR order, the inverse index is the slot of every entry
+        keys, slots = np.unique(rows[mask].astype(np.int64) * num_dofs + cols[mask], return_inverse = True)
+        Scatter = np.full((NoMembers, 36), -1, dtype=int)
+        Scatter[mask] = slots
+
+        return {"shape": (num_dofs, num_dofs),
+                "indptr": np.searchsorted(keys // max(num_dofs, 1), np.arange(num_dofs + 1)),
+                "indices": keys % max(num_dofs, 1),
+                "nnz": len(keys),
+                "Scatter": Scatter,
+                "Mask": mask,
+                "Slots": slots,
+                "Members": np.repeat(np.arange(NoMembers), 36).reshape(NoMembers, 36)[mask]}
+
+    def NumericAssembly(Pattern, member_matrices, Sparse = True):
+        """ Numeric assembly step: sums the (M, 6, 6) element matrices into the nnz slots of Pattern """
+        values = np.asarray(member_matrices, dtype=float).reshape(-1, 36)[Pattern["Mask"]]
+        data = np.bincount(Pattern["Slots"], weights = values, minlength = Pattern["nnz"])
+        C1 = sp.csr_matrix((data, Pattern["indices"], Pattern["indptr"]), shape = Pattern["shape"])
+        if Sparse == True:
+            return C1
+        return C1.toarray()
+
+    def SecondOrderStiffnessOperator(UnConstrainedDoF, Members, MemberIndex = None, Pattern = None):
+        """
+        Precomputes the linear part of K(N) = K0 + sum(N_i * G_i) once. K0 (first order stiffness) and the
+        unit geometric matrices G_i of all members are scattered on one fixed CSR pattern, so that a new set
+        of normal forces only changes the data array: data = K0 + B @ N with B the (nnz, M) sparse map.
+        Returns a dict with shape, indptr, indices, K0 (data of K0) and B.
+        """
+        if Pattern is None:
+            Pattern = Computer.SymbolicAssembly(UnConstrainedDoF, Members, MemberIndex)
+        K0_values = Computer.ElementMatrixTensor(Members, "First_Order_Global_Stiffness_Matrix_1").reshape(-1, 36)[Pattern["Mask"]]
+        G_values = Computer.ElementMatrixTensor(Members, "Second_Order_Global_Reduction_Matrix_1").reshape(-1, 36)[Pattern["Mask"]]
+
+        return {"shape": Pattern["shape"],
+                "indptr": Pattern["indptr"],
+                "indices": Pattern["indices"],
+                "K0": np.bincount(Pattern["Slots"], weights = K0_values, minlength = Pattern["nnz"]),
+                "B": sp.csr_matrix((G_values, (Pattern["Slots"], Pattern["Members"])), shape = (Pattern["nnz"], len(Members)))}
+
+    def SecondOrderStiffnessMatrix(Operator, NormalForce = None, Linear = True, Sparse = False):
+        """
+        K0 + sum(N_i * G_i) from a SecondOrderStiffnessOperator by one update of the data array.
+        Linear = False leaves K0 out and gives the geometric (reduction) matrix sum(N_i * G_i).
+        """
+        data = np.zeros(len(Operator["indices"]))
+        if Linear:
+            data = data + Operator["K0"]
+        if NormalForce is not None:
+            data = data + Operator["B"] @ np.asarray(NormalForce, dtype=float)
+        C1 = sp.csr_matrix((data, Operator["indices"], Operator["indptr"]), shape = Operator["shape"])
+        if Sparse == True:
+            return C1
+        return C1.toarray()
+
+    def MemberPropertyArrays(Members):
+        """
+        Collects the member properties needed by the batched element kernels as arrays of length M.
+        Returns a dict with EA, EI, L, cos, sin and mu (mass per unit length).
+        """
+        xi = np.array([member.Start_Node.xcoordinate for member in Members], dtype=float)
+        yi = np.array([member.Start_Node.ycoordinate for member in Members], dtype=float)
+        xj = np.array([member.End_Node.xcoordinate for member in Members], dtype=float)
+        yj = np.array([member.End_Node.ycoordinate for member in Members], dtype=float)
+        A = np.array([member.area for member in Members], dtype=float)
+        E = np.array([member.youngs_modulus for member in Members], dtype=float)
+        I = np.array([member.moment_of_inertia for member in Members], dtype=float)
+        rho = np.array([member.Density for member in Members], dtype=float)
+
+        L = np.hypot(xj - xi, yj - yi)
+        return {"EA": E * A, "EI": E * I, "L": L,
+                "cos": (xj - xi) / L, "sin": (yj - yi) / L,
+                "mu": A * rho}
+
+    def TransformationTensor(cos, sin):
+        """ Stacked Member.Transformation_Matrix for all members, shape (M, 6, 6) """
+        cos = np.asarray(cos, dtype=float)
+        sin = np.asarray(sin, dtype=float)
+        T = np.zeros((len(cos), 6, 6))
+        for a in (0, 3):
+            T[:, a, a] = cos
+            T[:, a, a+1] = sin
+            T[:, a+1, a] = -sin
+            T[:, a+1, a+1] = cos
+        T[:, 2, 2] = 1
+        T[:, 5, 5] = 1
+        return T
+
+    def LocalStiffnessTensor(EA, EI, L):
+        """ Stacked Member.First_Order_Local_Stiffness_Matrix_1 (NPTEL) for all members, shape (M, 6, 6) """
+        EA = np.asarray(EA, dtype=float)
+        EI = np.asarray(EI, dtype=float)
+        L = np.asarray(L, dtype=float)
+        return Computer.LocalStiffnessPattern(EA / L, 12 * EI / L**3, 6 * EI / L**2, 4 * EI / L, 2 * EI / L)
+
+    def LocalStiffnessLengthDerivative(EA, EI, L):
+        """ Derivative of LocalStiffnessTensor with respect to the member lengths, shape (M, 6, 6) """
+        EA = np.asarray(EA, dtype=float)
+        EI = np.asarray(EI, dtype=float)
+        L = np.asarray(L, dtype=float)
+        return Computer.LocalStiffnessPattern(-EA / L**2, -36 * EI / L**4, -12 * EI / L**3, -4 * EI / L**2, -2 * EI / L**2)
+
+    def LocalStiffnessPattern(ma11, ma22, ma23, ma33, ma36):
+        """ (M, 6, 6) matrices with the sign and position pattern of the NPTEL local stiffness matrix """
+        K = np.zeros((len(ma11), 6, 6))
+        K[:, 0, 0] = K[:, 3, 3] = ma11
+        K[:, 0, 3] = K[:, 3, 0] = -ma11
+        K[:, 1, 1] = K[:, 4, 4] = ma22
+        K[:, 1, 4] = K[:, 4, 1] = -ma22
+        K[:, 1, 2] = K[:, 2, 1] = K[:, 1, 5] = K[:, 5, 1] = ma23
+        K[:, 2, 4] = K[:, 4, 2] = K[:, 4, 5] = K[:, 5, 4] = -ma23
+        K[:, 2, 2] = K[:, 5, 5] = ma33
+        K[:, 2, 5] = K[:, 5, 2] = ma36
+        return K
+
+    def LocalGeometricTensor(L, NormalForce = None):
+        """
+        Stacked Member.Second_Order_Reduction_Matrix_1 (McGuire & Gallagher) for all members, shape (M, 6, 6).
+        Without NormalForce the unit (N = 1) matrices are returned.
+        """
+        L = np.asarray(L, dtype=float)
+        G = np.zeros((len(L), 6, 6))
+        G[:, 0, 0] = G[:, 3, 3] = 1 / L
+        G[:, 0, 3] = G[:, 3, 0] = -1 / L
+        G[:, 1, 1] = G[:, 4, 4] = 6 / 5 / L
+        G[:, 1, 4] = G[:, 4, 1] = -6 / 5 / L
+        G[:, 1, 2] = G[:, 2, 1] = G[:, 1, 5] = G[:, 5, 1] = 1 / 10
+        G[:, 2, 4] = G[:, 4, 2] = G[:, 4, 5] = G[:, 5, 4] = -1 / 10
+        G[:, 2, 2] = G[:, 5, 5] = 2 / 15 * L
+        G[:, 2, 5] = G[:, 5, 2] = -1 / 30 * L
+        if NormalForce is not None:
+            G = G * np.asarray(NormalForce, dtype=float)[:, None, None]
+        return G
+
+    def StabilityFunctions(NormalForce, EI, L):
+        """
+        Exact stability functions (phi1, phi2, phi3, phi4) of the beam-column with the axial force N (tension
+        positive), which scale 12EI/L^3, 6EI/L^2, 4EI/L and 2EI/L of the bending stiffness. With x = -N L^2 / EI
+        the compression branch uses u = sqrt(x) in trigonometric, the tension branch in hyperbolic form and
+        |x| < 1 the series in x, where the closed forms lose their digits. All are 1 for N = 0.
+        """
+        N = np.asarray(NormalForce, dtype=float)
+        x = -N * np.asarray(L, dtype=float)**2 / np.asarray(EI, dtype=float)
+        u = np.sqrt(np.abs(x))
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            D = 2 - 2 * np.cos(u) - u * np.sin(u)
+            phi3 = np.where(x > 0, u * (np.sin(u) - u * np.cos(u)) / (4 * D), 0.0)
+            phi4 = np.where(x > 0, u * (u - np.sin(u)) / (2 * D), 0.0)
+            # hyperbolic forms divided by cosh(u), which stay finite for large tension
+            t, sech = np.tanh(u), 1 / np.cosh(u)
+            D = 2 * sech - 2 + u * t
+            phi3 = np.where(x < 0, u * (u - t) / (4 * D), phi3)
+            phi4 = np.where(x < 0, u * (t - u * sech) / (2 * D), phi4)
+        Small = np.abs(x) < 1
+        phi3 = np.where(Small, 1 - x / 30 - 11 * x**2 / 25200 - x**3 / 108000 - 509 * x**4 / 2328480000 - 14617 * x**5 / 2724321600000, phi3)
+        phi4 = np.where(Small, 1 + x / 60 + 13 * x**2 / 25200 + 11 * x**3 / 756000 + 907 * x**4 / 2328480000 + 27641 * x**5 / 2724321600000, phi4)
+        phi2 = (2 * phi3 + phi4) / 3
+        phi1 = phi2 - x / 12
+        return phi1, phi2, phi3, phi4
+
+    def LocalStabilityTensor(EA, EI, L, NormalForce = None):
+        """
+        Stacked Member.Second_Order_Local_Stiffness_Matrix_3 (exact stability functions) for all members,
+        shape (M, 6, 6). Tends to the McGuire & Gallagher matrix K + N G for small N.
+        """
+        EA = np.asarray(EA, dtype=float)
+        EI = np.asarray(EI, dtype=float)
+        L = np.asarray(L, dtype=float)
+        N = np.zeros_like(L) if NormalForce is None else np.asarray(NormalForce, dtype=float)
+        phi1, phi2, phi3, phi4 = Computer.StabilityFunctions(N, EI, L)
+        return Computer.LocalStiffnessPattern((EA + N) / L, 12 * EI / L**3 * phi1, 6 * EI / L**2 * phi2, 4 * EI / L * phi3, 2 * EI / L * phi4)
+
+    def ClampedBucklingCount(NormalForce, EI, L):
+        """
+        Number of buckling loads of every member with both ends clamped below the axial force N (compression
+        negative), the J0 term of the Wittrick-Williams count. The clamped loads are the roots of
+        sin(u/2) = 0 and tan(u/2) = u/2 with u = sqrt(-N L^2 / EI).
+        """
+        x = -np.asarray(NormalForce, dtype=float) * np.asarray(L, dtype=float)**2 / np.asarray(EI, dtype=float)
+        v = np.sqrt(np.clip(x, 0, None)) / 2
+        Symmetric = np.ceil(v / np.pi) - 1
+        # one root of tan(v) = v in every (k pi, k pi + pi/2), k >= 1
+        k = np.floor(v / np.pi)
+        Passed = ((v - k * np.pi) >= np.pi / 2) | (np.tan(v) > v)
+        AntiSymmetric = np.where(k >= 1, k - 1 + Passed, 0)
+        return np.where(x > 0, np.clip(Symmetric, 0, None) + AntiSymmetric, 0).astype(int)
+
+    def TransformationDerivativeTensor():
+        """ Derivatives (dT/dcos, dT/dsin) of the 6 x 6 transformation matrix, both constant """
+        dTdc = np.zeros((6, 6))
+        dTds = np.zeros((6, 6))
+        for a in (0, 3):
+            dTdc[a, a] = dTdc[a + 1, a + 1] = 1
+            dTds[a, a + 1] = 1
+            dTds[a + 1, a] = -1
+        return dTdc, dTds
+
+    def GeometryDerivativeArrays(cos, sin, L):
+        """
+        Derivatives of member length and direction cosines with respect to the end node coordinates
+        [x_start, y_start, x_end, y_end]. Returns (dL, dcos, dsin), each of shape (M, 4).
+        """
+        c = np.asarray(cos, dtype=float)
+        s = np.asarray(sin, dtype=float)
+        L = np.asarray(L, dtype=float)
+        dL = np.column_stack([-c, -s, c, s])
+        dcos = np.column_stack([-s**2, c * s, s**2, -c * s]) / L[:, None]
+        dsin = np.column_stack([c * s, -c**2, -c * s, c**2]) / L[:, None]
+        return dL, dcos, dsin
+
+    def LocalMassTensor(mu, L):
+        """ Stacked Member.Local_Mass_Matrix (consistent mass) for all members, shape (M, 6, 6) """
+        mu = np.asarray(mu, dtype=float)
+        L = np.asarray(L, dtype=float)
+        m = mu * L / 420
+        M = np.zeros((len(L), 6, 6))
+        M[:, 0, 0] = M[:, 3, 3] = 140 * m
+        M[:, 0, 3] = M[:, 3, 0] = 70 * m
+        M[:, 1, 1] = M[:, 4, 4] = 156 * m
+        M[:, 1, 4] = M[:, 4, 1] = 54 * m
+        M[:, 1, 2] = M[:, 2, 1] = 22 * m * L
+        M[:, 4, 5] = M[:, 5, 4] = -22 * m * L
+        M[:, 1, 5] = M[:, 5, 1] = -13 * m * L
+        M[:, 2, 4] = M[:, 4, 2] = 13 * m * L
+        M[:, 2, 2] = M[:, 5, 5] = 4 * m * L**2
+        M[:, 2, 5] = M[:, 5, 2] = -3 * m * L**2
+        return M
+
+    def LocalToGlobalTensor(LocalTensor, TransformationTensor):
+        """ Tᵀ k T for all members at once, shape (M, 6, 6) """
+        return np.einsum("mji,mjk,mkl->mil", TransformationTensor, LocalTensor, TransformationTensor, optimize=True)
+
+    def ElementMatrixTensor(Members, StiffnessMatrixType, NormalForce = None):
+        """
+        Returns the member matrices named by StiffnessMatrixType (a Member method name) for all members
+        as one (M, 6, 6) array. The NPTEL stiffness, McGuire geometric and consistent mass matrices are
+        computed by the batched kernels above, any other matrix type falls back to the Member method.
+        """
+        if len(Members) == 0:
+            return np.zeros((0, 6, 6))
+
+        if NormalForce is not None:
+            NormalForce = np.asarray(NormalForce, dtype=float)
+
+        Prop = Computer.MemberPropertyArrays(Members)
+        Global = "_Global_" in StiffnessMatrixType or StiffnessMatrixType.startswith("Global_")
+        Name = StiffnessMatrixType.replace("Global", "Local")
+
+        if Name == "First_Order_Local_Stiffness_Matrix_1":
+            LocalTensor = Computer.LocalStiffnessTensor(Prop["EA"], Prop["EI"], Prop["L"])
+        elif Name == "Second_Order_Local_Reduction_Matrix_1" or Name == "Second_Order_Reduction_Matrix_1":
+            LocalTensor = Computer.LocalGeometricTensor(Prop["L"], NormalForce)
+        elif Name == "Second_Order_Local_Stiffness_Matrix_1":
+            LocalTensor = (Computer.LocalStiffnessTensor(Prop["EA"], Prop["EI"], Prop["L"])
+                           + Computer.LocalGeometricTensor(Prop["L"], NormalForce))
+        elif Name == "Second_Order_Local_Stiffness_Matrix_3":
+            LocalTensor = Computer.LocalStabilityTensor(Prop["EA"], Prop["EI"], Prop["L"], NormalForce)
+        elif Name == "Second_Order_Local_Reduction_Matrix_3" or Name == "Second_Order_Reduction_Matrix_3":
+            LocalTensor = (Computer.LocalStabilityTensor(Prop["EA"], Prop["EI"], Prop["L"], NormalForce)
+                           - Computer.LocalStiffnessTensor(Prop["EA"], Prop["EI"], Prop["L"]))
+        elif Name == "Local_Mass_Matrix":
+            LocalTensor = Computer.LocalMassTensor(Prop["mu"], Prop["L"])
+        else:
+            if NormalForce is None:
+                return np.array([getattr(member, StiffnessMatrixType)() for member in Members], dtype=float)
+            return np.array([getattr(member, StiffnessMatrixType)(NormalForce[mn]) for mn, member in enumerate(Members)], dtype=float)
+
+        if Global:
+            return Computer.LocalToGlobalTensor(LocalTensor, Computer.TransformationTensor(Prop["cos"], Prop["sin"]))
+        return LocalTensor
+
+    def StiffnessDerivativeTensor(Members, SensitivityType):
+        """
+        Analytic derivative of the local NPTEL stiffness matrices of all members, shape (M, 6, 6), with
+        respect to the area ("Axial"), moment of inertia ("Bending") or Young's modulus ("Material").
+        The local matrix is linear in EA and EI, so every derivative is the kernel with unit factors.
+        """
+        Prop = Computer.MemberPropertyArrays(Members)
+        E = np.array([member.youngs_modulus for member in Members], dtype=float)
+        if SensitivityType == "Axial":
+            return Computer.LocalStiffnessTensor(E, np.zeros_like(E), Prop["L"])
+        if SensitivityType == "Bending":
+            return Computer.LocalStiffnessTensor(np.zeros_like(E), E, Prop["L"])
+        if SensitivityType == "Material":
+            return Computer.LocalStiffnessTensor(Prop["EA"] / E, Prop["EI"] / E, Prop["L"])
+        raise ValueError(f"Unsupported SensitivityType: '{SensitivityType}'. Use 'Axial', 'Bending' or 'Material'.")
+
+    def MassDerivativeTensor(Members, SensitivityType, MassType = "Consistent"):
+        """
+        Derivative of the local consistent or lumped mass matrices of all members, shape (M, 6, 6). Only
+        the area ("Axial") changes the mass, the moment of inertia and Young's modulus do not.
+        """
+        Prop = Computer.MemberPropertyArrays(Members)
+        if SensitivityType not in ("Axial", "Bending", "Material"):
+            raise ValueError(f"Unsupported SensitivityType: '{SensitivityType}'. Use 'Axial', 'Bending' or 'Material'.")
+        if SensitivityType != "Axial":
+            return np.zeros((len(Members), 6, 6))
+        rho = np.array([member.Density for member in Members], dtype=float)
+        if MassType == "Lumped":
+            Lumped = np.zeros((len(Members), 6, 6))
+            for i in (0, 1, 3, 4):
+                Lumped[:, i, i] = rho * Prop["L"] / 2
+            return Lumped
+        return Computer.LocalMassTensor(rho, Prop["L"])
+
+    def MemberEnergyDerivative(Members, DerivativeTensor, MemberDisplacementA, MemberDisplacementB = None):
+        """
+        a_eᵀ (∂k_e/∂p) b_e of every member from the (M, 6) global end displacements a and b (b = a by
+        default) and the (M, 6, 6) local matrix derivatives, in one contraction over all members.
+        """
+        Prop = Computer.MemberPropertyArrays(Members)
+        T = Computer.TransformationTensor(Prop["cos"], Prop["sin"])
+        LocalA = np.einsum("mij,mj->mi", T, MemberDisplacementA)
+        LocalB = LocalA if MemberDisplacementB is None else np.einsum("mij,mj->mi", T, MemberDisplacementB)
+        return np.einsum("mi,mij,mj->m", LocalA, DerivativeTensor, LocalB)
+
+    def ChainCondensation(ElementMatrices):
+        """
+        Static condensation of G chains of n elements each, (G, n, 6, 6) global element matrices ordered
+        and oriented along the chains, onto the two chain end nodes. The interior nodes are eliminated
+        element by element: the superelement of the first j elements is joined with element j + 1 and
+        their common node is condensed, for all G chains at once with batched 3 x 3 solves.
+        Returns a dict with the (G, 6, 6) superelement Stiffness and the per step recovery data Steps,
+        a list of (K_mm^-1 (G, 3, 3), K_bm (G, 6, 3), K_mm^-1 K_mb (G, 3, 6)) in elimination order.
+        """
+        ElementMatrices = np.asarray(ElementMatrices, dtype=float)
+        G, n = ElementMatrices.shape[:2]
+        Boundary = [0, 1, 2, 6, 7, 8]
+        Middle = [3, 4, 5]
+
+        Stiffness = ElementMatrices[:, 0]
+        Steps = []
+        for j in range(1, n):
+            K9 = np.zeros((G, 9, 9))
+            K9[:, :6, :6] += Stiffness
+            K9[:, 3:, 3:] += ElementMatrices[:, j]
+            KmmInv = np.linalg.inv(K9[:, 3:6, 3:6])
+            Kbm = K9[:, Boundary][:, :, Middle]
+            Recovery = KmmInv @ K9[:, Middle][:, :, Boundary]
+            Stiffness = K9[:, Boundary][:, :, Boundary] - Kbm @ Recovery
+            Steps.append((KmmInv, Kbm, Recovery))
+        return {"Stiffness": Stiffness, "Steps": Steps}
+
+    def ChainLoadCondensation(Condensation, InteriorLoad):
+        """
+        Condenses the (G, n - 1, 3) loads of the interior chain nodes with the steps of ChainCondensation.
+        Returns the (G, 6) equivalent loads of the chain end nodes and the (G, n - 1, 3) K_mm^-1 f_m terms
+        needed by ChainRecovery.
+        """
+        InteriorLoad = np.asarray(InteriorLoad, dtype=float)
+        G = InteriorLoad.shape[0]
+        EndLoad = np.zeros((G, 6))
+        Particular = np.zeros(InteriorLoad.shape)
+        for j, (KmmInv, Kbm, Recovery) in enumerate(Condensation["Steps"]):
+            Middle = EndLoad[:, 3:] + InteriorLoad[:, j]
+            Particular[:, j] = np.einsum("gij,gj->gi", KmmInv, Middle)
+            EndLoad = np.concatenate([EndLoad[:, :3], np.zeros((G, 3))], axis=1) - np.einsum("gij,gj->gi", Kbm, Particular[:, j])
+        return EndLoad, Particular
+
+    def ChainRecovery(Condensation, Particular, EndDisplacement):
+        """ (G, n - 1, 3) interior node displacements by back substitution from the (G, 6) chain end displacements """
+        EndDisplacement = np.asarray(EndDisplacement, dtype=float)
+        Interior = np.zeros(Particular.shape)
+        Next = EndDisplacement[:, 3:]
+        for j in range(len(Condensation["Steps"]) - 1, -1, -1):
+            Recovery = Condensation["Steps"][j][2]
+            Interior[:, j] = Particular[:, j] - np.einsum("gij,gj->gi", Recovery, np.concatenate([EndDisplacement[:, :3], Next], axis=1))
+            Next = Interior[:, j]
+        return Interior
+
     def GlobalStifnessMatrixA21():
         return None
     
     def DirectInverseDisplacementSolver(StiffnessMatrix, ForceVector):
-        
-        Displacement = np.dot((np.linalg.inv(np.array(StiffnessMatrix))),ForceVector)
-
-        return Displacement
+        """ Kept for old callers, solves with a LU factorization instead of forming the inverse of K """
+        return Computer.DisplacementSolver(StiffnessMatrix, ForceVector, "LU")
     
     def CholeskyDisplacementSolver(StiffnessMatrix, ForceVector):
 
-        K = sp.csc_matrix(StiffnessMatrix)
-        # Perform Cholesky factorization
-        factor = cholesky(K)
-        # Solving for displacement without computing the inverse explicitly
-        Displacement = factor.solve_A(ForceVector)
-
-        return Displacement
+        return Computer.DisplacementSolver(StiffnessMatrix, ForceVector, "Cholesky")
     
-    def ConjugateGradientDisplacementSolver():
-        return None
+    def ConjugateGradientDisplacementSolver(StiffnessMatrix, ForceVector):
+
+        return Computer.DisplacementSolver(StiffnessMatrix, ForceVector, "CG")
+
+    def DisplacementSolver(StiffnessMatrix, ForceVector, Solver = "LU", Permutation = None):
+        """
+        Solves K u = F with the factorization named by Solver (see Computer.DisplacementSolvers).
+        ForceVector may be a vector or an (n, k) matrix of right hand sides.
+        """
+        Solve = Computer.Factorize(StiffnessMatrix, Solver, Permutation)
+        return Solve(np.asarray(ForceVector, dtype=float))
+
+    def Factorize(StiffnessMatrix, Solver = "LU", Permutation = None):
+        """
+        Factorizes K once and returns a solve(ForceVector) function which can be reused for any number
+        of right hand sides. With an equation Permutation (see EquationOrdering) K[p][:, p] is factorized
+        instead, the sparse LU keeps that order as is, and the solve still works in the original numbering.
+        """
+        if Solver not in Computer.DisplacementSolvers:
+            raise ValueError(f"Unsupported solver: '{Solver}'. Available solvers: {list(Computer.DisplacementSolvers)}")
+        if Permutation is None:
+            return Computer.DisplacementSolvers[Solver](StiffnessMatrix)
+
+        Permutation = np.asarray(Permutation, dtype=int)
+        K = sp.csr_matrix(StiffnessMatrix, dtype=float)[Permutation][:, Permutation]
+        if Solver == "LU":
+            PermutedSolve = splu(K.tocsc(), permc_spec = "NATURAL").solve
+        else:
+            PermutedSolve = Computer.DisplacementSolvers[Solver](K)
+
+        def Solve(ForceVector):
+            ForceVector = np.asarray(ForceVector, dtype=float)
+            Displacement = np.empty_like(ForceVector)
+            Displacement[Permutation] = PermutedSolve(ForceVector[Permutation])
+            return Displacement
+
+        return Solve
+
+    def EquationOrdering(Matrix, Method = "RCM"):
+        """
+        Equation permutation p for the factorization of K[p][:, p] from the sparsity pattern of Matrix.
+        "RCM" (reverse Cuthill-McKee) narrows the band for the banded and skyline solvers,
+        "NestedDissection" reduces the fill of sparse direct solvers (see NestedDissectionOrdering).
+        """
+        Graph = sp.csr_matrix(Matrix, dtype=float)
+        Graph = sp.csr_matrix((np.ones(Graph.nnz), Graph.indices, Graph.indptr), shape = Graph.shape)
+        if Method == "RCM":
+            return np.asarray(reverse_cuthill_mckee(Graph, symmetric_mode = True), dtype=int)
+        if Method == "NestedDissection":
+            return Computer.NestedDissectionOrdering(Graph)
+        raise ValueError(f"Unknown equation ordering: '{Method}'. Available orderings: ['RCM', 'NestedDissection']")
+
+    def NestedDissectionOrdering(Graph, MinSize = 16):
+        """
+        Nested dissection of the graph of a frame. Equations with identical patterns (the DoFs of one node)
+        are merged first, and the chains of vertices with at most two neighbours (the nodes inside divided
+        members) are numbered before everything else: eliminating them never adds more than the edge between
+        the two neighbours. The remaining graph of the frame joints is dissected by LevelStructureDissection.
+        """
+        Graph = sp.csr_matrix(Graph)
+        Graph.sort_indices()
+        # supervariables: rows with the same pattern have the same sum of the (generic) weights
+        Weights = np.random.default_rng(0).uniform(1, 2, Graph.shape[0])
+        _, Labels = np.unique(Graph @ Weights, return_inverse = True)
+        Members = sp.csr_matrix((np.ones(len(Labels)), (np.arange(len(Labels)), Labels)))
+        Quotient = (Members.T @ Graph @ Members).tocsr()
+
+        Degree = np.diff(Quotient.indptr) - (Quotient.diagonal() != 0)
+        Chain, Joint = np.flatnonzero(Degree <= 2), np.flatnonzero(Degree > 2)
+        ChainGraph = Quotient[Chain][:, Chain]
+        NumChains, ChainLabels = connected_components(ChainGraph, directed = False)
+        # every chain is numbered from one end, which eliminates it without any fill
+        Order = Chain[reverse_cuthill_mckee(ChainGraph, symmetric_mode = True)] if len(Chain) else Chain
+        if len(Joint):
+            # a chain joins at most two joints, which become neighbours once the chain is eliminated
+            Incidence = sp.csr_matrix((np.ones(len(Chain)), (ChainLabels, np.arange(len(Chain)))), shape = (NumChains, len(Chain)))
+            Ends = Incidence @ Quotient[Chain][:, Joint]
+            Reduced = Quotient[Joint][:, Joint] + Ends.T @ Ends
+            Order = np.r_[Order, Joint[Computer.LevelStructureDissection(Reduced, MinSize)]]
+
+        Rank = np.empty(len(Order), dtype=int)
+        Rank[Order] = np.arange(len(Order))
+        return np.argsort(Rank[Labels], kind = "stable")
+
+    def LevelStructureDissection(Graph, MinSize = 16):
+        """
+        Nested dissection by level structures: the BFS levels from a pseudo peripheral vertex are split at
+        the median level, that level is the separator and is numbered after both halves, which are
+        dissected in turn. Parts of at most MinSize vertices keep a reverse Cuthill-McKee order.
+        All parts of one dissection level are split together by a few csgraph calls on the whole graph,
+        the nested order follows from sorting by the (part, side) keys of all levels.
+        """
+        Graph = sp.csr_matrix(Graph)
+        n = Graph.shape[0]
+        Row, Col = np.repeat(np.arange(n), np.diff(Graph.indptr)), Graph.indices
+        Row, Col = Row[Row < Col], Col[Row < Col]
+
+        def Restricted(Keep, Start = None):
+            # the kept edges, with an extra vertex n joined to the Start vertices as a common BFS source
+            R, C = Row[Keep], Col[Keep]
+            if Start is not None:
+                R, C = np.r_[R, np.full(len(Start), n)], np.r_[C, Start]
+            return sp.csr_matrix((np.ones(len(R)), C, np.r_[0, np.cumsum(np.bincount(R, minlength = n + 1))]), shape = (n + 1, n + 1))
+
+        # Side: 0 lower half, 1 upper half, 2 separator, 3 leaf
+        Part, Keys, LeafKey = np.zeros(n, dtype=int), [], np.zeros(n, dtype=int)
+        while (Part >= 0).any():
+            Active = Part >= 0
+            Keep = Active[Row] & (Part[Row] == Part[Col])
+            Component = connected_components(Restricted(Keep), directed = False)[1][:n]
+            Size = np.bincount(Component, weights = Active)
+            Split = Active & (Size[Component] > MinSize)
+            Side = np.where(Active, 3, 0)
+            if Split.any():
+                Vertices = np.flatnonzero(Split)
+                First = Vertices[np.unique(Component[Vertices], return_index = True)[1]]
+                Level = shortest_path(Restricted(Keep, First), directed = False, unweighted = True, indices = n)
+                Order = np.lexsort((Level[Vertices], Component[Vertices]))
+                Last = Vertices[Order[np.r_[np.flatnonzero(np.diff(Component[Vertices[Order]])), len(Vertices) - 1]]]
+                Level = shortest_path(Restricted(Keep, Last), directed = False, unweighted = True, indices = n)[:n]
+
+                Order = Vertices[np.lexsort((Level[Vertices], Component[Vertices]))]
+                Begin = np.r_[0, np.flatnonzero(np.diff(Component[Order])) + 1]
+                Middle = np.zeros(len(Size))
+                Middle[Component[Order[Begin]]] = Level[Order[Begin + (Size[Component[Order[Begin]]].astype(int) - 1) // 2]]
+                Side[Vertices] = np.array([0, 2, 1])[np.sign(Level[Vertices] - Middle[Component[Vertices]]).astype(int) + 1]
+
+                Halves = np.zeros((len(Size), 3))
+                np.add.at(Halves, (Component[Vertices], Side[Vertices]), 1)
+                Split &= (Halves[Component, 0] > 0) & (Halves[Component, 1] > 0)
+                Side[Active & ~Split] = 3
+            Keys += [np.where(Active, Component, 0), Side]
+            LeafKey[Side == 3] = Component[Side == 3] + len(Keys) * n
+            Part = np.where(Split & (Side < 2), 2 * Component + Side, -1)
+
+        Keep = (LeafKey[Row] > 0) & (LeafKey[Row] == LeafKey[Col])
+        Rank = np.empty(n + 1, dtype=int)
+        Rank[reverse_cuthill_mckee(Restricted(Keep) + Restricted(Keep).T, symmetric_mode = True)] = np.arange(n + 1)
+        return np.lexsort([Rank[:n]] + Keys[::-1])
+
+    def BandwidthStatistics(Matrix, Permutation = None):
+        """
+        Bandwidth (largest |i - j| of a nonzero), Profile (entries in the skyline of the lower triangle) and
+        Fill (nonzeros of the sparse LDL^T factor L in that order) of the symmetric Matrix, or of
+        Matrix[p][:, p] for a Permutation p.
+        """
+        K = sp.csr_matrix(Matrix, dtype=float)
+        if Permutation is not None:
+            K = K[Permutation][:, Permutation]
+        coo = K.tocoo()
+        lower = coo.row >= coo.col
+        FirstColumn = np.arange(K.shape[0])
+        np.minimum.at(FirstColumn, coo.row[lower], coo.col[lower])
+        # symbolic factor without reordering and without pivoting away from the diagonal
+        factor = splu(K.tocsc(), permc_spec = "NATURAL", diag_pivot_thresh = 0, options = dict(SymmetricMode = True))
+        return {"Bandwidth": int(np.abs(coo.row - coo.col).max(initial=0)),
+                "Profile": int(np.sum(np.arange(K.shape[0]) - FirstColumn + 1)),
+                "Fill": int(factor.L.nnz)}
+
+    def CholeskyFactorization(StiffnessMatrix):
+        """ Dense Cholesky (cho_factor), K has to be symmetric positive definite """
+        K = StiffnessMatrix.toarray() if sp.issparse(StiffnessMatrix) else np.array(StiffnessMatrix, dtype=float)
+        factor = cho_factor(K)
+        return lambda ForceVector: cho_solve(factor, ForceVector)
+
+    def DenseLUFactorization(StiffnessMatrix):
+        """ Dense LU with partial pivoting, for small or non symmetric matrices """
+        K = StiffnessMatrix.toarray() if sp.issparse(StiffnessMatrix) else np.array(StiffnessMatrix, dtype=float)
+        factor = lu_factor(K)
+        return lambda ForceVector: lu_solve(factor, ForceVector)
+
+    def SparseLUFactorization(StiffnessMatrix):
+        """ Sparse LU (SuperLU splu), also valid for the indefinite second order stiffness matrix """
+        factor = splu(sp.csc_matrix(StiffnessMatrix, dtype=float))
+        return factor.solve
+
+    def BandedCholeskyFactorization(StiffnessMatrix):
+        """
+        Banded Cholesky of a symmetric positive definite K stored in lower banded form. This is the
+        factor once / solve many counterpart of scipy.linalg.solveh_banded, and pays off when the DoF
+        numbering keeps the bandwidth small.
+        """
+        K = sp.csr_matrix(StiffnessMatrix, dtype=float)
+        num_dofs = K.shape[0]
+        coo = K.tocoo()
+        lower = coo.row >= coo.col
+        bandwidth = int((coo.row - coo.col)[lower].max(initial=0))
+
+        # ab[i - j, j] = K[i, j] for the lower triangle
+        ab = np.zeros((bandwidth + 1, num_dofs))
+        np.add.at(ab, ((coo.row - coo.col)[lower], coo.col[lower]), coo.data[lower])
+        factor = cholesky_banded(ab, lower=True)
+        return lambda ForceVector: cho_solve_banded((factor, True), ForceVector)
+
+    def ConjugateGradientFactorization(StiffnessMatrix, Tolerance = 1e-10):
+        """
+        Jacobi preconditioned conjugate gradient. Nothing is factorized, every right hand side is
+        iterated separately, which keeps memory at O(nnz) for very large models.
+        """
+        K = sp.csr_matrix(StiffnessMatrix, dtype=float)
+        diagonal = K.diagonal()
+        diagonal[diagonal == 0] = 1
+        Preconditioner = LinearOperator(K.shape, matvec = lambda x: x / diagonal, dtype=float)
+
+        def Solve(ForceVector):
+            ForceVector = np.asarray(ForceVector, dtype=float)
+            if ForceVector.ndim == 2:
+                return np.column_stack([Solve(ForceVector[:, i]) for i in range(ForceVector.shape[1])])
+            try:
+                Displacement, info = cg(K, ForceVector, rtol=Tolerance, atol=0, M=Preconditioner, maxiter=10*K.shape[0])
+            except TypeError:
+                Displacement, info = cg(K, ForceVector, tol=Tolerance, atol=0, M=Preconditioner, maxiter=10*K.shape[0])
+            if info != 0:
+                raise RuntimeError(f"Conjugate gradient did not converge (info = {info}).")
+            return Displacement
+
+        return Solve
+
+    # Registry of displacement solvers, selectable per analysis with Model(..., Solver = "<name>")
+    DisplacementSolvers = {"Cholesky": CholeskyFactorization,
+                           "DenseLU": DenseLUFactorization,
+                           "LU": SparseLUFactorization,
+                           "Banded": BandedCholeskyFactorization,
+                           "CG": ConjugateGradientFactorization}
+
+    def BucklingEigenSolver(StiffnessMatrix, GeometricMatrix, NumModes, Method = "eigsh"):
+        """
+        The NumModes critical load factors of smallest magnitude of K phi = lambda KG phi, without the dense
+        O(n^3) solve. K is symmetric positive definite, KG symmetric and indefinite, so the pencil is solved
+        as KG phi = mu K phi for the largest |mu| = 1/|lambda| (shift-invert about lambda = 0, the K factor
+        acts as the inverse operator). Method "eigsh" uses Lanczos, "lobpcg" block LOBPCG from both ends.
+        Returns (load factors sorted by magnitude, modes as columns).
+        """
+        K = sp.csc_matrix(StiffnessMatrix, dtype=float)
+        KG = sp.csc_matrix(GeometricMatrix, dtype=float)
+        n = K.shape[0]
+        NumModes = min(int(NumModes), n - 1)
+        if NumModes < 1:
+            raise ValueError("At least one buckling mode has to be requested.")
+
+        KFactor = splu(K)
+        Kinv = LinearOperator((n, n), matvec = KFactor.solve, matmat = KFactor.solve, dtype=float)
+        if Method == "eigsh":
+            mu, modes = eigsh(KG, k = NumModes, M = K, Minv = Kinv, which = 'LM')
+        elif Method == "lobpcg":
+            rng = np.random.default_rng(0)
+            Block = min(NumModes, max(n // 3, 1))
+            mu_list, mode_list = [], []
+            for Sign in (1.0, -1.0):
+                # a side without buckling modes converges slowly, its tiny |mu| are dropped by the ranking below
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    m, x = lobpcg(Sign * KG, rng.standard_normal((n, Block)), B = K, M = Kinv, largest = True, tol = 1e-6, maxiter = 500)
+                mu_list.append(Sign * m)
+                mode_list.append(x)
+            mu = np.concatenate(mu_list)
+            modes = np.hstack(mode_list)
+        else:
+            raise ValueError(f"Unknown buckling eigen solver: '{Method}'")
+
+        # keep the NumModes largest |mu| with a nonzero geometric stiffness
+        order = np.argsort(-np.abs(mu))[:NumModes]
+        mu, modes = mu[order], modes[:, order]
+        keep = np.abs(mu) > 1e-12 * max(np.abs(mu).max(initial=0), 1e-300)
+        return 1 / mu[keep], modes[:, keep]
+
+    def SturmCount(StiffnessMatrix, GeometricMatrix, Shift):
+        """
+        Number of negative pivots of the LDL^T factorization of K - Shift * KG. By Sylvester's law of inertia
+        this is the number of load factors of K phi = lambda KG phi between 0 and Shift (K positive definite).
+        """
+        if sp.issparse(StiffnessMatrix) or sp.issparse(GeometricMatrix):
+            return Computer.NegativePivotCount(sp.csc_matrix(StiffnessMatrix - Shift * GeometricMatrix, dtype=float))
+        return Computer.NegativePivotCount(np.asarray(StiffnessMatrix, dtype=float) - Shift * np.asarray(GeometricMatrix, dtype=float))
+
+    def NegativePivotCount(Matrix):
+        """
+        Number of negative eigenvalues of the symmetric Matrix from the pivots of its LDL^T factorization.
+        The sparse LU is only used when its row and column permutations agree (symmetric pivoting), otherwise
+        the count falls back on the Bunch-Kaufman factorization of the dense matrix with a RuntimeWarning.
+        """
+        if sp.issparse(Matrix):
+            # symmetric ordering and diagonal pivots only, so that U = D L^T carries the inertia
+            factor = splu(sp.csc_matrix(Matrix, dtype=float), permc_spec = "MMD_AT_PLUS_A", diag_pivot_thresh = 0, options = dict(SymmetricMode = True))
+            if np.array_equal(factor.perm_r, factor.perm_c):
+                return int(np.sum(factor.U.diagonal() < 0))
+            # SuperLU left the diagonal for a zero pivot, the pivots are no congruence of Matrix any more
+            warnings.warn("Sparse LU pivoting was not symmetric, inertia is taken from the dense LDL^T factorization.", RuntimeWarning)
+            Matrix = Matrix.toarray()
+        D = ldl(np.asarray(Matrix, dtype=float))[1]
+        return int(np.sum(np.linalg.eigvalsh(D) < 0))
+
+    def WittrickWilliamsSolver(Count, NumModes, Start = 1.0, Tolerance = 1e-9):
+        """
+        The NumModes lowest positive roots of a transcendental eigenproblem det K(lambda) = 0 by bisection on
+        the Wittrick-Williams count, Count(lambda) = number of roots below lambda. The upper bound is doubled
+        from Start until it holds NumModes roots, every root is bisected to the relative Tolerance.
+        Returns the load factors ascending.
+        """
+        Counts = {}
+        def Counted(Value):
+            if Value not in Counts:
+                Counts[Value] = Count(Value)
+            return Counts[Value]
+
+        Upper = float(Start)
+        for _ in range(200):
+            if Counted(Upper) >= NumModes:
+                break
+            Upper *= 2
+        else:
+            raise RuntimeError(f"Less than {NumModes} buckling load factors below {Upper:.4g}.")
+
+        Factors = []
+        for k in range(1, NumModes + 1):
+            Lower, High = (Factors[-1] if Factors else 0.0), Upper
+            if Factors and Counted(Factors[-1]) >= k:
+                # multiple root
+                Factors.append(Factors[-1])
+                continue
+            while High - Lower > Tolerance * High:
+                Middle = (Lower + High) / 2
+                if Counted(Middle) >= k:
+                    High = Middle
+                else:
+                    Lower = Middle
+            Factors.append(High)
+        return np.array(Factors)
+
+    def ModalEigenSolver(StiffnessMatrix, MassMatrix, NumModes = None, FrequencyBand = None):
+        """
+        Natural modes of K phi = omega^2 M phi with K and M symmetric positive definite.
+        NumModes      - only the NumModes lowest modes, shift-invert Lanczos about omega^2 = 0
+        FrequencyBand - (f_min, f_max) in Hz, all modes in the band. Their number comes from Sturm counts of
+                        K - omega^2 M at both ends, Lanczos is shifted into the band until all are found.
+        Neither       - all modes from the dense symmetric solver.
+        Returns (omega^2 ascending, modes as columns normalized to phi^T M phi = 1).
+        """
+        n = StiffnessMatrix.shape[0]
+        if NumModes is not None and int(NumModes) < 1:
+            raise ValueError("At least one natural mode has to be requested.")
+        if FrequencyBand is not None:
+            Lower, Upper = sorted((2 * np.pi * max(float(f), 0.0))**2 for f in FrequencyBand)
+            Count = (Computer.SturmCount(StiffnessMatrix, MassMatrix, Upper)
+                     - Computer.SturmCount(StiffnessMatrix, MassMatrix, Lower))
+            NumModes = max(Count, 0)
+
+        if NumModes is not None and 0 < NumModes < n - 1:
+            K = sp.csc_matrix(StiffnessMatrix, dtype=float)
+            M = sp.csc_matrix(MassMatrix, dtype=float)
+            if FrequencyBand is None:
+                omega2, modes = eigsh(K, k = int(NumModes), M = M, sigma = 0, which = 'LM')
+            else:
+                # modes nearest to the band centre, widened until the whole band is covered
+                Request = NumModes
+                while True:
+                    omega2, modes = eigsh(K, k = Request, M = M, sigma = (Lower + Upper) / 2, which = 'LM')
+                    inside = (omega2 >= Lower) & (omega2 <= Upper)
+                    if inside.sum() >= NumModes or Request >= n - 2:
+                        break
+                    Request = min(2 * Request, n - 2)
+                omega2, modes = omega2[inside], modes[:, inside]
+        elif NumModes == 0:
+            omega2, modes = np.zeros(0), np.zeros((n, 0))
+        else:
+            K = StiffnessMatrix.toarray() if sp.issparse(StiffnessMatrix) else np.asarray(StiffnessMatrix, dtype=float)
+            M = MassMatrix.toarray() if sp.issparse(MassMatrix) else np.asarray(MassMatrix, dtype=float)
+            omega2, modes = eigh(K, M)
+            if FrequencyBand is not None:
+                inside = (omega2 >= Lower) & (omega2 <= Upper)
+                omega2, modes = omega2[inside], modes[:, inside]
+            elif NumModes is not None:
+                omega2, modes = omega2[:NumModes], modes[:, :NumModes]
+
+        order = np.argsort(omega2, kind = "stable")
+        omega2, modes = omega2[order], modes[:, order]
+        # mass normalization, the largest component of every mode is positive
+        modes = modes / np.sqrt(np.einsum("ij,ij->j", modes, MassMatrix @ modes))
+        modes = modes * np.where(modes[np.abs(modes).argmax(axis=0), np.arange(modes.shape[1])] < 0, -1.0, 1.0)
+        return omega2, modes
+
+    def LumpedMassVector(Members, MemberIndex, NumDoF):
+        """
+        Diagonal of the lumped global mass matrix as a vector of length NumDoF: half of every member mass
+        at the translations of both end nodes, rotations are massless. MemberIndex holds the (M, 6) equation
+        numbers of the members, entries of -1 (restrained DoFs) are dropped.
+        """
+        MemberIndex = np.asarray(MemberIndex, dtype=int).reshape(-1, 6)
+        Prop = Computer.MemberPropertyArrays(Members) if len(Members) else {"mu": np.zeros(0), "L": np.zeros(0)}
+        Half = Prop["mu"] * Prop["L"] / 2
+        Lumped = np.zeros(MemberIndex.shape)
+        Lumped[:, [0, 1, 3, 4]] = Half[:, None]
+        Keep = MemberIndex >= 0
+        return np.bincount(MemberIndex[Keep], weights = Lumped[Keep], minlength = NumDoF)
+
+    def LumpedModalEigenSolver(StiffnessMatrix, MassVector, NumModes = None, FrequencyBand = None):
+        """
+        Natural modes of K phi = omega^2 diag(m) phi for a lumped mass vector m. Massless DoFs (rotations)
+        are condensed out (Guyan, exact here since they carry no inertia), which leaves the standard
+        symmetric problem A y = omega^2 y with A = m^-1/2 (K_mm - K_m0 K_00^-1 K_0m) m^-1/2, y = m^1/2 phi_m.
+        For NumModes/FrequencyBand the condensed matrix is never formed: (A - sigma I)^-1 is applied through
+        one sparse factorization of K - sigma diag(m), whose massive block of the inverse is the inverse of
+        the condensed problem. Massless DoFs of the modes are recovered as phi_0 = -K_00^-1 K_0m phi_m.
+        Returns (omega^2 ascending, modes as columns normalized to phi^T diag(m) phi = 1).
+        """
+        MassVector = np.asarray(MassVector, dtype=float)
+        n = len(MassVector)
+        Massive = np.flatnonzero(MassVector > 0)
+        Massless = np.flatnonzero(MassVector <= 0)
+        nm = len(Massive)
+        Scale = np.sqrt(MassVector[Massive])
+        if NumModes is not None and int(NumModes) < 1:
+            raise ValueError("At least one natural mode has to be requested.")
+        if nm == 0:
+            raise ValueError("Lumped mass matrix has no mass on the free DoFs.")
+
+        K = sp.csc_matrix(StiffnessMatrix, dtype=float)
+        if FrequencyBand is not None:
+            Lower, Upper = sorted((2 * np.pi * max(float(f), 0.0))**2 for f in FrequencyBand)
+            Mass = sp.diags(MassVector)
+            NumModes = max(Computer.SturmCount(K, Mass, Upper) - Computer.SturmCount(K, Mass, Lower), 0)
+
+        def ShiftInvert(Sigma, Request):
+            Factor = splu(sp.csc_matrix(K - Sigma * sp.diags(MassVector)))
+            def Apply(Y):
+                Z = np.zeros((n, Y.shape[1]))
+                Z[Massive] = Y * Scale[:, None]
+                return Factor.solve(Z)[Massive] * Scale[:, None]
+            Operator = LinearOperator((nm, nm), matvec = lambda y: Apply(np.reshape(y, (nm, 1))).ravel(), matmat = Apply, dtype=float)
+            nu, y = eigsh(Operator, k = Request, which = 'LM')
+            return Sigma + 1 / nu, y
+
+        if NumModes is not None and 0 < NumModes < nm - 1:
+            if FrequencyBand is None:
+                omega2, y = ShiftInvert(0.0, int(NumModes))
+            else:
+                # modes nearest to the band centre, widened until the whole band is covered
+                Request = NumModes
+                while True:
+                    omega2, y = ShiftInvert((Lower + Upper) / 2, Request)
+                    inside = (omega2 >= Lower) & (omega2 <= Upper)
+                    if inside.sum() >= NumModes or Request >= nm - 2:
+                        break
+                    Request = min(2 * Request, nm - 2)
+                omega2, y = omega2[inside], y[:, inside]
+        elif NumModes == 0:
+            omega2, y = np.zeros(0), np.zeros((nm, 0))
+        else:
+            Kd = K.toarray()
+            Condensed = Kd[np.ix_(Massive, Massive)]
+            if len(Massless):
+                Condensed = Condensed - Kd[np.ix_(Massive, Massless)] @ np.linalg.solve(Kd[np.ix_(Massless, Massless)], Kd[np.ix_(Massless, Massive)])
+            omega2, y = eigh(Condensed / np.outer(Scale, Scale))
+            if FrequencyBand is not None:
+                inside = (omega2 >= Lower) & (omega2 <= Upper)
+                omega2, y = omega2[inside], y[:, inside]
+            elif NumModes is not None:
+                omega2, y = omega2[:NumModes], y[:, :NumModes]
+
+        order = np.argsort(omega2, kind = "stable")
+        omega2, y = omega2[order], y[:, order]
+        modes = np.zeros((n, len(omega2)))
+        modes[Massive] = y / Scale[:, None]
+        if len(Massless) and len(omega2):
+            modes[Massless] = -splu(sp.csc_matrix(K[Massless][:, Massless])).solve(np.asarray(K[Massless][:, Massive] @ modes[Massive]))
+        # mass normalization, the largest component of every mode is positive
+        modes = modes / np.sqrt(np.einsum("i,ij->j", MassVector, modes**2))
+        modes = modes * np.where(modes[np.abs(modes).argmax(axis=0), np.arange(modes.shape[1])] < 0, -1.0, 1.0)
+        return omega2, modes
+
+    def RayleighDampingCoefficients(DampingRatio, Omega1, Omega2):
+        """
+        Mass and stiffness factors (a_M, a_K) of the Rayleigh damping C = a_M M + a_K K that gives the
+        damping ratio DampingRatio at the two angular frequencies Omega1 and Omega2 (rad/s).
+        """
+        Omega1, Omega2 = float(Omega1), float(Omega2)
+        if Omega1 <= 0 or Omega2 <= 0:
+            raise ValueError("Rayleigh damping needs two positive angular frequencies.")
+        return 2 * DampingRatio * Omega1 * Omega2 / (Omega1 + Omega2), 2 * DampingRatio / (Omega1 + Omega2)
+
+    def NewmarkIntegrator(StiffnessMatrix, MassMatrix, DampingMatrix, Force, TimeStep, NumSteps, Alpha = 0.0,
+                          InitialDisplacement = None, InitialVelocity = None, Solver = "LU"):
+        """
+        Direct time integration of M a + C v + K u = F(t) with the HHT-alpha method, Alpha = 0 is the
+        Newmark average acceleration rule (beta = 1/4, gamma = 1/2). For -1/3 <= Alpha < 0 the HHT
+        parameters beta = (1 - Alpha)^2 / 4, gamma = 1/2 - Alpha damp the spurious high modes.
+        The effective stiffness of the constant TimeStep is factorized once. MassMatrix may be a lumped mass
+        vector, Force(step) returns the load vector at time step * TimeStep.
+        Generator, yields (time, displacement, velocity, acceleration) for the steps 0 ... NumSteps.
+        """
+        if not -1 / 3 <= Alpha <= 0:
+            raise ValueError("HHT Alpha has to lie in [-1/3, 0].")
+        if TimeStep <= 0 or NumSteps < 0:
+            raise ValueError("Time integration needs a positive TimeStep and NumSteps >= 0.")
+        Beta, Gamma = (1 - Alpha)**2 / 4, 1 / 2 - Alpha
+
+        K = sp.csr_matrix(StiffnessMatrix, dtype=float)
+        n = K.shape[0]
+        Lumped = np.ndim(MassMatrix) == 1
+        M = sp.diags(np.asarray(MassMatrix, dtype=float)) if Lumped else sp.csr_matrix(MassMatrix, dtype=float)
+        C = sp.csr_matrix((n, n)) if DampingMatrix is None else sp.csr_matrix(DampingMatrix, dtype=float)
+
+        c0 = 1 / (Beta * TimeStep**2)
+        c1 = Gamma / (Beta * TimeStep)
+        c2 = 1 / (Beta * TimeStep)
+        c3 = 1 / (2 * Beta) - 1
+        c4 = Gamma / Beta - 1
+        c5 = TimeStep * (Gamma / (2 * Beta) - 1)
+        Solve = Computer.Factorize((c0 * M + (1 + Alpha) * (c1 * C + K)).tocsc(), Solver)
+
+        u = np.zeros(n) if InitialDisplacement is None else np.array(InitialDisplacement, dtype=float)
+        v = np.zeros(n) if InitialVelocity is None else np.array(InitialVelocity, dtype=float)
+        F = np.asarray(Force(0), dtype=float)
+        Residual = F - C @ v - K @ u
+        if Lumped:
+            # massless DoFs (rotations) carry no inertia, their acceleration starts at zero
+            Mass = np.asarray(MassMatrix, dtype=float)
+            a = np.divide(Residual, Mass, out = np.zeros(n), where = Mass > 0)
+        else:
+            a = Computer.Factorize(M.tocsc(), Solver)(Residual)
+        yield 0.0, u.copy(), v.copy(), a.copy()
+
+        for step in range(1, NumSteps + 1):
+            FNew = np.asarray(Force(step), dtype=float)
+            Rhs = ((1 + Alpha) * FNew - Alpha * F + Alpha * (K @ u + C @ v)
+                   + M @ (c0 * u + c2 * v + c3 * a) + (1 + Alpha) * (C @ (c1 * u + c4 * v + c5 * a)))
+            uNew = Solve(Rhs)
+            aNew = c0 * (uNew - u) - c2 * v - c3 * a
+            v = v + TimeStep * ((1 - Gamma) * a + Gamma * aNew)
+            u, a, F = uNew, aNew, FNew
+            yield step * TimeStep, u.copy(), v.copy(), a.copy()
+
+    def PiecewiseExactCoefficients(Omega, DampingRatio, TimeStep):
+        """
+        Recurrence coefficients of q'' + 2 zeta omega q' + omega^2 q = p(t) for a load varying linearly within
+        every time step (exact solution of the SDOF equation, interpolation of excitation), for all modes:
+            q_i+1  = A q_i + B q'_i + C p_i + D p_i+1
+            q'_i+1 = A1 q_i + B1 q'_i + C1 p_i + D1 p_i+1
+        Returns (A, B, C, D, A1, B1, C1, D1) as arrays over the modes.
+        """
+        w = np.asarray(Omega, dtype=float)
+        z = np.broadcast_to(np.asarray(DampingRatio, dtype=float), w.shape)
+        dt = float(TimeStep)
+        if np.any(w <= 0) or np.any(z < 0) or np.any(z >= 1):
+            raise ValueError("Modal integration needs positive frequencies and damping ratios in [0, 1).")
+
+        r = np.sqrt(1 - z**2)
+        wD = w * r
+        e = np.exp(-z * w * dt)
+        s = np.sin(wD * dt)
+        c = np.cos(wD * dt)
+        k = w**2
+
+        A = e * (z / r * s + c)
+        B = e * s / wD
+        C = (2 * z / (w * dt) + e * (((1 - 2 * z**2) / (wD * dt) - z / r) * s - (1 + 2 * z / (w * dt)) * c)) / k
+        D = (1 - 2 * z / (w * dt) + e * ((2 * z**2 - 1) / (wD * dt) * s + 2 * z / (w * dt) * c)) / k
+        A1 = -e * w / r * s
+        B1 = e * (c - z / r * s)
+        C1 = (-1 / dt + e * ((w / r + z / (dt * r)) * s + c / dt)) / k
+        D1 = (1 - e * (z / r * s + c)) / (k * dt)
+        return A, B, C, D, A1, B1, C1, D1
+
+    def ModalResponseHistory(Omega, DampingRatio, ModalLoad, TimeStep):
+        """
+        Modal coordinates of q'' + 2 zeta omega q' + omega^2 q = p(t) starting at rest, for the (steps, modes)
+        modal loads p. The two step recurrence of PiecewiseExactCoefficients is rewritten as a second order
+        IIR filter per mode, so every mode is integrated over all time steps at once by lfilter.
+        Returns (q, q', q'') as (steps, modes) arrays.
+        """
+        p = np.asarray(ModalLoad, dtype=float)
+        NumSteps, NumModes = p.shape
+        w = np.asarray(Omega, dtype=float)
+        z = np.broadcast_to(np.asarray(DampingRatio, dtype=float), w.shape)
+        A, B, C, D, A1, B1, C1, D1 = Computer.PiecewiseExactCoefficients(w, z, TimeStep)
+
+        q = np.zeros((NumSteps, NumModes))
+        v = np.zeros((NumSteps, NumModes))
+        if NumSteps > 1:
+            q[1] = C * p[0] + D * p[1]
+            v[1] = C1 * p[0] + D1 * p[1]
+        if NumSteps > 2:
+            # characteristic polynomial z^2 - (A + B1) z + (A B1 - B A1) of the 2 x 2 step matrix
+            Denominator = np.column_stack([np.ones(NumModes), -(A + B1), A * B1 - B * A1])
+            NumeratorQ = np.column_stack([D, C - B1 * D + B * D1, B * C1 - B1 * C])
+            NumeratorV = np.column_stack([D1, A1 * D + C1 - A * D1, A1 * C - A * C1])
+            for mode in range(NumModes):
+                for Response, Numerator in ((q, NumeratorQ), (v, NumeratorV)):
+                    zi = lfiltic(Numerator[mode], Denominator[mode], Response[1::-1, mode], p[1::-1, mode])
+                    Response[2:, mode] = lfilter(Numerator[mode], Denominator[mode], p[2:, mode], zi = zi)[0]
+        a = p - 2 * z * w * v - w**2 * q
+        return q, v, a
+
+    def CQCCorrelation(Omega, DampingRatio):
+        """ (modes, modes) CQC correlation coefficients rho_ij (Der Kiureghian) for the modal damping ratios """
+        w = np.asarray(Omega, dtype=float)
+        z = np.broadcast_to(np.asarray(DampingRatio, dtype=float), w.shape)
+        zi, zj = z[:, None], z[None, :]
+        b = w[None, :] / w[:, None]
+        return (8 * np.sqrt(zi * zj) * (zi + b * zj) * b**1.5
+                / ((1 - b**2)**2 + 4 * zi * zj * b * (1 + b**2) + 4 * (zi**2 + zj**2) * b**2))
+
+    def ModalCombination(ModalPeak, Omega, DampingRatio, Method = "CQC"):
+        """
+        Peak response estimate from the (modes, ...) peak responses of the single modes with the SRSS or
+        CQC rule. Returns an array of the trailing shape.
+        """
+        ModalPeak = np.asarray(ModalPeak, dtype=float)
+        if Method == "SRSS":
+            return np.sqrt(np.sum(ModalPeak**2, axis=0))
+        if Method == "CQC":
+            rho = Computer.CQCCorrelation(Omega, DampingRatio)
+            return np.sqrt(np.clip(np.einsum("i...,ij,j...->...", ModalPeak, rho, ModalPeak), 0, None))
+        raise ValueError(f"Unknown modal combination: '{Method}'")
 
     def SupportForceVector():
         return None
 
     def ModelDisplacementList_To_Dict(Displacement,UnConstrainedDoF,TotalDoF):
 
+        TotalDoFList = TotalDoF()
+        NumFree = len(UnConstrainedDoF())
         DisplacementDict={}
-        for i in range(len(TotalDoF())):
-            if(i<(len(UnConstrainedDoF()))):
-                DisplacementDict[str(TotalDoF()[i])] = Displacement[i]
-            else:
-                DisplacementDict[str(TotalDoF()[i])]=0
+        for i, dof in enumerate(TotalDoFList):
+            DisplacementDict[str(dof)] = Displacement[i] if i < NumFree else 0
         return DisplacementDict
 
+    def ModelDisplacementList_To_Array(Displacement, NumTotal):
+        """ Full length displacement array in TotalDoF order, the restrained entries are zero """
+        Displacement = np.asarray(Displacement)
+        FullDisplacement = np.zeros((NumTotal,) + Displacement.shape[1:], dtype=np.result_type(Displacement, float))
+        FullDisplacement[:len(Displacement)] = Displacement
+        return FullDisplacement
+
+    def ModelDisplacement_To_MemberDisplacementArray(FullDisplacement, MemberEquation):
+        """ (M, 6) end displacements of all members gathered with the (M, 6) member equation table """
+        return np.asarray(FullDisplacement)[MemberEquation]
+
     def ModelDisplacement_To_MemberDisplacement(MemberNumber,DisplacementDict,Members):
         MemberNo = int(MemberNumber)
         MemberDisplacement = [DisplacementDict[str(Members[MemberNo-1].DoFNumber()[0])],
@@ -116,6 +1152,43 @@ class Computer():
 
         return MemberForce
 
+    def FixedEndForceArray(Members, Loads):
+        """ (M, 6) local fixed end forces of all members, each load is added once to the row of its member """
+        FixedEndForce = np.zeros((len(Members), 6))
+        for load in Loads:
+            FixedEndForce[int(load.AssignedTo.split()[1]) - 1] += load.EquivalentLoad(ReturnLocal = True)
+        return FixedEndForce
+
+    def MemberDisplacement_To_ForceLocalAll(StiffnessMatrixType, Members, MemberDisplacementAll, Loads, NormalForce = None, FixedEndForce = None):
+        """
+        Local end forces of all members at once, k_local @ (T @ d) - FEF, from the (M, 6) global member
+        end displacements. NormalForce is the list of member normal forces for the second order matrices.
+        Returns an (M, 6) array rounded like MemberDisplacement_To_ForceLocal.
+        """
+        if "global" in StiffnessMatrixType.lower():
+            raise ValueError("Conversion to global is not allowed in this Function.")
+
+        if FixedEndForce is None:
+            FixedEndForce = Computer.FixedEndForceArray(Members, Loads)
+
+        Prop = Computer.MemberPropertyArrays(Members)
+        T = Computer.TransformationTensor(Prop["cos"], Prop["sin"])
+        K_local = Computer.ElementMatrixTensor(Members, StiffnessMatrixType, NormalForce)
+
+        MemberDisplacementLocal = np.einsum("mij,mj->mi", T, MemberDisplacementAll)
+        MemberForce = np.einsum("mij,mj->mi", K_local, MemberDisplacementLocal)
+        return np.round(MemberForce - FixedEndForce, 2)
+
+    def MemberDisplacement_To_ForceLocalStack(StiffnessMatrixType, Members, MemberDisplacementStack):
+        """
+        Local end forces k_local @ (T @ d) of all members for a stack of displacement states (modes, time
+        steps) at once, without fixed end forces and without rounding. MemberDisplacementStack is (..., M, 6).
+        """
+        Prop = Computer.MemberPropertyArrays(Members)
+        T = Computer.TransformationTensor(Prop["cos"], Prop["sin"])
+        K_local = Computer.ElementMatrixTensor(Members, StiffnessMatrixType)
+        return np.einsum("mij,mjk,...mk->...mi", K_local, T, MemberDisplacementStack, optimize=True)
+
     def ForceLocal_To_ForceGlobal(StiffnessMatrixType, MemberNumber, Members, MemberDisplacement, Loads, NormalForce = None):
         return None
     
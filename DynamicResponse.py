@@ -5,6 +5,7 @@ from scipy.linalg import eig
 from scipy.sparse.linalg import eigsh
 #import importlib
 import math
+import zipfile
 import scipy.sparse as sp
 from scipy.sparse.linalg import eigs, cg
 from scipy.sparse import csc_matrix
@@ -24,34 +25,317 @@ except:
     from Functions import max_nested
 
 
+class TimeHistoryWriter():
+    """
+    Streams a time history into one .npz file in chunks of ChunkSize steps, so that only one chunk is
+    held in memory. Every chunk is stored as the arrays Time_<k>, Displacement_<k>, Velocity_<k> and
+    Acceleration_<k>, DynamicGlobalResponse.ReadTimeHistory joins them again.
+    """
+
+    Fields = ("Time", "Displacement", "Velocity", "Acceleration")
+
+    def __init__(self, FileName, ChunkSize = 1000):
+        self.FileName = FileName if str(FileName).endswith(".npz") else str(FileName) + ".npz"
+        self.ChunkSize = int(ChunkSize)
+        self.NumChunks = 0
+        self.Buffer = []
+        zipfile.ZipFile(self.FileName, mode = "w").close()
+
+    def Write(self, Time, Displacement, Velocity, Acceleration):
+        self.Buffer.append((Time, Displacement, Velocity, Acceleration))
+        if len(self.Buffer) >= self.ChunkSize:
+            self.Flush()
+
+    def Flush(self):
+        if not self.Buffer:
+            return
+        with zipfile.ZipFile(self.FileName, mode = "a", compression = zipfile.ZIP_STORED, allowZip64 = True) as Archive:
+            for Field, Values in zip(TimeHistoryWriter.Fields, zip(*self.Buffer)):
+                with Archive.open(f"{Field}_{self.NumChunks:06d}.npy", mode = "w", force_zip64 = True) as Entry:
+                    np.lib.format.write_array(Entry, np.array(Values))
+        self.NumChunks += 1
+        self.Buffer = []
+
+    def Close(self):
+        self.Flush()
+        return self.FileName
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+
 class DynamicGlobalResponse(Model):
 
-    def EigenFrequency(self, EigenModeNo = False):
+    def GlobalMassMatrixCondensed(self, MassType = None, Sparse = None):
+        """
+        Mass of the free DoFs, cached per model revision. MassType "Consistent" gives the assembled consistent
+        mass matrix, "Lumped" only its diagonal as a vector (translational masses, massless rotations).
+        MassType defaults to the MassType option of the model.
+        """
+        MassType = self.MassType if MassType is None else MassType
+        Sparse = self.Sparse if Sparse is None else Sparse
+        if MassType not in ("Consistent", "Lumped"):
+            raise ValueError(f"Unknown mass type: '{MassType}'")
+
+        Cache = self.AnalysisCache()
+        Key = ("MassMatrix", MassType, Sparse if MassType == "Consistent" else None)
+        if Key not in Cache:
+            if MassType == "Lumped":
+                Cache[Key] = Computer.LumpedMassVector(self.Members, self.MemberEquationIndex(), self.DoFPartition()["NumFree"])
+            else:
+                Cache[Key] = Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, "Global_Mass_Matrix", Sparse = Sparse, Pattern = self.AssemblyPattern())
+        return Cache[Key]
+
+    def ModalAnalysis(self, NumModes = None, FrequencyBand = None, MassType = None):
+        """
+        Natural modes of the free DoFs, cached per model revision. NumModes gives only the lowest modes and
+        FrequencyBand (f_min, f_max in Hz) all modes in the band, both from sparse shift-invert Lanczos.
+        Without either the full spectrum is computed with the dense solver. A cached full or larger solution
+        is reused for requests of fewer modes.
+        MassType "Lumped" uses the diagonal mass vector and condenses the massless rotations out, which turns
+        the generalized problem into a standard symmetric one (see Computer.LumpedModalEigenSolver).
+        Returns a dict:
+            EigenValue         - omega^2 of every mode, ascending
+            AngularFrequency   - omega in rad/s
+            Frequency          - f in Hz
+            EigenMode          - mass normalized modes as columns (phi^T M phi = 1)
+            ParticipationFactor - (modes, 2) phi^T M r for unit ground motion r in x and y
+            EffectiveMass      - (modes, 2) squared participation factors
+            TotalMass          - (2,) r^T M r of the free DoFs in x and y
+        """
+        MassType = self.MassType if MassType is None else MassType
+        if MassType not in ("Consistent", "Lumped"):
+            raise ValueError(f"Unknown mass type: '{MassType}'")
+        Cache = self.AnalysisCache()
+        Key = ("ModalAnalysis", None if NumModes is None else int(NumModes),
+               None if FrequencyBand is None else tuple(float(f) for f in FrequencyBand), MassType)
+        if Key not in Cache and FrequencyBand is None:
+            # a cached solution with at least as many modes already contains the requested ones
+            for CachedKey, Result in Cache.items():
+                if (isinstance(CachedKey, tuple) and CachedKey[0] == "ModalAnalysis" and CachedKey[2] is None and CachedKey[3] == MassType
+                        and (CachedKey[1] is None or (NumModes is not None and CachedKey[1] >= NumModes))):
+                    Cache[Key] = {Name: DynamicGlobalResponse.FirstModes(Name, Value, NumModes) for Name, Value in Result.items()}
+                    break
+        if Key in Cache:
+            return {Name: Value.copy() for Name, Value in Cache[Key].items()}
 
         dof = self.UnConstrainedDoF()
+        Sparse = True if (NumModes is not None or FrequencyBand is not None or MassType == "Lumped") else self.Sparse
+        MM_Conden = self.GlobalMassMatrixCondensed(MassType = MassType, Sparse = Sparse)
+        _1st_OrdSM_condensed = Computer.StiffnessMatrixAssembler(dof,self.Members,"First_Order_Global_Stiffness_Matrix_1", Sparse = Sparse, Pattern = self.AssemblyPattern())
 
-        MM_Conden = Computer.StiffnessMatrixAssembler(dof,self.Members,"Global_Mass_Matrix")
-        _1st_OrdSM_condensed = Computer.StiffnessMatrixAssembler(dof,self.Members,"First_Order_Global_Stiffness_Matrix_1")
-        
-        EigenFreq , EigenMode = eig(_1st_OrdSM_condensed, MM_Conden)
-        if EigenModeNo:
-            x, EigenMode = eigsh(
-                                    _1st_OrdSM_condensed, 
-                                    M=MM_Conden, 
-                                    k=10, 
-                                    sigma=1e-6,       # Shift near zero (critical for stability)
-                                    which='LM',       # Largest magnitude after shift-invert
-                                    mode='buckling',  # For buckling problems (A x = λ M x)
-                                    maxiter=10000,
-                                    tol=1e-6,
-                                    ncv=50
-                                )
-        
-        EigenFreq = sorted(EigenFreq, key=lambda x: abs(x)) # answer will be in radians - converting to Hz 
-        EigenFreq = [round(float(x.real)**0.5/(2*np.pi), 2) for x in EigenFreq]
+        if MassType == "Lumped":
+            EigenValue, EigenMode = Computer.LumpedModalEigenSolver(_1st_OrdSM_condensed, MM_Conden, NumModes, FrequencyBand)
+        else:
+            EigenValue, EigenMode = Computer.ModalEigenSolver(_1st_OrdSM_condensed, MM_Conden, NumModes, FrequencyBand)
+
+        # rigid body unit translation of the free DoFs in x and y
+        Partition = self.DoFPartition()
+        Direction = Partition["Direction"][:Partition["NumFree"]]
+        Influence = np.column_stack([(Direction == 0), (Direction == 1)]).astype(float)
+        MassInfluence = MM_Conden[:, None] * Influence if MassType == "Lumped" else MM_Conden @ Influence
+        ParticipationFactor = EigenMode.T @ MassInfluence
+
+        AngularFrequency = np.sqrt(np.clip(EigenValue, 0, None))
+        Cache[Key] = {"EigenValue": EigenValue,
+                      "AngularFrequency": AngularFrequency,
+                      "Frequency": AngularFrequency / (2 * np.pi),
+                      "EigenMode": EigenMode,
+                      "ParticipationFactor": ParticipationFactor,
+                      "EffectiveMass": ParticipationFactor**2,
+                      "TotalMass": np.einsum("ij,ij->j", Influence, MassInfluence)}
+        return {Name: Value.copy() for Name, Value in Cache[Key].items()}
+
+    @staticmethod
+    def FirstModes(Name, Value, NumModes):
+        """ First NumModes entries of a ModalAnalysis result (modes are the columns of EigenMode) """
+        if NumModes is None or Name == "TotalMass":
+            return Value
+        if Name == "EigenMode":
+            return Value[:, :NumModes]
+        return Value[:NumModes]
+
+    def EigenFrequency(self, EigenModeNo = False, NumModes = None, FrequencyBand = None, MassType = None):
+        """
+        Natural frequencies in Hz. All of them by default, the lowest NumModes (at least EigenModeNo when a
+        mode is asked for) or those inside FrequencyBand with the sparse solver otherwise.
+        MassType "Consistent" or "Lumped" overrides the MassType option of the model.
+        Returns (lowest frequency, frequencies, mass normalized modes as columns).
+        """
+        if EigenModeNo and NumModes is None and FrequencyBand is None:
+            NumModes = EigenModeNo
+        Modal = self.ModalAnalysis(NumModes = NumModes, FrequencyBand = FrequencyBand, MassType = MassType)
+
+        EigenFreq = [round(float(x), 2) for x in Modal["Frequency"]] # answer in radians - converted to Hz
         print("Dynamic Eigen Calculated in Hertz", EigenFreq)
 
-        return min(filter(math.isfinite, [abs(z.real) for z in EigenFreq])), EigenFreq, EigenMode
+        return min(EigenFreq, default = float("nan")), EigenFreq, Modal["EigenMode"]
+
+    def RayleighDamping(self, DampingRatio = 0.05, Frequencies = None, MassType = None):
+        """
+        Factors (a_M, a_K) of the Rayleigh damping C = a_M M + a_K K with DampingRatio at the two
+        Frequencies (Hz), by default at the first two natural frequencies of the model.
+        """
+        if Frequencies is None:
+            Frequencies = self.ModalAnalysis(NumModes = 2, MassType = MassType)["Frequency"]
+        Omega = 2 * np.pi * np.atleast_1d(np.asarray(Frequencies, dtype=float))
+        return Computer.RayleighDampingCoefficients(DampingRatio, Omega[0], Omega[-1])
+
+    def TimeHistoryGenerator(self, TimeStep, NumSteps, LoadHistory = None, GroundAcceleration = None, DampingRatio = 0.05,
+                             DampingFrequencies = None, Method = "Newmark", Alpha = -0.05, MassType = None,
+                             InitialDisplacement = None, InitialVelocity = None):
+        """
+        Transient response of the free DoFs by direct integration, one time step at a time.
+        LoadHistory        - callable t -> load vector of the free DoFs, (NumSteps + 1, n) array of load vectors
+                             or (NumSteps + 1,) factors of the static load vector of the model loads
+        GroundAcceleration - (NumSteps + 1,) in x or (NumSteps + 1, 2) in x and y, applied as -M r a_g, the
+                             response is then relative to the ground
+        DampingRatio       - Rayleigh damping at DampingFrequencies (Hz, default the first two modes)
+        Method             - "Newmark" (average acceleration) or "HHT" with Alpha in [-1/3, 0]
+        The mass follows MassType ("Consistent" or "Lumped", default the model option). The effective
+        stiffness is factorized once with the Solver of the model.
+        Yields (time, displacement, velocity, acceleration) for the steps 0 ... NumSteps.
+        """
+        if Method not in ("Newmark", "HHT"):
+            raise ValueError(f"Unknown time integration method: '{Method}'")
+        NumFree = self.DoFPartition()["NumFree"]
+        Mass = self.GlobalMassMatrixCondensed(MassType = MassType, Sparse = True)
+        K = Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, "First_Order_Global_Stiffness_Matrix_1", Sparse = True, Pattern = self.AssemblyPattern())
+        MassOperator = sp.diags(Mass) if np.ndim(Mass) == 1 else Mass
+
+        Damping = None
+        if DampingRatio:
+            a_M, a_K = self.RayleighDamping(DampingRatio, DampingFrequencies, MassType)
+            Damping = a_M * MassOperator + a_K * K
+
+        if LoadHistory is None:
+            Load = lambda step: np.zeros(NumFree)
+        elif callable(LoadHistory):
+            Load = lambda step: np.asarray(LoadHistory(step * TimeStep), dtype=float)
+        else:
+            LoadHistory = np.asarray(LoadHistory, dtype=float)
+            if LoadHistory.ndim == 1:
+                StaticLoad = np.array(self.ForceVector(), dtype=float)
+                Load = lambda step: LoadHistory[step] * StaticLoad
+            else:
+                Load = lambda step: LoadHistory[step]
+
+        Force = Load
+        if GroundAcceleration is not None:
+            GroundAcceleration = np.asarray(GroundAcceleration, dtype=float).reshape(NumSteps + 1, -1)
+            Direction = self.DoFPartition()["Direction"][:NumFree]
+            Influence = np.column_stack([(Direction == 0), (Direction == 1)]).astype(float)[:, :GroundAcceleration.shape[1]]
+            MassInfluence = MassOperator @ Influence
+            Force = lambda step: Load(step) - MassInfluence @ GroundAcceleration[step]
+
+        return Computer.NewmarkIntegrator(K, Mass, Damping, Force, TimeStep, NumSteps, Alpha = Alpha if Method == "HHT" else 0.0,
+                                          InitialDisplacement = InitialDisplacement, InitialVelocity = InitialVelocity, Solver = self.Solver)
+
+    def TimeHistory(self, TimeStep, NumSteps, OutputFile = None, ChunkSize = 1000, **kwargs):
+        """
+        Runs TimeHistoryGenerator (same keyword arguments). With OutputFile the steps are streamed in chunks
+        into that .npz file (see TimeHistoryWriter) and its name is returned, otherwise a dict with the arrays
+        Time, Displacement, Velocity and Acceleration of all steps.
+        """
+        Steps = self.TimeHistoryGenerator(TimeStep, NumSteps, **kwargs)
+        if OutputFile is not None:
+            with TimeHistoryWriter(OutputFile, ChunkSize) as Writer:
+                for Step in Steps:
+                    Writer.Write(*Step)
+            return Writer.FileName
+        return {Field: np.array(Values) for Field, Values in zip(TimeHistoryWriter.Fields, zip(*Steps))}
+
+    def ModalTimeHistory(self, TimeStep, NumSteps, NumModes = 10, LoadHistory = None, GroundAcceleration = None,
+                         DampingRatio = 0.05, MassType = None):
+        """
+        Linear transient response by modal superposition of the lowest NumModes modes of ModalAnalysis.
+        The loads (same LoadHistory and GroundAcceleration inputs as TimeHistoryGenerator) are projected onto
+        the mass normalized modes and all modal equations, with DampingRatio per mode (scalar or array), are
+        integrated exactly for loads varying linearly within every time step (Computer.ModalResponseHistory).
+        Returns a dict with Time, the (steps, modes) ModalDisplacement, ModalVelocity, ModalAcceleration and
+        the (steps, n) Displacement of the free DoFs, relative to the ground for GroundAcceleration.
+        """
+        Modal = self.ModalAnalysis(NumModes = NumModes, MassType = MassType)
+        Phi = Modal["EigenMode"]
+        NumFree = self.DoFPartition()["NumFree"]
+        Time = np.arange(NumSteps + 1) * TimeStep
+
+        ModalLoad = np.zeros((NumSteps + 1, Phi.shape[1]))
+        if LoadHistory is not None:
+            if callable(LoadHistory):
+                for step, t in enumerate(Time):
+                    ModalLoad[step] += np.asarray(LoadHistory(t), dtype=float) @ Phi
+            else:
+                LoadHistory = np.asarray(LoadHistory, dtype=float)
+                if LoadHistory.ndim == 1:
+                    ModalLoad += np.outer(LoadHistory, np.array(self.ForceVector(), dtype=float) @ Phi)
+                else:
+                    ModalLoad += LoadHistory.reshape(NumSteps + 1, NumFree) @ Phi
+        if GroundAcceleration is not None:
+            GroundAcceleration = np.asarray(GroundAcceleration, dtype=float).reshape(NumSteps + 1, -1)
+            ModalLoad -= GroundAcceleration @ Modal["ParticipationFactor"][:, :GroundAcceleration.shape[1]].T
+
+        q, v, a = Computer.ModalResponseHistory(Modal["AngularFrequency"], DampingRatio, ModalLoad, TimeStep)
+        return {"Time": Time, "ModalDisplacement": q, "ModalVelocity": v, "ModalAcceleration": a,
+                "Displacement": q @ Phi.T}
+
+    def ResponseSpectrum(self, Spectrum, NumModes = 10, Direction = "x", DampingRatio = 0.05, Combination = "CQC", MassType = None):
+        """
+        Peak response to ground motion from a pseudo acceleration response spectrum.
+        Spectrum    - callable period -> S_a, or (periods, S_a) pairs that are interpolated linearly
+        Direction   - "x" or "y" ground motion
+        Combination - "SRSS" or "CQC" (DampingRatio enters the CQC correlation)
+        Every mode contributes q_i = Gamma_i S_a(T_i) / omega_i^2, the member end forces of all modes are
+        computed in one batch over all members before the modal peaks are combined.
+        Returns a dict with Period, ModalPeak (modes,), Displacement (n,) and MemberForceLocal (M, 6).
+        """
+        if Direction not in ("x", "y"):
+            raise ValueError(f"Unknown ground motion direction: '{Direction}'")
+        Modal = self.ModalAnalysis(NumModes = NumModes, MassType = MassType)
+        Omega = Modal["AngularFrequency"]
+        Period = 2 * np.pi / Omega
+        if callable(Spectrum):
+            SpectralAcceleration = np.array([Spectrum(T) for T in Period], dtype=float)
+        else:
+            Periods, Values = np.asarray(Spectrum, dtype=float).T
+            SpectralAcceleration = np.interp(Period, Periods, Values)
+
+        ModalPeak = Modal["ParticipationFactor"][:, 0 if Direction == "x" else 1] * SpectralAcceleration / Omega**2
+        ModeDisplacement = (Modal["EigenMode"] * ModalPeak).T
+        Full = np.zeros((len(ModalPeak), len(self.DoFPartition()["TotalDoF"])))
+        Full[:, :ModeDisplacement.shape[1]] = ModeDisplacement
+        ModeForce = Computer.MemberDisplacement_To_ForceLocalStack("First_Order_Local_Stiffness_Matrix_1", self.Members,
+                                                                  Full[:, self.DoFPartition()["MemberEquation"]])
+
+        return {"Period": Period, "ModalPeak": ModalPeak,
+                "Displacement": Computer.ModalCombination(ModeDisplacement, Omega, DampingRatio, Combination),
+                "MemberForceLocal": Computer.ModalCombination(ModeForce, Omega, DampingRatio, Combination)}
+
+    @staticmethod
+    def ReadTimeHistory(FileName):
+        """ Joins the chunks of a TimeHistoryWriter file into the dict returned by TimeHistory """
+        with np.load(FileName) as Data:
+            return {Field: np.concatenate([Data[Name] for Name in sorted(Data.files) if Name.rsplit("_", 1)[0] == Field])
+                    for Field in TimeHistoryWriter.Fields}
+
+    def FrequencySensitivity(self, SensitivityType, EigenModeNo = 1, MassType = None):
+        """
+        Derivative of the natural frequency (Hz) of mode EigenModeNo with respect to the area ("Axial"),
+        moment of inertia ("Bending") or Young's modulus ("Material") of every member. With the mass
+        normalized mode, d(omega^2)/dp = phi_eᵀ (∂k_e - omega^2 ∂m_e) phi_e, which is evaluated for all
+        members in one contraction from the cached ModalAnalysis, and df = d(omega^2) / (4 pi omega).
+        """
+        MassType = self.MassType if MassType is None else MassType
+        Modal = self.ModalAnalysis(NumModes = EigenModeNo, MassType = MassType)
+        EigenValue = Modal["EigenValue"][EigenModeNo-1]
+        MemberMode = self.MemberDisplacementArray(Modal["EigenMode"][:, EigenModeNo-1])
+
+        DerivativeTensor = (Computer.StiffnessDerivativeTensor(self.Members, SensitivityType)
+                            - EigenValue * Computer.MassDerivativeTensor(self.Members, SensitivityType, MassType))
+        return Computer.MemberEnergyDerivative(self.Members, DerivativeTensor, MemberMode) / (4 * np.pi * Modal["AngularFrequency"][EigenModeNo-1])
 
     def MemberEigenMode(self, MemberNumber, scale_factor = 10000, EigenModeNo = 2, EigenVectorDict = None):
         
@@ -18,39 +18,65 @@ except:
 class FirstOrderGlobalResponse(Model):
     
     def DisplacementVector(self):
-        self.Displacement = Computer.DirectInverseDisplacementSolver(self.GlobalStiffnessMatrixCondensed(),self.ForceVector())
-        #DisplacementDict formation
-        self.DisplacementDict={}
-        for i in range(len(self.TotalDoF())):
-            if(i<(len(self.UnConstrainedDoF()))):
-                self.DisplacementDict[str(self.TotalDoF()[i])] = self.Displacement[i]
+        
+        Cache = self.AnalysisCache()
+        if "Displacement" not in Cache:
+            Cache["ForceVector"] = np.array(self.ForceVector(), dtype=float)
+            if self.Condensation:
+                Cache["Displacement"] = self.SuperelementSolve(Cache["ForceVector"])
             else:
-                self.DisplacementDict[str(self.TotalDoF()[i])] = 0
-        print("1st order displacement computed")
+                Cache["Displacement"] = self.StiffnessFactorization()(Cache["ForceVector"])
+            #Member end displacements (M, 6) gathered once from the full length displacement array
+            Cache["MemberDisplacementAll"] = self.MemberDisplacementArray(Cache["Displacement"])
+            print("1st order displacement computed")
+
+        self.Displacement = Cache["Displacement"].copy()
         return self.Displacement
     
+    def StiffnessFactorization(self):
+        """ Solve callable of the condensed stiffness matrix, factorized once and shared by all right hand sides """
+        Cache = self.AnalysisCache()
+        if "Factorization" not in Cache:
+            Cache["StiffnessMatrix"] = self.GlobalStiffnessMatrixCondensed()
+            Cache["Factorization"] = Computer.Factorize(Cache["StiffnessMatrix"], self.Solver, self.EquationPermutation())
+        return Cache["Factorization"]
+
+    def LoadCaseDisplacement(self, Name = None):
+        """
+        Displacements of the free DoFs for all load cases, solved as one (n, k) right hand side against
+        the single stiffness factorization. Returns the (n, k) matrix, or the column of one load case or
+        the superposition of the cases for a load combination if Name is given.
+        """
+        Cache = self.AnalysisCache()
+        if "LoadCaseDisplacement" not in Cache:
+            Cache["LoadCaseDisplacement"] = self.StiffnessFactorization()(self.LoadCaseForceMatrix()).reshape(self.LoadCaseForceMatrix().shape)
+        if Name is None:
+            return Cache["LoadCaseDisplacement"].copy()
+        return Cache["LoadCaseDisplacement"] @ self.LoadCaseFactors(Name)
+
     def DisplacementVectorDict(self):
+        Cache = self.AnalysisCache()
         self.DisplacementVector()
-        self.DisplacementDict={}
-        for i in range(len(self.TotalDoF())):
-            if(i<(len(self.UnConstrainedDoF()))):
-                self.DisplacementDict[str(self.TotalDoF()[i])] = self.Displacement[i]
-            else:
-                self.DisplacementDict[str(self.TotalDoF()[i])]=0
+        if "DisplacementDict" not in Cache:
+            Cache["DisplacementDict"] = Computer.ModelDisplacementList_To_Dict(Cache["Displacement"], self.UnConstrainedDoF, self.TotalDoF)
+        self.DisplacementDict = dict(Cache["DisplacementDict"])
         return self.DisplacementDict
+
+    def MemberDisplacementAll(self):
+        """ (M, 6) global end displacements of all members """
+        self.DisplacementVector()
+        return self.AnalysisCache()["MemberDisplacementAll"].copy()
     
     def SupportForcesVector(self):
 
-        SupportForces = np.dot(np.array(self.GlobalStiffnessMatrixCondensedA21()),self.DisplacementVector())
-        
-        self.ForceVectorDict={}
-        for i in range(len(self.TotalDoF())):
-            if(i<(len(self.ConstrainedDoF()))):
-                self.ForceVectorDict[str(self.TotalDoF()[i])]=SupportForces[i]
-            else:
-                self.ForceVectorDict[str(self.TotalDoF()[i])] = 0
-        
-        #force dict formation
+        Cache = self.AnalysisCache()
+        self.DisplacementVector()
+        if "SupportForces" not in Cache:
+            Cache["SupportForces"] = self.GlobalStiffnessMatrixCondensedA21(Sparse = True) @ Cache["Displacement"]
+        SupportForces = Cache["SupportForces"].copy()
+
+        #force dict formation, the support forces belong to the restrained DoFs at the end of TotalDoF
+        self.ForceVectorDict = self.SupportForceDict(SupportForces)
         return SupportForces
    
 
@@ -59,10 +85,12 @@ class FirstOrderNodalResponse(FirstOrderGlobalResponse):
     def NodeDisplacement(self,NodeNumber):
         self.NodeNo = int(NodeNumber)
         
+        UnConstrainedDoF = set(self.UnConstrainedDoF())
+        DisplacementDict = self.DisplacementVectorDict()
         NodeDisplacement = []
-        for i in range(3):
-            if self.Points[self.NodeNo-1].DoF()[i] in self.UnConstrainedDoF():
-                NodeDisplacement.append(self.DisplacementVectorDict()[str(self.Points[self.NodeNo-1].DoF()[i])])
+        for dof in self.Points[self.NodeNo-1].DoF():
+            if dof in UnConstrainedDoF:
+                NodeDisplacement.append(DisplacementDict[str(dof)])
             else:
                 NodeDisplacement.append(0)
         
@@ -72,10 +100,11 @@ class FirstOrderNodalResponse(FirstOrderGlobalResponse):
         self.SupportForcesVector()
         self.NodeNo = int(NodeNumber)
         
+        ConstrainedDoF = set(self.ConstrainedDoF())
         NodeForce =[]
-        for i in range(3):
-            if self.Points[self.NodeNo-1].DoF()[i] in self.ConstrainedDoF():
-                NodeForce.append(self.ForceVectorDict[str(self.Points[self.NodeNo-1].DoF()[i])])
+        for dof in self.Points[self.NodeNo-1].DoF():
+            if dof in ConstrainedDoF:
+                NodeForce.append(self.ForceVectorDict[str(dof)])
             else:
                 NodeForce.append(0)
         
@@ -99,9 +128,10 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
     
     def MemberDisplacement(self, MemberNumber):
         self.MemberNo = int(MemberNumber)
-        Displacement = self.DisplacementVector()
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(Displacement, self.UnConstrainedDoF, self.TotalDoF)
-        MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber, DisplacementDict, self.Members)
+        Cache = self.AnalysisCache()
+        if "MemberDisplacementAll" not in Cache:
+            self.DisplacementVector()
+        MemberDisplacement = Cache["MemberDisplacementAll"][self.MemberNo-1].tolist()
         """
         MemberDisplacement = [self.DisplacementVectorDict()[str(self.Members[self.MemberNo-1].DoFNumber()[0])],
                              self.DisplacementVectorDict()[str(self.Members[self.MemberNo-1].DoFNumber()[1])],
@@ -112,30 +142,42 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
         """
         return MemberDisplacement
         
+    def MemberForceLocalAll(self):
+
+        """ Local end forces of all members as one (M, 6) array, computed in a single batched
+        k_local @ (T @ d) - FEF step and kept in the analysis cache """
+
+        Cache = self.AnalysisCache()
+        if "MemberForceLocalAll" not in Cache:
+            Cache["MemberForceLocalAll"] = Computer.MemberDisplacement_To_ForceLocalAll("First_Order_Local_Stiffness_Matrix_1", self.Members, self.MemberDisplacementAll(), self.Loads,
+                                                                                        FixedEndForce = self.FixedEndForceArray())
+        return Cache["MemberForceLocalAll"].copy()
+
+    def LoadCaseMemberForceLocal(self, Name):
+
+        """ Local end forces (M, 6) of all members for a load case, or for a load combination by superposition """
+
+        MemberDisplacementAll = self.MemberDisplacementArray(self.LoadCaseDisplacement(Name))
+        return Computer.MemberDisplacement_To_ForceLocalAll("First_Order_Local_Stiffness_Matrix_1", self.Members, MemberDisplacementAll, self.Loads,
+                                                            FixedEndForce = self.LoadCaseFixedEndForce(Name))
+
     def MemberForceLocal(self, MemberNumber, All = False):
 
         """ this function computes the local force in the member using the displacement vector.
         It uses the computer class to convert the model displacement to member displacement and 
         then computes the local force using the member displacement and member stiffness matrix.
-        If All is True, it computes the local force for all members and returns a list of local forces"""
+        If All is True, it computes the local force for all members and returns a list of local forces.
+        The local forces of all members are kept in the analysis cache, so repeated calls are lookups"""
 
         self.MemberNo = int(MemberNumber)
-        Displacement = self.DisplacementVector()
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(Displacement,self.UnConstrainedDoF,self.TotalDoF)
-        MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber,DisplacementDict,self.Members)
-        MemberForce = Computer.MemberDisplacement_To_ForceLocal("First_Order_Local_Stiffness_Matrix_1", MemberNumber, self.Members, MemberDisplacement, self.Loads )
-
         if All == True:
+            return list(self.MemberForceLocalAll())
 
-            MemberForceLocalAll = []
-            for i in range(self.NoMembers):
-                MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(i+1,DisplacementDict,self.Members)
-                MemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("First_Order_Local_Stiffness_Matrix_1", i+1, self.Members, MemberDisplacement, self.Loads )
-                MemberForceLocalAll.append(MemberForceLocal)
-
-            return MemberForceLocalAll
-
-        return MemberForce
+        # one member only copies its own row of the cached array
+        Cache = self.AnalysisCache()
+        if "MemberForceLocalAll" not in Cache:
+            self.MemberForceLocalAll()
+        return Cache["MemberForceLocalAll"][self.MemberNo-1].copy()
     
     def MemberForceGlobal(self,MemberNumber):
         
@@ -167,15 +209,14 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
         
         # Initialize abcd1 with NumPy for vector operations
         abcd1 = np.zeros(FEDivision)
+        amp_values = np.linspace(0, length, FEDivision)
         
         # Process loads using vectorization
-        for load in self.Loads:
-            if int(load.AssignedTo.split()[1]) == MemberNo:
-                free_moment = np.array(load.EquivalentLoad()['FreeMoment'][:FEDivision])
-                abcd1 += free_moment if alpha >= 0 else -free_moment
+        for load in self.MemberLoads().get(MemberNo - 1, []):
+            free_moment = np.array(load.FreeMoment(amp_values))
+            abcd1 += free_moment if alpha >= 0 else -free_moment
         
         # Vectorized calculation of abcd2 (linear moment component)
-        amp_values = np.linspace(0, length, FEDivision)
         abcd2 = (amp_values / length) * (-fem2 - fem1) + fem1
         
         # Combine fixed end moments and linear component
@@ -213,10 +254,9 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
         length = member.length()
 
         if DisplacementDict == None:
-            Displacement = self.DisplacementVector()
-            DisplacementDict = Computer.ModelDisplacementList_To_Dict(Displacement, self.UnConstrainedDoF, self.TotalDoF)
-
-        MemberDisplacementGlobal = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber, DisplacementDict, self.Members)
+            MemberDisplacementGlobal = self.MemberDisplacementAll()[MemberNo-1]
+        else:
+            MemberDisplacementGlobal = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber, DisplacementDict, self.Members)
         MemberDisplacementLocal = np.dot((self.Members[MemberNumber-1].Transformation_Matrix()),MemberDisplacementGlobal)
         self.DeflectionPosition, BeamDisplacement = Computer.Qudaratic_Interpolate_Displacements(MemberDisplacementLocal, length, FEDivision, ScaleFactor)
         
@@ -467,8 +507,6 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
             computer_instance.PlotStructuralElements(ax,self.Members, self.Points, ShowNodeNumber = False)
         
         DisplacementList = self.DisplacementVector()
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(DisplacementList, self.UnConstrainedDoF, self.TotalDoF)
-
 
         # Determine global maximum absolute deflection for scaling
         max_abs_deflection = max(DisplacementList)
@@ -482,7 +520,7 @@ class FirstOrderMemberResponse(FirstOrderGlobalResponse):
             L = member.length()
             
             # Get Deflection values and positions
-            deflections = self.MemberDeflection(member_idx+1, scale_factor, DisplacementDict = DisplacementDict)
+            deflections = self.MemberDeflection(member_idx+1, scale_factor)
             positions = self.DeflectionPosition
             
             # Calculate member orientation
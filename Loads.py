@@ -2,11 +2,31 @@ import numpy as np
 
 try:
     from config import config
+    from StructuralElements import TrackedSetAttr, TrackedBy
 except:
     from .config import config
+    from .StructuralElements import TrackedSetAttr, TrackedBy
 
 class NeumanBC():
     
+    TrackedAttributes = ("type", "Magnitude", "Distance1", "Distance2", "AssignedTo", "Members", "MemberNo")
+
+    def __setattr__(self, name, value):
+        TrackedSetAttr(self, name, value, NeumanBC.TrackedAttributes)
+
+    def Revision(self):
+        """ Stamp of the last change of the load or of the member it is assigned to """
+        Revision = self.__dict__.get("_Revision", 0)
+        if self.Members is None:
+            return Revision
+        return max(Revision, self.Members[self.MemberNo].Revision())
+
+    def Track(self, model):
+        """ Notifies model of every change of the load or of the member it is assigned to """
+        TrackedBy(self, model)
+        if self.Members is not None:
+            self.Members[self.MemberNo].Track(model)
+
     def __init__(self,**kwargs):
         self.type = kwargs.get("type", None)
         self.Magnitude = kwargs.get("Magnitude", None)
@@ -17,75 +37,111 @@ class NeumanBC():
         
         self.MemberNo = int(self.AssignedTo.split()[1])-1
     
-    def EquivalentLoad(self, ReturnLocal = False):
-        
-        FEDivision = config.get_FEDivision()
-        self.frml=[] # Free moment Distribution(Simply supported) along beam 
-        tarea=0
-        tyda=0
-        mp=0
+    def FreeMomentIntegrals(self, Length = None):
+        """
+        Simple support reactions (va, vb) and the exact area A = integral of m dx and first moment
+        Ac = integral of x*m dx of the free (simply supported) moment distribution m along the member.
+        m is piecewise linear for a PL and piecewise quadratic for a partial UDL, so the integrals are closed form.
+        Length overrides the member length (the load positions stay fixed).
+        """
+        L = self.Members[self.MemberNo].length() if Length is None else Length
+        a = self.Distance1
         if self.type == "PL" :
-            va=-self.Magnitude*(self.Members[self.MemberNo].length()-self.Distance1)/(self.Members[self.MemberNo].length())
-            vb=-self.Magnitude*self.Distance1/(self.Members[self.MemberNo].length())
-            while mp<=self.Members[self.MemberNo].length():
-                if mp > self.Distance1 :
-                    mppl=(self.Magnitude)*(mp-self.Distance1)
-                else:
-                    mppl=0
-                m=va*mp+mppl
-                area=m*(self.Members[self.MemberNo].length()/FEDivision)
-                yda=area*mp
-                tarea=area+tarea
-                tyda=yda+tyda
-                self.frml.append(m)
-                mp=mp+(self.Members[self.MemberNo].length()/FEDivision)
-            if(tarea==0):
-                centroid=0
-            else:
-                centroid=tyda/tarea
-            
+            P = self.Magnitude
+            va=-P*(L-a)/L
+            vb=-P*a/L
+            # m = va*x + P*(x-a) for x > a
+            A = va*L**2/2 + P*(L-a)**2/2
+            Ac = va*L**3/3 + P*((L**3-a**3)/3 - a*(L**2-a**2)/2)
+
         elif self.type == "UDL" :
             self.Range = abs(self.Distance2 - self.Distance1)
-            va=-self.Magnitude*self.Range*(self.Members[self.MemberNo].length()-self.Distance1-self.Range*0.5)/(self.Members[self.MemberNo].length())
-            vb=-self.Magnitude*self.Range*(self.Distance1+self.Range*0.5)/(self.Members[self.MemberNo].length())
-            while mp<=self.Members[self.MemberNo].length():
-                if(mp>self.Distance1 and mp<=(self.Distance1+self.Range)):
-                    mpu=self.Magnitude*0.5*(mp-self.Distance1)**2
-                elif(mp>(self.Distance1+self.Range) and mp<self.Members[self.MemberNo].length()):
-                    mpu=self.Magnitude*self.Range*(self.Range*0.5+(mp-(self.Distance1+self.Range)))
-                else:
-                    mpu=0
-                m=va*mp+mpu
-                area=m*(self.Members[self.MemberNo].length()/FEDivision)
-                yda=area*mp
-                tarea=area+tarea
-                tyda=yda+tyda
-                self.frml.append(m)
-                mp=mp+(self.Members[self.MemberNo].length()/FEDivision)
-            if(tarea==0):
-                centroid=0
-            else:
-                centroid=tyda/tarea
-        
+            w = self.Magnitude
+            r = self.Range
+            b = a + r
+            va=-w*r*(L-a-r*0.5)/L
+            vb=-w*r*(a+r*0.5)/L
+            # m = va*x + w*(x-a)**2/2 for a < x <= b and va*x + w*r*(x-(a+b)/2) for x > b
+            A = va*L**2/2 + w*r**3/6 + w*r*(L-b)*((L+b)/2 - (a+b)/2)
+            Ac = (va*L**3/3 + w/2*(r**4/4 + a*r**3/3)
+                  + w*r*((L**3-b**3)/3 - (a+b)/2*(L**2-b**2)/2))
+
         else:
             raise ValueError(f"Unsupported load type: '{self.type}'")
-        
-        self.mfab=-((2*(tarea*(self.Members[self.MemberNo].length()-centroid)*6/self.Members[self.MemberNo].length()/self.Members[self.MemberNo].length())-(tarea*centroid*6/self.Members[self.MemberNo].length()/self.Members[self.MemberNo].length()))/3)
-        self.mfba=(2*(tarea*centroid*6/self.Members[self.MemberNo].length()/self.Members[self.MemberNo].length())-(tarea*(self.Members[self.MemberNo].length()-centroid)*6/self.Members[self.MemberNo].length()/self.Members[self.MemberNo].length()))/3
 
-        self.V_b=-(-self.mfab-self.mfba+vb*self.Members[self.MemberNo].length())/self.Members[self.MemberNo].length()
-        self.V_a=-(self.mfab+self.mfba+va*self.Members[self.MemberNo].length())/self.Members[self.MemberNo].length()
-        
-        LocalFixedEndForce = [0, self.V_a, self.mfab, 0, self.V_b, self.mfba]
-        GlobalFixedEndForce = np.dot(np.transpose(self.Members[self.MemberNo].Transformation_Matrix()), LocalFixedEndForce) 
+        return va, vb, A, Ac
+
+    def FreeMoment(self, Positions = None):
+        """
+        Free (simply supported) moment distribution along the member, only evaluated when a diagram needs it.
+        Positions defaults to config.FEDivision equally spaced points from 0 to the member length.
+        """
+        L = self.Members[self.MemberNo].length()
+        if Positions is None:
+            Positions = np.linspace(0, L, config.get_FEDivision())
+        x = np.asarray(Positions, dtype=float)
+        va, vb, A, Ac = self.FreeMomentIntegrals()
+        a = self.Distance1
+
+        if self.type == "PL" :
+            m = va*x + np.where(x > a, self.Magnitude*(x-a), 0)
+        else:
+            r = self.Range
+            b = a + r
+            m = va*x + np.where((x > a) & (x <= b), self.Magnitude*0.5*(x-a)**2,
+                                np.where(x > b, self.Magnitude*r*(r*0.5 + (x-b)), 0))
+
+        self.frml = m.tolist() # Free moment Distribution(Simply supported) along beam
+        return self.frml
+
+    def EquivalentLoad(self, ReturnLocal = False):
+        """
+        Local fixed end forces (ReturnLocal = True) or the global equivalent nodal loads with their DoF numbers.
+        Both are kept on the load until the load, its member or the member end nodes change (Revision).
+        """
+        Revision = self.Revision()
+        Cache = self.__dict__.get("_EquivalentLoadCache")
+        if Cache is None or Cache[0] != Revision:
+            Cache = (Revision,) + self.ComputeEquivalentLoad()
+            self._EquivalentLoadCache = Cache
 
         if ReturnLocal == True:
-            return LocalFixedEndForce
+            return list(Cache[1])
+        return dict(Cache[2])
+
+    def LocalFixedEndForce(self, Length = None):
+        """ Local equivalent end loads [0, Va, Ma, 0, Vb, Mb], Length overrides the member length """
+        L = self.Members[self.MemberNo].length() if Length is None else Length
+        va, vb, tarea, tyda = self.FreeMomentIntegrals(L)
+
+        # fixed end moments from the area and first moment of the free moment diagram
+        mfab=-(2/L**2)*(2*L*tarea - 3*tyda)
+        mfba=(2/L**2)*(3*tyda - L*tarea)
+
+        # end shears: simple support reaction plus the shear that balances the two fixed end moments
+        V_b=-(mfab+mfba+vb*L)/L
+        V_a=-(-mfab-mfba+va*L)/L
+        return [0, V_a, mfab, 0, V_b, mfba]
+
+    def LocalFixedEndForceLengthDerivative(self):
+        """
+        Derivative of LocalFixedEndForce with respect to the member length at fixed load positions. The
+        closed form expressions are evaluated at a complex step L + ih, which gives the exact derivative
+        without subtractive cancellation.
+        """
+        h = 1e-30 * max(self.Members[self.MemberNo].length(), 1.0)
+        return np.imag(np.array(self.LocalFixedEndForce(self.Members[self.MemberNo].length() + 1j * h), dtype=complex)) / h
+
+    def ComputeEquivalentLoad(self):
         
-        return {"Ha":(GlobalFixedEndForce[0],self.Members[self.MemberNo].DoFNumber()[0]),
-                "Va":(GlobalFixedEndForce[1],self.Members[self.MemberNo].DoFNumber()[1]),
-                "Ma":(GlobalFixedEndForce[2],self.Members[self.MemberNo].DoFNumber()[2]),
-                "Hb":(GlobalFixedEndForce[3],self.Members[self.MemberNo].DoFNumber()[3]),
-                "Vb":(GlobalFixedEndForce[4],self.Members[self.MemberNo].DoFNumber()[4]),
-                "Mb":(GlobalFixedEndForce[5],self.Members[self.MemberNo].DoFNumber()[5]),
-                "FreeMoment": self.frml}#[self.V_a,self.mfab,self.V_b,self.mfba]
+        LocalFixedEndForce = self.LocalFixedEndForce()
+        _, self.V_a, self.mfab, _, self.V_b, self.mfba = LocalFixedEndForce
+        GlobalFixedEndForce = np.dot(np.transpose(self.Members[self.MemberNo].Transformation_Matrix()), LocalFixedEndForce) 
+
+        DoFNumber = self.Members[self.MemberNo].DoFNumber()
+        return LocalFixedEndForce, {"Ha":(GlobalFixedEndForce[0],DoFNumber[0]),
+                                   "Va":(GlobalFixedEndForce[1],DoFNumber[1]),
+                                   "Ma":(GlobalFixedEndForce[2],DoFNumber[2]),
+                                   "Hb":(GlobalFixedEndForce[3],DoFNumber[3]),
+                                   "Vb":(GlobalFixedEndForce[4],DoFNumber[4]),
+                                   "Mb":(GlobalFixedEndForce[5],DoFNumber[5])}
@@ -11,17 +11,20 @@ import matplotlib.pyplot as plt
 from scipy.linalg import eig
 #import importlib
 import math
+import weakref
 import scipy.sparse as sp
 from scipy.sparse.linalg import eigs, cg
 from scipy.sparse import csc_matrix
 
 
 try:
+    from .config import config
     from .Computer import Computer
     from .Functions import max_nested
     from .StructuralElements import Node, Member
     from .Loads import NeumanBC
 except:
+    from config import config
     from Computer import Computer
     from Functions import max_nested
     from StructuralElements import Node, Member
@@ -31,98 +34,358 @@ except:
 #import FiniteElementDivisor
 
 
+class TrackedList(list):
+    """ Points/Members/Loads list of a model, changing it in place empties the analysis cache of the model """
+
+    def __init__(self, Items, Owner):
+        super().__init__(Items)
+        self.Owner = weakref.ref(Owner)
+
+    def Changed(self):
+        Owner = self.Owner()
+        if Owner is not None:
+            Owner.ObjectChanged()
+
+def _TrackedListMethod(Name):
+    def Method(self, *args):
+        Result = getattr(list, Name)(self, *args)
+        self.Changed()
+        return Result
+    return Method
+
+for _Name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(TrackedList, _Name, _TrackedListMethod(_Name))
+
+
 class Model():
     
+    TrackedLists = ("Points", "Members", "Loads")
+
+    def __setattr__(self, name, value):
+        if name in Model.TrackedLists:
+            if value is not None:
+                value = TrackedList(value, self)
+            self.ObjectChanged()
+        object.__setattr__(self, name, value)
+
     def __init__(self,**kwargs):
         
         self.Points = kwargs.get("Points", None)
         self.Members = kwargs.get("Members", None)
         self.Loads = kwargs.get("Loads", None)
         self.NoMembers = len(self.Members)
+        self.Sparse = kwargs.get("Sparse", False)
+        self.Solver = kwargs.get("Solver", "LU")
+        # Named load cases {"Dead": [NeumanBC, ...]} and factored combinations {"ULS": {"Dead": 1.35, "Live": 1.5}}
+        self.LoadCases = kwargs.get("LoadCases", None)
+        self.LoadCombinations = kwargs.get("LoadCombinations", None)
+        # P-Delta iteration control of the second order analysis
+        self.PDeltaMaxIterations = kwargs.get("PDeltaMaxIterations", 20)
+        self.PDeltaTolerance = kwargs.get("PDeltaTolerance", 1e-6)
+        self.PDeltaAcceleration = kwargs.get("PDeltaAcceleration", None)
+        self.PDeltaWarmStart = kwargs.get("PDeltaWarmStart", False)
+        # Second order member matrices, "Linearized" (McGuire & Gallagher) or "Exact" (stability functions)
+        self.SecondOrderElement = kwargs.get("SecondOrderElement", "Linearized")
+        # Mass formulation of the dynamic analyses, "Consistent" or "Lumped" (diagonal)
+        self.MassType = kwargs.get("MassType", "Consistent")
+        # Condense the interior nodes of FE-divided members into superelements before the first order solve
+        self.Condensation = kwargs.get("Condensation", False)
+        # Equation renumbering before the factorization, None, "RCM" (banded solvers) or "NestedDissection"
+        self.Renumbering = kwargs.get("Renumbering", None)
+        if self.Loads is None and self.LoadCases is not None:
+            self.Loads = [load for CaseLoads in self.LoadCases.values() for load in CaseLoads]
     
-    def UnConstrainedDoF(self):
-        UnConstrainedDoFList=[]
-        ConstrainedDoFList=[]
+    def AnalysisCache(self):
+        """
+        Per model store for assembled matrices, factorizations and results. It is emptied as soon as a
+        node, member or load of this model changes (they notify the model, see ObjectChanged), the
+        Points/Members/Loads lists are replaced or changed in place, the load cases/combinations are replaced,
+        or the Sparse/Solver/Condensation/SecondOrderElement/Renumbering options are changed.
+        Changes of other models never touch this cache. Checking it is O(1), so cached results are lookups.
+        """
+        Revision = (id(self.LoadCases), id(self.LoadCombinations),
+                    self.Sparse, self.Solver, self.Condensation, self.SecondOrderElement, self.Renumbering)
+        Cache = self.__dict__.get("_AnalysisCache")
+        if Cache is None or Cache["Revision"] != Revision:
+            Cache = {"Revision": Revision}
+            for obj in [*self.Points, *self.Members, *(self.Loads if self.Loads is not None else [])]:
+                obj.Track(self)
+            self._AnalysisCache = Cache
+        return Cache
+
+    def ObjectChanged(self):
+        """ Empties the analysis cache, called when a tracked node, member or load or a tracked list changes """
+        self.__dict__.pop("_AnalysisCache", None)
+
+    # Free and restrained DoFs of a node for every support condition, in the order they are numbered
+    SupportDoF = {"Hinged Support":          (("dof_tita",),                   ("dof_x", "dof_y")),
+                  "Fixed Support":           ((),                              ("dof_x", "dof_y", "dof_tita")),
+                  "Roller in X-plane":       (("dof_x", "dof_tita"),           ("dof_y",)),
+                  "Roller in Y-plane":       (("dof_y", "dof_tita"),           ("dof_x",)),
+                  "Glided Support":          ((),                              ("dof_x", "dof_tita")),
+                  "Hinge Joint":             (("dof_x", "dof_y", "dof_tita"),  ()),
+                  "Hinged Joint Support":    (("dof_tita",),                   ("dof_x", "dof_y")),
+                  "Roller in X-plane-Hinge": (("dof_tita", "dof_x"),           ("dof_y",)),
+                  "Rigid Joint":             (("dof_x", "dof_y", "dof_tita"),  ())}
+    DoFDirection = {"dof_x": 0, "dof_y": 1, "dof_tita": 2}
+
+    def DoFPartition(self):
+        """
+        Splits the DoFs into free (UnConstrained) and restrained (Constrained) ones once per model revision.
+        Equations are numbered free DoFs first, then restrained DoFs (the TotalDoF order).
+        Returns a dict of NumPy arrays:
+            UnConstrainedDoF, ConstrainedDoF, TotalDoF - DoF numbers
+            NumFree        - number of free DoFs
+            EquationIndex  - DoF number -> equation number, -1 for DoFs without an equation
+            MemberDoF      - (M, 6) DoF numbers of every member
+            MemberEquation - (M, 6) equation numbers of every member, free if < NumFree
+            Direction      - 0 (x), 1 (y) or 2 (rotation) of every DoF in TotalDoF order
+        """
+        Cache = self.AnalysisCache()
+        if "DoFPartition" in Cache:
+            return Cache["DoFPartition"]
+
+        UnConstrainedDoFList = []
+        ConstrainedDoFList = []
+        UnConstrainedDirection = []
+        ConstrainedDirection = []
         for node in self.Points:
-            if node.support_condition=="Hinged Support" :
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Fixed Support" :
-                pass
-            
-            if node.support_condition=="Roller in X-plane" :
-                UnConstrainedDoFList.append(node.dof_x)
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Roller in Y-plane" :
-                UnConstrainedDoFList.append(node.dof_y)
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Glided Support" :
-                ConstrainedDoFList.append(node.dof_x)
-                ConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Hinge Joint" :
-                UnConstrainedDoFList.append(node.dof_x)
-                UnConstrainedDoFList.append(node.dof_y)
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Hinged Joint Support" :
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Roller in X-plane-Hinge" :
-                UnConstrainedDoFList.append(node.dof_tita)
-                UnConstrainedDoFList.append(node.dof_x)
-                
-            if(node.support_condition=="Rigid Joint"):
-                UnConstrainedDoFList.append(node.dof_x)
-                UnConstrainedDoFList.append(node.dof_y)
-                UnConstrainedDoFList.append(node.dof_tita)
-                
-            else:
-                pass
-        return UnConstrainedDoFList
+            Free, Restrained = Model.SupportDoF.get(node.support_condition, ((), ()))
+            UnConstrainedDoFList.extend(getattr(node, dof) for dof in Free)
+            ConstrainedDoFList.extend(getattr(node, dof) for dof in Restrained)
+            UnConstrainedDirection.extend(Model.DoFDirection[dof] for dof in Free)
+            ConstrainedDirection.extend(Model.DoFDirection[dof] for dof in Restrained)
+
+        UnConstrained = np.array(UnConstrainedDoFList, dtype=int)
+        Constrained = np.array(ConstrainedDoFList, dtype=int)
+        Total = np.concatenate([UnConstrained, Constrained])
+        MemberDoF = np.array([member.DoFNumber() for member in self.Members], dtype=int).reshape(-1, 6)
+
+        EquationIndex = np.full(max(Total.max(initial=0), MemberDoF.max(initial=0)) + 1, -1, dtype=int)
+        EquationIndex[Total] = np.arange(len(Total))
+
+        Cache["DoFPartition"] = {"UnConstrainedDoF": UnConstrained,
+                                 "ConstrainedDoF": Constrained,
+                                 "TotalDoF": Total,
+                                 "NumFree": len(UnConstrained),
+                                 "EquationIndex": EquationIndex,
+                                 "MemberDoF": MemberDoF,
+                                 "MemberEquation": EquationIndex[MemberDoF],
+                                 "Direction": np.array(UnConstrainedDirection + ConstrainedDirection, dtype=int)}
+        return Cache["DoFPartition"]
+
+    def MemberEquationIndex(self, Condensed = True):
+        """ (M, 6) equation numbers of the members, restrained DoFs are -1 when Condensed """
+        Partition = self.DoFPartition()
+        MemberEquation = Partition["MemberEquation"].copy()
+        if Condensed:
+            MemberEquation[MemberEquation >= Partition["NumFree"]] = -1
+        return MemberEquation
+
+    def FullDisplacementVector(self, Displacement):
+        """ Displacement of the free DoFs expanded to all DoFs (TotalDoF order), restrained DoFs are zero """
+        return Computer.ModelDisplacementList_To_Array(Displacement, len(self.DoFPartition()["TotalDoF"]))
+
+    def MemberDisplacementArray(self, Displacement):
+        """ (M, 6) global end displacements of all members from the displacement of the free DoFs """
+        return Computer.ModelDisplacement_To_MemberDisplacementArray(self.FullDisplacementVector(Displacement), self.DoFPartition()["MemberEquation"])
+
+    def FixedEndForceArray(self):
+        """ (M, 6) local fixed end forces of all members, summed over the loads once per model revision """
+        Cache = self.AnalysisCache()
+        if "FixedEndForce" not in Cache:
+            Cache["FixedEndForce"] = Computer.FixedEndForceArray(self.Members, self.Loads)
+        return Cache["FixedEndForce"]
+
+    def MemberLoads(self):
+        """ Member index -> list of the loads assigned to that member, built once per model revision """
+        Cache = self.AnalysisCache()
+        if "MemberLoads" not in Cache:
+            MemberLoads = {}
+            for load in self.Loads:
+                MemberLoads.setdefault(int(load.AssignedTo.split()[1]) - 1, []).append(load)
+            Cache["MemberLoads"] = MemberLoads
+        return Cache["MemberLoads"]
+
+    def AssemblyPattern(self, Condensed = True):
+        """ Symbolic assembly (CSR pattern and scatter map) of the free or all DoFs, built once per model revision """
+        Cache = self.AnalysisCache()
+        if ("AssemblyPattern", Condensed) not in Cache:
+            DoF = self.UnConstrainedDoF() if Condensed else self.TotalDoF()
+            Cache[("AssemblyPattern", Condensed)] = Computer.SymbolicAssembly(DoF, self.Members, self.MemberEquationIndex(Condensed = Condensed))
+        return Cache[("AssemblyPattern", Condensed)]
+
+    def EquationPermutation(self):
+        """
+        Permutation of the free equations for the factorizations (Computer.EquationOrdering with the
+        Renumbering option), None without renumbering. The DoF partition and all result vectors keep the
+        node order, only the factorized matrix is renumbered.
+        """
+        if not self.Renumbering:
+            return None
+        Cache = self.AnalysisCache()
+        if "EquationPermutation" not in Cache:
+            Pattern = self.AssemblyPattern()
+            Graph = sp.csr_matrix((np.ones(Pattern["nnz"]), Pattern["indices"], Pattern["indptr"]), shape = Pattern["shape"])
+            Cache["EquationPermutation"] = Computer.EquationOrdering(Graph, self.Renumbering)
+        return Cache["EquationPermutation"]
+
+    def RenumberingStatistics(self):
+        """ Bandwidth, profile and factor fill of the free stiffness matrix, {"Before": ..., "After": ...} the renumbering """
+        K = self.GlobalStiffnessMatrixCondensed(Sparse = True)
+        return {"Before": Computer.BandwidthStatistics(K),
+                "After": Computer.BandwidthStatistics(K, self.EquationPermutation())}
+
+    def SuperelementChains(self):
+        """
+        Chains of members joined by interior nodes, built once per model revision. A node is interior if it
+        is a Rigid Joint with exactly two collinear members, as the nodes inserted by divide_into_finite_elements.
+        Returns a dict with
+            Groups - chain length n -> dict of (G, n) Members indices, (G, n) Reversed flags (member runs
+                     against the chain direction) and (G, n - 1) Interior node indices, in chain order
+            Plain  - members without interior nodes
+        """
+        Cache = self.AnalysisCache()
+        if "SuperelementChains" in Cache:
+            return Cache["SuperelementChains"]
+
+        NodeIndex = {id(node): i for i, node in enumerate(self.Points)}
+        Ends = [(NodeIndex[id(member.Start_Node)], NodeIndex[id(member.End_Node)]) for member in self.Members]
+        Incident = [[] for _ in self.Points]
+        for mn, (i, j) in enumerate(Ends):
+            Incident[i].append(mn)
+            Incident[j].append(mn)
+
+        Prop = Computer.MemberPropertyArrays(self.Members)
+        Interior = np.array([node.support_condition == "Rigid Joint" and len(Incident[i]) == 2
+                             and abs(Prop["cos"][Incident[i][0]] * Prop["sin"][Incident[i][1]]
+                                     - Prop["sin"][Incident[i][0]] * Prop["cos"][Incident[i][1]]) < 1e-9
+                             for i, node in enumerate(self.Points)], dtype=bool)
+
+        Visited = np.zeros(len(self.Members), dtype=bool)
+        Chains = []
+        def Walk(Start):
+            for mn in Incident[Start]:
+                if Visited[mn]:
+                    continue
+                Chain, Node = [], Start
+                while True:
+                    Visited[mn] = True
+                    Reversed = Ends[mn][0] != Node
+                    Node = Ends[mn][0] if Reversed else Ends[mn][1]
+                    Chain.append((mn, Reversed, Node))
+                    if not Interior[Node]:
+                        break
+                    mn = Incident[Node][0] if Incident[Node][1] == mn else Incident[Node][1]
+                Chains.append(Chain)
+
+        for i in np.flatnonzero(~Interior):
+            Walk(i)
+        # closed loops of interior nodes only: one of their nodes becomes a chain end
+        while not Visited.all():
+            Start = Ends[int(np.flatnonzero(~Visited)[0])][0]
+            Interior[Start] = False
+            Walk(Start)
+
+        Groups = {}
+        Plain = []
+        for Chain in Chains:
+            if len(Chain) == 1:
+                Plain.append(Chain[0][0])
+                continue
+            Group = Groups.setdefault(len(Chain), {"Members": [], "Reversed": [], "Interior": []})
+            Group["Members"].append([mn for mn, _, _ in Chain])
+            Group["Reversed"].append([Reversed for _, Reversed, _ in Chain])
+            Group["Interior"].append([Node for _, _, Node in Chain[:-1]])
+        Cache["SuperelementChains"] = {"Groups": {n: {Name: np.array(Value) for Name, Value in Group.items()} for n, Group in Groups.items()},
+                                       "Plain": np.array(Plain, dtype=int)}
+        return Cache["SuperelementChains"]
+
+    def SuperelementFactorization(self):
+        """
+        Condenses every chain of SuperelementChains into a 6 x 6 superelement (Computer.ChainCondensation),
+        assembles them with the plain members over the free DoFs of the chain end nodes only and factorizes
+        that reduced stiffness matrix once per model revision. Returns a dict with the Solve function,
+        NumEquations of the reduced system and the per group condensation data used by SuperelementSolve.
+        """
+        Cache = self.AnalysisCache()
+        if "SuperelementFactorization" in Cache:
+            return Cache["SuperelementFactorization"]
+
+        Partition = self.DoFPartition()
+        NumFree = Partition["NumFree"]
+        Chains = self.SuperelementChains()
+        ElementMatrices = Computer.ElementMatrixTensor(self.Members, "First_Order_Global_Stiffness_Matrix_1")
+        MemberEquation = np.where(Partition["MemberEquation"] < NumFree, Partition["MemberEquation"], -1)
+        Swap = [3, 4, 5, 0, 1, 2]
+
+        # free equations of the interior nodes drop out of the global system
+        ReducedIndex = np.zeros(NumFree, dtype=int)
+        Groups = []
+        Matrices = [ElementMatrices[Chains["Plain"]]]
+        Equations = [MemberEquation[Chains["Plain"]]]
+        for n, Group in Chains["Groups"].items():
+            Reversed = Group["Reversed"]
+            Oriented = ElementMatrices[Group["Members"]]
+            Oriented[Reversed] = Oriented[Reversed][:, Swap][:, :, Swap]
+            Condensation = Computer.ChainCondensation(Oriented)
+
+            First, Last = Group["Members"][:, 0], Group["Members"][:, -1]
+            FirstEquation = np.where(Reversed[:, :1], MemberEquation[First][:, Swap], MemberEquation[First])
+            LastEquation = np.where(Reversed[:, -1:], MemberEquation[Last][:, Swap], MemberEquation[Last])
+            InteriorDoF = np.array([self.Points[i].DoF() for i in Group["Interior"].ravel()], dtype=int).reshape(len(First), n - 1, 3)
+            InteriorEquation = Partition["EquationIndex"][InteriorDoF]
+            ReducedIndex[InteriorEquation] = -1
+
+            Groups.append({"Condensation": Condensation, "InteriorEquation": InteriorEquation,
+                           "EndEquation": np.concatenate([FirstEquation[:, :3], LastEquation[:, 3:]], axis=1)})
+            Matrices.append(Condensation["Stiffness"])
+            Equations.append(Groups[-1]["EndEquation"])
+        Boundary = np.flatnonzero(ReducedIndex == 0)
+        ReducedIndex[Boundary] = np.arange(len(Boundary))
+
+        Equations = np.concatenate(Equations)
+        Reduced = np.where(Equations >= 0, ReducedIndex[np.clip(Equations, 0, None)] if NumFree else -1, -1)
+        rows, cols, values = Computer.AssemblyTriplets(None, None, np.concatenate(Matrices), Reduced)
+        K = sp.coo_matrix((values, (rows, cols)), shape = (len(Boundary), len(Boundary))).tocsc()
+
+        Cache["SuperelementFactorization"] = {"Solve": Computer.Factorize(K, self.Solver), "NumEquations": len(Boundary),
+                                              "Boundary": Boundary, "ReducedIndex": ReducedIndex, "Groups": Groups}
+        return Cache["SuperelementFactorization"]
+
+    def SuperelementSolve(self, ForceVector):
+        """
+        Displacements of all free DoFs for the load vector of the free DoFs: the interior loads are condensed
+        onto the chain ends, the reduced system is solved with the SuperelementFactorization and the interior
+        displacements are recovered chain by chain by back substitution.
+        """
+        Superelements = self.SuperelementFactorization()
+        ForceVector = np.asarray(ForceVector, dtype=float)
+        ReducedIndex = Superelements["ReducedIndex"]
+
+        ReducedForce = ForceVector[Superelements["Boundary"]].copy()
+        Particulars = []
+        for Group in Superelements["Groups"]:
+            EndLoad, Particular = Computer.ChainLoadCondensation(Group["Condensation"], ForceVector[Group["InteriorEquation"]])
+            Free = Group["EndEquation"] >= 0
+            np.add.at(ReducedForce, ReducedIndex[Group["EndEquation"][Free]], EndLoad[Free])
+            Particulars.append(Particular)
+
+        # one trailing zero so that restrained chain ends (-1) read a zero displacement
+        Displacement = np.zeros(len(ForceVector) + 1)
+        Displacement[Superelements["Boundary"]] = Superelements["Solve"](ReducedForce)
+        for Group, Particular in zip(Superelements["Groups"], Particulars):
+            Displacement[Group["InteriorEquation"]] = Computer.ChainRecovery(Group["Condensation"], Particular, Displacement[Group["EndEquation"]])
+        return Displacement[:-1]
+
+    def UnConstrainedDoF(self):
+        return self.DoFPartition()["UnConstrainedDoF"].tolist()
         
     def ConstrainedDoF(self):
-        ConstrainedDoFList=[]
-        for node in self.Points:
-            if node.support_condition=="Hinged Support" :
-                ConstrainedDoFList.append(node.dof_x)
-                ConstrainedDoFList.append(node.dof_y)
-                
-            if node.support_condition=="Fixed Support" :
-                ConstrainedDoFList.append(node.dof_x)
-                ConstrainedDoFList.append(node.dof_y)
-                ConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Roller in X-plane" :
-                ConstrainedDoFList.append(node.dof_y)
-                
-            if node.support_condition=="Roller in Y-plane" :
-                ConstrainedDoFList.append(node.dof_x)
-                
-            if node.support_condition=="Glided Support" :
-                ConstrainedDoFList.append(node.dof_x)
-                ConstrainedDoFList.append(node.dof_tita)
-                
-            if node.support_condition=="Hinge Joint" :
-                pass
-            
-            if node.support_condition=="Hinged Joint Support" :
-                ConstrainedDoFList.append(node.dof_x)
-                ConstrainedDoFList.append(node.dof_y)
-                
-            if node.support_condition=="Roller in X-plane-Hinge" :
-                ConstrainedDoFList.append(node.dof_y)
-                
-            if node.support_condition=="Rigid Joint" :
-                pass
-            else:
-                pass
-        return ConstrainedDoFList
+        return self.DoFPartition()["ConstrainedDoF"].tolist()
     
     def TotalDoF(self):
-        return self.UnConstrainedDoF() + self.ConstrainedDoF()
+        return self.DoFPartition()["TotalDoF"].tolist()
     
     def UnConstrainedDoFDict(self):
         return {num: 0 for num in self.UnConstrainedDoF()}
@@ -130,46 +393,96 @@ class Model():
     def TotalDoFDict(self):
         return {num: 0 for num in self.TotalDoF()}
     
-    def GlobalStiffnessMatrix(self):
+    def GlobalStiffnessMatrix(self, Sparse = None):
        
-        C1 = Computer.StiffnessMatrixAssembler(self.TotalDoF(), self.Members, "First_Order_Global_Stiffness_Matrix_1")
+        if Sparse is None:
+            Sparse = self.Sparse
+        C1 = Computer.StiffnessMatrixAssembler(self.TotalDoF(), self.Members, "First_Order_Global_Stiffness_Matrix_1", Sparse = Sparse, Pattern = self.AssemblyPattern(Condensed = False))
         return C1
     
-    def GlobalStiffnessMatrixCondensed(self):
+    def GlobalStiffnessMatrixCondensed(self, Sparse = None):
         
-        C1 = Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, "First_Order_Global_Stiffness_Matrix_1")
+        if Sparse is None:
+            Sparse = self.Sparse
+        C1 = Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, "First_Order_Global_Stiffness_Matrix_1", Sparse = Sparse, Pattern = self.AssemblyPattern())
         return C1
     
-    def GlobalStiffnessMatrixCondensedA21(self):
-        C1=[]
-        for Mc in self.ConstrainedDoF():
-            R1=[]
-            for Mr in self.UnConstrainedDoF():
-                y=0
-                for mn in range(0,self.NoMembers):
-                    for mr in range(0,6):
-                        if(self.Members[mn].DoFNumber()[mr]==Mr):
-                            for mc in range(0,6):
-                                if(self.Members[mn].DoFNumber()[mc]==Mc):
-                                    x=self.Members[mn].First_Order_Global_Stiffness_Matrix_1()[mc][mr]
-                                    y=y+x
-                R1.append(y)
-            C1.append(R1)
-        return C1
+    def GlobalStiffnessMatrixCondensedA21(self, Sparse = None):
+        """
+        Restrained rows and free columns (K_RI) of the stiffness matrix, sliced once per model revision from
+        the sparse assembly over all DoFs, whose equations are numbered free DoFs first.
+        """
+        if Sparse is None:
+            Sparse = self.Sparse
+        Cache = self.AnalysisCache()
+        if "StiffnessMatrixA21" not in Cache:
+            NumFree = self.DoFPartition()["NumFree"]
+            Cache["StiffnessMatrixA21"] = self.GlobalStiffnessMatrix(Sparse = True).tocsr()[NumFree:, :NumFree]
+        if Sparse == True:
+            return Cache["StiffnessMatrixA21"].copy()
+        return Cache["StiffnessMatrixA21"].toarray()
+
+    def SupportForceDict(self, SupportForces):
+        """ DoF number (str) -> support force for all DoFs in TotalDoF order, free DoFs carry 0 """
+        Partition = self.DoFPartition()
+        Forces = np.zeros(len(Partition["TotalDoF"]))
+        Forces[Partition["NumFree"]:] = SupportForces
+        return dict(zip(map(str, Partition["TotalDoF"].tolist()), Forces.tolist()))
     
+    def LoadVector(self, Loads):
+        """
+        Equivalent nodal loads of Loads over all DoFs (TotalDoF order). DoFs without an equation (the y DoF
+        of a Glided Support) are not assembled into the stiffness matrix either, their loads are dropped.
+        """
+        Partition = self.DoFPartition()
+        LoadVector = np.zeros(len(Partition["TotalDoF"]))
+        for var1 in Loads:
+            EquivalentLoad = var1.EquivalentLoad()
+            for Component in ("Va", "Vb", "Ha", "Hb", "Ma", "Mb"):
+                Force, DoF = EquivalentLoad[Component]
+                Equation = Partition["EquationIndex"][DoF]
+                if Equation >= 0:
+                    LoadVector[Equation] += Force
+        return LoadVector
+
     def ForceVector(self):
-        self.ForceVectorDict=self.TotalDoFDict()
-        for var1 in self.Loads:
-            self.ForceVectorDict[var1.EquivalentLoad()['Va'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Va'][1]] + var1.EquivalentLoad()['Va'][0]
-            self.ForceVectorDict[var1.EquivalentLoad()['Vb'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Vb'][1]] + var1.EquivalentLoad()['Vb'][0]
-            self.ForceVectorDict[var1.EquivalentLoad()['Ha'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Ha'][1]] + var1.EquivalentLoad()['Ha'][0]
-            self.ForceVectorDict[var1.EquivalentLoad()['Hb'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Hb'][1]] + var1.EquivalentLoad()['Hb'][0]
-            self.ForceVectorDict[var1.EquivalentLoad()['Ma'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Ma'][1]] + var1.EquivalentLoad()['Ma'][0]
-            self.ForceVectorDict[var1.EquivalentLoad()['Mb'][1]] = self.ForceVectorDict[var1.EquivalentLoad()['Mb'][1]] + var1.EquivalentLoad()['Mb'][0]
-        ForceVector = []
-        for var2 in self.UnConstrainedDoF():
-            ForceVector.append(self.ForceVectorDict[var2])
+        Partition = self.DoFPartition()
+        ForceVectorTotal = self.LoadVector(self.Loads)
+        self.ForceVectorDict = dict(zip(Partition["TotalDoF"].tolist(), ForceVectorTotal.tolist()))
+        ForceVector = ForceVectorTotal[:Partition["NumFree"]].tolist()
         return ForceVector
+
+    def LoadCaseNames(self):
+        if self.LoadCases is None:
+            raise ValueError("Model has no LoadCases.")
+        return list(self.LoadCases.keys())
+
+    def LoadCaseForceMatrix(self):
+        """ (n, k) right hand sides of the free DoFs, one column per load case in LoadCaseNames order """
+        Cache = self.AnalysisCache()
+        if "LoadCaseForceMatrix" not in Cache:
+            NumFree = self.DoFPartition()["NumFree"]
+            Cache["LoadCaseForceMatrix"] = np.column_stack([self.LoadVector(self.LoadCases[Name])[:NumFree] for Name in self.LoadCaseNames()]).reshape(NumFree, -1)
+        return Cache["LoadCaseForceMatrix"]
+
+    def LoadCaseFactors(self, Name):
+        """ Factor of every load case (LoadCaseNames order) for a load case or load combination name """
+        Names = self.LoadCaseNames()
+        if Name in self.LoadCases:
+            return np.array([1.0 if Case == Name else 0.0 for Case in Names])
+        if self.LoadCombinations is None or Name not in self.LoadCombinations:
+            raise ValueError(f"Unknown load case or combination: '{Name}'")
+        Unknown = [Case for Case in self.LoadCombinations[Name] if Case not in self.LoadCases]
+        if Unknown:
+            raise ValueError(f"Load combination '{Name}' refers to unknown load cases: {Unknown}")
+        return np.array([float(self.LoadCombinations[Name].get(Case, 0)) for Case in Names])
+
+    def LoadCaseFixedEndForce(self, Name):
+        """ (M, 6) local fixed end forces of a load case or the factored sum for a load combination """
+        Cache = self.AnalysisCache()
+        if "LoadCaseFixedEndForce" not in Cache:
+            Cache["LoadCaseFixedEndForce"] = np.stack([Computer.FixedEndForceArray(self.Members, self.LoadCases[Case]) for Case in self.LoadCaseNames()], axis=-1)
+        return Cache["LoadCaseFixedEndForce"] @ self.LoadCaseFactors(Name)
     
     def PlotGlobalModel(self, sensitivities=None):
         """
@@ -4,6 +4,7 @@ from scipy.linalg import eig
 from scipy.sparse.linalg import eigsh
 #import importlib
 import math
+import time
 import scipy.sparse as sp
 from scipy.sparse.linalg import eigs, cg
 from scipy.sparse import csc_matrix
@@ -27,140 +28,315 @@ except:
 
 class SecondOrderGlobalResponse(Model):
 
+    # Member matrix number of the second order element formulations
+    SecondOrderElements = {"Linearized": 1, "Exact": 3}
+
+    def SecondOrderMatrix(self, Name):
+        """ Member matrix name of the chosen SecondOrderElement, e.g. Second_Order_Local_Stiffness_Matrix_3 for Name "Local_Stiffness_Matrix" """
+        if self.SecondOrderElement not in self.SecondOrderElements:
+            raise ValueError(f"Unknown second order element: '{self.SecondOrderElement}'. Available elements: {list(self.SecondOrderElements)}")
+        return f"Second_Order_{Name}_{self.SecondOrderElements[self.SecondOrderElement]}"
+
     def NormalForce(self):
 
-        NoMem = len(self.Members)
+        Cache = self.AnalysisCache()
+        if "NormalForce" in Cache:
+            return list(Cache["NormalForce"])
 
-        FirstOderDisplacement = Computer.DirectInverseDisplacementSolver(self.GlobalStiffnessMatrixCondensed(),self.ForceVector())
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(FirstOderDisplacement,self.UnConstrainedDoF,self.TotalDoF)
-        NorForList =[]
-        for i in range(NoMem):
-            MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(i+1,DisplacementDict,self.Members)
-            MemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("First_Order_Local_Stiffness_Matrix_1", i+1, self.Members, MemberDisplacement, self.Loads )
-            NorForList.append(MemberForceLocal[0])
+        FirstOderDisplacement = Computer.DisplacementSolver(self.GlobalStiffnessMatrixCondensed(),self.ForceVector(),self.Solver,self.EquationPermutation())
+        MemberForceLocalAll = Computer.MemberDisplacement_To_ForceLocalAll("First_Order_Local_Stiffness_Matrix_1", self.Members, self.MemberDisplacementArray(FirstOderDisplacement), self.Loads,
+                                                                           FixedEndForce = self.FixedEndForceArray())
+        NorForList = MemberForceLocalAll[:, 0].tolist()
 
-        return NorForList
+        Cache["NormalForce"] = NorForList
+        return list(NorForList)
     
-    def SecondOrderGlobalStiffnessMatrix(self, NormalForceList):
-        
-        C1 = Computer.StiffnessMatrixAssembler(self.TotalDoF(), self.Members, "Second_Order_Global_Stiffness_Matrix_1", NormalForceList)
+    def SecondOrderStiffnessOperator(self, Condensed = True):
+        """ K0 and unit geometric matrices on a fixed sparsity pattern, built once per model revision """
+        Cache = self.AnalysisCache()
+        if ("SecondOrderOperator", Condensed) not in Cache:
+            DoF = self.UnConstrainedDoF() if Condensed else self.TotalDoF()
+            Cache[("SecondOrderOperator", Condensed)] = Computer.SecondOrderStiffnessOperator(DoF, self.Members, Pattern = self.AssemblyPattern(Condensed = Condensed))
+        return Cache[("SecondOrderOperator", Condensed)]
+
+    def SecondOrderGlobalStiffnessMatrix(self, NormalForceList, Sparse = None):
+        
+        if Sparse is None:
+            Sparse = self.Sparse
+        if self.SecondOrderElement != "Linearized":
+            return Computer.StiffnessMatrixAssembler(self.TotalDoF(), self.Members, self.SecondOrderMatrix("Global_Stiffness_Matrix"), NormalForceList,
+                                                     Sparse = Sparse, Pattern = self.AssemblyPattern(Condensed = False))
+        C1 = Computer.SecondOrderStiffnessMatrix(self.SecondOrderStiffnessOperator(Condensed = False), NormalForceList, Sparse = Sparse)
         return C1
     
-    def SecondOrderGlobalStiffnessMatrixCondensed(self, NormalForceList):
-
-        C1 = Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, "Second_Order_Global_Stiffness_Matrix_1", NormalForceList)
+    def SecondOrderGlobalStiffnessMatrixCondensed(self, NormalForceList, Sparse = None):
+
+        if Sparse is None:
+            Sparse = self.Sparse
+        if self.SecondOrderElement != "Linearized":
+            # the exact element is not linear in the normal forces, its matrices are assembled for every update
+            return Computer.StiffnessMatrixAssembler(self.UnConstrainedDoF(), self.Members, self.SecondOrderMatrix("Global_Stiffness_Matrix"), NormalForceList,
+                                                     Sparse = Sparse, Pattern = self.AssemblyPattern())
+        C1 = Computer.SecondOrderStiffnessMatrix(self.SecondOrderStiffnessOperator(), NormalForceList, Sparse = Sparse)
         return C1
             
-    def SecondOrderGlobalStiffnessMatrixCondensedA21(self, NormalForceList):
-        C1=[]
-        for Mc in self.ConstrainedDoF():
-            R1=[]
-            for Mr in self.UnConstrainedDoF():
-                y=0
-                for mn in range(0,self.NoMembers):
-                    for mr in range(0,6):
-                        if(self.Members[mn].DoFNumber()[mr]==Mr):
-                            for mc in range(0,6):
-                                if(self.Members[mn].DoFNumber()[mc]==Mc):
-                                    x=self.Members[mn].Second_Order_Global_Stiffness_Matrix_1(NormalForceList[mn])[mc][mr]
-                                    y=y+x
-                R1.append(y)
-            C1.append(R1)
-        return C1
+    def SecondOrderGlobalStiffnessMatrixCondensedA21(self, NormalForceList, Sparse = None):
+        """ Restrained rows and free columns of the second order stiffness matrix, sliced from the sparse assembly over all DoFs """
+        if Sparse is None:
+            Sparse = self.Sparse
+        NumFree = self.DoFPartition()["NumFree"]
+        C1 = self.SecondOrderGlobalStiffnessMatrix(NormalForceList, Sparse = True).tocsr()[NumFree:, :NumFree]
+        if Sparse == True:
+            return C1
+        return C1.toarray()
     
-    def DisplacementVector(self, iteration_steps):
-
-        NoMem = len(self.Members)
-
-        #1st iteration
-        FirstOderDisplacement = Computer.DirectInverseDisplacementSolver(self.GlobalStiffnessMatrixCondensed(),self.ForceVector())
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(FirstOderDisplacement,self.UnConstrainedDoF,self.TotalDoF)
-        NorForList =[]
-        for i in range(NoMem):
-            MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(i+1,DisplacementDict,self.Members)
-            MemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("First_Order_Local_Stiffness_Matrix_1", i+1, self.Members, MemberDisplacement, self.Loads )
-            NorForList.append(-MemberForceLocal[0])
-
-        #2nd iteration
+    def DisplacementVector(self, iteration_steps = None, Tolerance = None, Acceleration = None, WarmStart = None, ReturnHistory = False):
+        """
+        P-Delta iteration K(N) u = F with the member normal forces N updated from u after every solve.
+        iteration_steps is the maximum number of second order solves (PDeltaMaxIterations by default); the
+        iteration stops early once the relative change of both N and u is below Tolerance (PDeltaTolerance).
+        Acceleration = "Aitken" applies Irons-Tuck (vector Aitken) relaxation to the normal force update.
+        WarmStart = True starts from the normal forces of the previous analysis of this object instead of
+        the first order solution, if the member count still matches.
+        The convergence history (iterations, residuals, timings) is kept in self.ConvergenceHistory and
+        returned as a second value with ReturnHistory = True.
+        """
+        if iteration_steps is None:
+            iteration_steps = self.PDeltaMaxIterations
+        if Tolerance is None:
+            Tolerance = self.PDeltaTolerance
+        if Acceleration is None:
+            Acceleration = self.PDeltaAcceleration
+        if WarmStart is None:
+            WarmStart = self.PDeltaWarmStart
+        if iteration_steps < 1:
+            raise ValueError("At least one P-Delta iteration is needed.")
+        if Acceleration not in (None, False, "Aitken"):
+            raise ValueError(f"Unknown P-Delta acceleration: '{Acceleration}'")
+
+        Cache = self.AnalysisCache()
+        Key = ("SecondOrderDisplacement", iteration_steps, Tolerance, Acceleration, WarmStart)
+        if Key not in Cache:
+            Cache[Key] = self.PDeltaIteration(iteration_steps, Tolerance, Acceleration, WarmStart)
+            print("2nd order displacement computed")
+
+        SecondOrderDisplacement, NorForList, History = Cache[Key]
+        self.NormalForceList = list(NorForList)
+        self.ConvergenceHistory = dict(History)
+        self._PDeltaState = (len(self.Members), np.array(NorForList))
+        if ReturnHistory == True:
+            return SecondOrderDisplacement.copy(), dict(History)
+        return SecondOrderDisplacement.copy()
+
+    def PDeltaIteration(self, iteration_steps, Tolerance, Acceleration, WarmStart):
+
+        FixedEndForce = self.FixedEndForceArray()
+        ForceVector = self.ForceVector()
+        History = {"Iterations": 0, "Converged": False,
+                   "NormalForceResidual": [], "DisplacementResidual": [], "Time": []}
+
+        #1st iteration, or the normal forces of the previous analysis
+        PreviousState = self.__dict__.get("_PDeltaState")
+        if WarmStart == True and PreviousState is not None and PreviousState[0] == len(self.Members):
+            NorFor = PreviousState[1].copy()
+            Displacement = None
+        else:
+            Displacement = Computer.DisplacementSolver(self.GlobalStiffnessMatrixCondensed(),ForceVector,self.Solver,self.EquationPermutation())
+            MemberForceLocalAll = Computer.MemberDisplacement_To_ForceLocalAll("First_Order_Local_Stiffness_Matrix_1", self.Members, self.MemberDisplacementArray(Displacement), self.Loads,
+                                                                               FixedEndForce = FixedEndForce)
+            NorFor = -MemberForceLocalAll[:, 0]
+
+        #2nd order iterations
+        Omega = 1.0
+        PreviousStep = None
         for j in range(0,iteration_steps):
-
-            SecondOrderDisplacement = Computer.DirectInverseDisplacementSolver(self.SecondOrderGlobalStiffnessMatrixCondensed(NorForList),self.ForceVector())
-            DisplacementDict = Computer.ModelDisplacementList_To_Dict(SecondOrderDisplacement,self.UnConstrainedDoF,self.TotalDoF)
-            
-            NorForList1 = NorForList
-            NorForList=[]
-            for i in range(NoMem):
-                SecondOrderMemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(i+1,DisplacementDict,self.Members)
-                SecondOrderMemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("Second_Order_Local_Stiffness_Matrix_1", i+1, self.Members, SecondOrderMemberDisplacement, self.Loads, NorForList1[i])
-                NorForList.append(-SecondOrderMemberForceLocal[0])
-        
-        self.NormalForceList = NorForList
-        print("2nd order displacement computed")
-        
-        return SecondOrderDisplacement
+            Start = time.perf_counter()
+
+            SecondOrderDisplacement = Computer.DisplacementSolver(self.SecondOrderGlobalStiffnessMatrixCondensed(NorFor.tolist()),ForceVector,self.Solver,self.EquationPermutation())
+            SecondOrderMemberForceLocalAll = Computer.MemberDisplacement_To_ForceLocalAll(self.SecondOrderMatrix("Local_Stiffness_Matrix"), self.Members, self.MemberDisplacementArray(SecondOrderDisplacement), self.Loads,
+                                                                                          NormalForce = NorFor, FixedEndForce = FixedEndForce)
+            Step = -SecondOrderMemberForceLocalAll[:, 0] - NorFor
+
+            # Irons-Tuck relaxation factor from two consecutive normal force updates
+            if Acceleration == "Aitken" and PreviousStep is not None:
+                StepChange = Step - PreviousStep
+                if np.dot(StepChange, StepChange) > 0:
+                    Omega = -Omega * np.dot(PreviousStep, StepChange) / np.dot(StepChange, StepChange)
+            PreviousStep = Step
+
+            NorForNew = NorFor + Omega * Step
+            NormalForceResidual = np.linalg.norm(NorForNew - NorFor) / max(np.linalg.norm(NorForNew), 1e-12)
+            if Displacement is None:
+                DisplacementResidual = np.inf
+            else:
+                DisplacementResidual = np.linalg.norm(SecondOrderDisplacement - Displacement) / max(np.linalg.norm(SecondOrderDisplacement), 1e-300)
+            NorFor = NorForNew
+            Displacement = SecondOrderDisplacement
+
+            History["Iterations"] = j + 1
+            History["NormalForceResidual"].append(float(NormalForceResidual))
+            History["DisplacementResidual"].append(float(DisplacementResidual))
+            History["Time"].append(time.perf_counter() - Start)
+            if NormalForceResidual <= Tolerance and DisplacementResidual <= Tolerance:
+                History["Converged"] = True
+                break
+
+        return SecondOrderDisplacement, NorFor.tolist(), History
     
     def DisplacementVectorDict(self):
-        self.DisplacementDict={}
-        for i in range(len(self.TotalDoF())):
-            if(i<(len(self.UnConstrainedDoF()))):
-                self.DisplacementDict[str(self.TotalDoF()[i])] = self.DisplacementVector(5)[i]
-            else:
-                self.DisplacementDict[str(self.TotalDoF()[i])]=0
+        Cache = self.AnalysisCache()
+        if "SecondOrderDisplacementDict" not in Cache:
+            Cache["SecondOrderDisplacementDict"] = Computer.ModelDisplacementList_To_Dict(self.DisplacementVector(), self.UnConstrainedDoF, self.TotalDoF)
+        self.DisplacementDict = dict(Cache["SecondOrderDisplacementDict"])
         return self.DisplacementDict
+
+    def MemberDisplacementAll(self):
+        """ (M, 6) global end displacements of all members after the second order iterations """
+        Cache = self.AnalysisCache()
+        if "SecondOrderMemberDisplacementAll" not in Cache:
+            Cache["SecondOrderMemberDisplacementAll"] = self.MemberDisplacementArray(self.DisplacementVector())
+        return Cache["SecondOrderMemberDisplacementAll"].copy()
     
     def SecondOrderSupportForcesVector(self):
 
-        #self.DisplacementVector(5)
-        SupportForces = np.dot(np.array(self.SecondOrderGlobalStiffnessMatrixCondensedA21(self.NormalForceList)),self.DisplacementVector(5))
-        
-        self.ForceVectorDict={}
-        for i in range(len(self.TotalDoF())):
-            if(i<(len(self.ConstrainedDoF()))):
-                self.ForceVectorDict[str(self.TotalDoF()[i])]=SupportForces[i]
-            else:
-                self.ForceVectorDict[str(self.TotalDoF()[i])] = 0
-        
+        SecondOrderDisplacement = self.DisplacementVector()
+        SupportForces = self.SecondOrderGlobalStiffnessMatrixCondensedA21(self.NormalForceList, Sparse = True) @ SecondOrderDisplacement
+        self.ForceVectorDict = self.SupportForceDict(SupportForces)
+
         return SupportForces
     
-    def BucklingEigenLoad(self, Solver = False):
-
-        gr_buck = self.UnConstrainedDoF()
-
-        BGSMConden = Computer.StiffnessMatrixAssembler(gr_buck,self.Members,"Second_Order_Global_Reduction_Matrix_1", NormalForce = self.NormalForce())
-        BGSMM_1st_Ord_condensed = Computer.StiffnessMatrixAssembler(gr_buck,self.Members,"First_Order_Global_Stiffness_Matrix_1")
-        
-        CriticalLoad , EigenMode = eig(BGSMM_1st_Ord_condensed,BGSMConden)
-
-        if Solver == "eigs":
-            x, EigenMode = eigs(
-                                BGSMM_1st_Ord_condensed, 
-                                M=BGSMConden, 
-                                k=10, 
-                                which='SM', 
-                                maxiter=10000,    # Increase iterations
-                                tol=1e-6,         # Loosen tolerance
-                                ncv=50            # More Lanczos vectors
-                                )
-        
-        if Solver == "eigsh":
-            x, EigenMode = eigsh(
-                                    BGSMM_1st_Ord_condensed, 
-                                    M=BGSMConden, 
-                                    k=10, 
-                                    sigma=1e-6,       # Shift near zero (critical for stability)
-                                    which='LM',       # Largest magnitude after shift-invert
-                                    mode='buckling',  # For buckling problems (A x = λ M x)
-                                    maxiter=10000,
-                                    tol=1e-6,
-                                    ncv=50
-                                )
-        
-        CriticalLoad = sorted(CriticalLoad, key=lambda x: abs(x))
+    def BucklingEigenLoad(self, Solver = False, NumModes = None, SturmCheck = True):
+        """
+        Critical load factors of K phi = lambda KG phi with KG from the first order normal forces.
+        Solver "dense" gives the full spectrum of the dense generalized problem. The default Solver False does
+        the same only on a model that is not Sparse and only when NumModes is None. As soon as NumModes is given,
+        or on a Sparse model, the default takes the sparse shift-invert path like Solver "eigsh" (or "eigs") and
+        "lobpcg": only the NumModes (default 10) factors of smallest magnitude are computed and no dense matrix
+        is formed.
+        SturmCheck verifies with LDL^T inertia counts of K - lambda KG that no mode below the largest
+        computed factor was missed, and raises RuntimeError otherwise.
+        With SecondOrderElement "Exact" the load factors are the roots of det K(lambda N) = 0 of the stability
+        function stiffness, see ExactBucklingEigenLoad.
+        Returns (smallest |lambda|, factors sorted by magnitude, modes as columns).
+        """
+        if self.SecondOrderElement == "Exact":
+            return self.ExactBucklingEigenLoad(10 if NumModes is None else NumModes)
+
+        Dense = Solver == "dense" or (Solver in (False, None, "Default") and NumModes is None and not self.Sparse)
+        Method = "lobpcg" if Solver == "lobpcg" else "eigsh"
+        if Solver not in (False, None, "dense", "Default", "eigs", "eigsh", "lobpcg"):
+            raise ValueError(f"Unknown buckling solver: '{Solver}'")
+
+        Cache = self.AnalysisCache()
+        Key = ("BucklingEigenLoad", Dense, Method, NumModes, SturmCheck)
+        if Key in Cache:
+            CriticalLoad, EigenMode = Cache[Key]
+            return min(filter(math.isfinite, [abs(z) for z in CriticalLoad])), list(CriticalLoad), EigenMode.copy()
+
+        Operator = self.SecondOrderStiffnessOperator()
+
+        BGSMConden = Computer.SecondOrderStiffnessMatrix(Operator, self.NormalForce(), Linear = False, Sparse = not Dense)
+        BGSMM_1st_Ord_condensed = Computer.SecondOrderStiffnessMatrix(Operator, Sparse = not Dense)
+        
+        if Dense:
+            CriticalLoad , EigenMode = eig(BGSMM_1st_Ord_condensed,BGSMConden)
+            order = np.argsort(np.abs(CriticalLoad), kind = "stable")
+            CriticalLoad, EigenMode = CriticalLoad[order], EigenMode[:, order]
+        else:
+            CriticalLoad, EigenMode = Computer.BucklingEigenSolver(BGSMM_1st_Ord_condensed, BGSMConden, 10 if NumModes is None else NumModes, Method)
+            if SturmCheck == True and len(CriticalLoad) > 0:
+                Bound = np.abs(CriticalLoad).max() * (1 + 1e-8)
+                Count = (Computer.SturmCount(BGSMM_1st_Ord_condensed, BGSMConden, Bound)
+                         + Computer.SturmCount(BGSMM_1st_Ord_condensed, BGSMConden, -Bound))
+                if Count != len(CriticalLoad):
+                    raise RuntimeError(f"Buckling eigen solver missed modes: {Count} load factors below {Bound:.4g}, {len(CriticalLoad)} found.")
+
         CriticalLoad = [round(float(x.real), 2) for x in CriticalLoad]
+        Cache[Key] = (CriticalLoad, EigenMode)
         print("Stability Eigen Calculated")
 
-        return min(filter(math.isfinite, [abs(z.real) for z in CriticalLoad])), CriticalLoad, EigenMode
+        return min(filter(math.isfinite, [abs(z) for z in CriticalLoad])), list(CriticalLoad), EigenMode.copy()
     
+    def ExactBucklingEigenLoad(self, NumModes = 10):
+        """
+        The NumModes lowest positive load factors lambda of the exact (stability function) element, for which
+        K(lambda N) with N the first order normal forces is singular. The factors are bisected on the
+        Wittrick-Williams count: negative pivots of K(lambda N) plus the clamped buckling loads of every
+        member below lambda N, so that member modes between the nodes are not missed with one element per
+        member. The modes are the null vectors of K(lambda N) (zero for a pure member mode).
+        Returns (smallest lambda, factors ascending, modes as columns) like BucklingEigenLoad.
+        """
+        if int(NumModes) < 1:
+            raise ValueError("At least one buckling mode has to be requested.")
+        Cache = self.AnalysisCache()
+        Key = ("ExactBucklingEigenLoad", int(NumModes))
+        if Key not in Cache:
+            Prop = Computer.MemberPropertyArrays(self.Members)
+            # NormalForce is compression positive, the element matrices take tension positive
+            NormalForce = -np.array(self.NormalForce(), dtype=float)
+
+            def Count(LoadFactor):
+                K = self.SecondOrderGlobalStiffnessMatrixCondensed(LoadFactor * NormalForce, Sparse = True)
+                return Computer.NegativePivotCount(K) + int(Computer.ClampedBucklingCount(LoadFactor * NormalForce, Prop["EI"], Prop["L"]).sum())
+
+            CriticalLoad = Computer.WittrickWilliamsSolver(Count, int(NumModes))
+            EigenMode = np.zeros((len(self.UnConstrainedDoF()), len(CriticalLoad)))
+            for i, LoadFactor in enumerate(CriticalLoad):
+                K = self.SecondOrderGlobalStiffnessMatrixCondensed(LoadFactor * NormalForce, Sparse = True)
+                if K.shape[0] > 2:
+                    Values, Vectors = eigsh(K, k = 1, sigma = 0, which = 'LM')
+                else:
+                    Values, Vectors = np.linalg.eigh(K.toarray())
+                EigenMode[:, i] = Vectors[:, np.argmin(np.abs(Values))]
+            Cache[Key] = ([round(float(x), 2) for x in CriticalLoad], EigenMode)
+            print("Stability Eigen Calculated")
+
+        CriticalLoad, EigenMode = Cache[Key]
+        return CriticalLoad[0], list(CriticalLoad), EigenMode.copy()
+
+    def BucklingLoadSensitivity(self, SensitivityType, EigenModeNo = 1, Solver = "eigsh"):
+        """
+        Derivative of the load factor lambda of buckling mode EigenModeNo (of K phi = lambda KG phi) with
+        respect to the area ("Axial"), moment of inertia ("Bending") or Young's modulus ("Material") of every
+        member, dlambda/dp = phiᵀ (∂K - lambda ∂KG) phi / phiᵀ KG phi, for all members at once.
+        KG = sum(N_e G_e) changes through the first order normal forces, phiᵀ ∂KG phi = sum(g_e dN_e/dp) with
+        g_e = phi_eᵀ G_e phi_e. dN_e/dp has an explicit part (∂k_e at fixed u) and the part of the changed
+        displacements, du/dp = -K^-1 ∂K u, which is evaluated for all members by one adjoint solve
+        K eta = sum(g_e ∂N_e/∂u). Both vanish only on statically determinate frames.
+        """
+        if self.SecondOrderElement != "Linearized":
+            raise ValueError("Buckling load sensitivities are only available for the linearized second order element.")
+        Eigen = self.BucklingEigenLoad(Solver = Solver, NumModes = EigenModeNo)
+        Mode = np.real(Eigen[2][:, EigenModeNo-1])
+        Operator = self.SecondOrderStiffnessOperator()
+        GeometricMode = Computer.SecondOrderStiffnessMatrix(Operator, self.NormalForce(), Linear = False, Sparse = True) @ Mode
+        # the reported load factors are rounded, the Rayleigh quotient of the mode is not
+        LoadFactor = (Mode @ (Computer.SecondOrderStiffnessMatrix(Operator, Sparse = True) @ Mode)) / (Mode @ GeometricMode)
+        DerivativeTensor = Computer.StiffnessDerivativeTensor(self.Members, SensitivityType)
+
+        # g_e = phi_eᵀ G_e phi_e from the unit geometric matrices on the fixed pattern
+        Rows = np.repeat(np.arange(Operator["shape"][0]), np.diff(Operator["indptr"]))
+        UnitGeometric = Operator["B"].T @ (Mode[Rows] * Mode[Operator["indices"]])
+
+        # N_e = (k_e T_e u_e)[0] - FEF_e, the fixed end forces do not depend on A, I or E
+        Prop = Computer.MemberPropertyArrays(self.Members)
+        T = Computer.TransformationTensor(Prop["cos"], Prop["sin"])
+        AxialRow = np.einsum("mj,mjk->mk", Computer.LocalStiffnessTensor(Prop["EA"], Prop["EI"], Prop["L"])[:, 0, :], T)
+        Solve = Computer.Factorize(self.GlobalStiffnessMatrixCondensed(), self.Solver, self.EquationPermutation())
+        Displacement = self.MemberDisplacementArray(Solve(np.array(self.ForceVector(), dtype=float)))
+
+        Partition = self.DoFPartition()
+        Free = Partition["MemberEquation"] < Partition["NumFree"]
+        AdjointLoad = np.zeros(Partition["NumFree"])
+        np.add.at(AdjointLoad, Partition["MemberEquation"][Free], (UnitGeometric[:, None] * AxialRow)[Free])
+        Adjoint = self.MemberDisplacementArray(Solve(AdjointLoad))
+
+        LocalDisplacement = np.einsum("mij,mj->mi", T, Displacement)
+        GeometricDerivative = (UnitGeometric * np.einsum("mj,mj->m", DerivativeTensor[:, 0, :], LocalDisplacement)
+                               - Computer.MemberEnergyDerivative(self.Members, DerivativeTensor, Adjoint, Displacement))
+        return (Computer.MemberEnergyDerivative(self.Members, DerivativeTensor, self.MemberDisplacementArray(Mode))
+                - LoadFactor * GeometricDerivative) / (Mode @ GeometricMode)
+
     def MemberEigenMode(self, MemberNumber, scale_factor = 1, EigenModeNo = 1, EigenVectorDict = None):
         
         FEDivision = config.get_FEDivision()
@@ -169,7 +345,7 @@ class SecondOrderGlobalResponse(Model):
         length = member.length()
 
         if EigenVectorDict == None:
-            EigenVector = self.BucklingEigenLoad(EigenModeNo = EigenModeNo)[2][:, (EigenModeNo-1)]
+            EigenVector = self.BucklingEigenLoad(NumModes = EigenModeNo)[2][:, (EigenModeNo-1)]
             EigenVectorDict = Computer.ModelDisplacementList_To_Dict(EigenVector, self.UnConstrainedDoF, self.TotalDoF)
 
         EigenVectorGlobal = Computer.ModelDisplacement_To_MemberDisplacement(MemberNo, EigenVectorDict, self.Members)
@@ -251,36 +427,39 @@ class SecondOrderMemberResponse(SecondOrderGlobalResponse):
     
     def MemberDisplacement(self, MemberNumber):
         MemberNo = int(MemberNumber)
-        self.DisplacementVector(5)
-        MemberDisplacement = [self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[0])],
-                             self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[1])],
-                             self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[2])],
-                             self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[3])],
-                             self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[4])],
-                             self.DisplacementVectorDict()[str(self.Members[MemberNo-1].DoFNumber()[5])]]
+        Cache = self.AnalysisCache()
+        if "SecondOrderMemberDisplacementAll" not in Cache:
+            self.MemberDisplacementAll()
+        MemberDisplacement = Cache["SecondOrderMemberDisplacementAll"][MemberNo-1].tolist()
         return MemberDisplacement
        
+    def MemberForceLocalAll(self):
+
+        """ Local end forces of all members as one (M, 6) array, every member with its own second order normal force """
+
+        Cache = self.AnalysisCache()
+        if "SecondOrderMemberForceLocalAll" not in Cache:
+            # DisplacementVector sets the second order normal forces
+            self.DisplacementVector()
+            Cache["SecondOrderMemberForceLocalAll"] = Computer.MemberDisplacement_To_ForceLocalAll(self.SecondOrderMatrix("Local_Stiffness_Matrix"), self.Members, self.MemberDisplacementAll(), self.Loads,
+                                                                                                   NormalForce = self.NormalForceList, FixedEndForce = self.FixedEndForceArray())
+        return Cache["SecondOrderMemberForceLocalAll"].copy()
+
     def MemberForceLocal(self, MemberNumber, All = False):
         
         MemberNo = int(MemberNumber)
-        SecondOrderDisplacement = self.DisplacementVector(5)
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(SecondOrderDisplacement,self.UnConstrainedDoF,self.TotalDoF)
-        MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber,DisplacementDict,self.Members)
-        MemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("Second_Order_Local_Stiffness_Matrix_1", MemberNo, self.Members, MemberDisplacement, self.Loads, self.NormalForceList[MemberNo-1] )
-
         if All == True:
+            return list(self.MemberForceLocalAll())
 
-            MemberForceLocalAll = []
-            for i in range(self.NoMembers):
-                MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(i+1,DisplacementDict,self.Members)
-                MemberForceLocal = Computer.MemberDisplacement_To_ForceLocal("Second_Order_Local_Stiffness_Matrix_1", i+1, self.Members, MemberDisplacement, self.Loads, self.NormalForceList[MemberNo-1] )
-                MemberForceLocalAll.append(MemberForceLocal)
-
-            return MemberForceLocalAll
+        # one member only copies its own row of the cached array
+        Cache = self.AnalysisCache()
+        if "SecondOrderMemberForceLocalAll" not in Cache:
+            self.MemberForceLocalAll()
+        MemberForceLocal = Cache["SecondOrderMemberForceLocalAll"][MemberNo-1].copy()
 
         """
         MemberNo = int(MemberNumber)
-        SecondOrderDisplacement = self.DisplacementVector(5)
+        SecondOrderDisplacement = self.DisplacementVector()
         DisplacementDict = Computer.ModelDisplacementList_To_Dict(SecondOrderDisplacement,self.UnConstrainedDoF,self.TotalDoF)
         MemberDisplacement = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber,DisplacementDict,self.Members)
 
@@ -329,11 +508,9 @@ class SecondOrderMemberResponse(SecondOrderGlobalResponse):
         self.amplist = amp_values.tolist()
 
         # Process loads using vectorization
-        for load in self.Loads:
-            if int(load.AssignedTo[-1]) == MemberNo:
-                
-                free_moment = np.array(load.EquivalentLoad()['FreeMoment'][:FEDivision])
-                abcd1 += free_moment if alpha >= 0 else -free_moment
+        for load in self.MemberLoads().get(MemberNo - 1, []):
+            free_moment = np.array(load.FreeMoment(amp_values))
+            abcd1 += free_moment if alpha >= 0 else -free_moment
 
         # Vectorized calculations for abcd2 and abcd3
         abcd2 = (amp_values / length) * (-fem2 - fem1) + fem1
@@ -367,13 +544,11 @@ class SecondOrderMemberResponse(SecondOrderGlobalResponse):
         MemberNo = int(MemberNumber)
         member = self.Members[MemberNo - 1]
         length = member.length()
-        iteration_steps = 5
 
         if DisplacementDict == None:
-            Displacement = self.DisplacementVector(iteration_steps)
-            DisplacementDict = Computer.ModelDisplacementList_To_Dict(Displacement, self.UnConstrainedDoF, self.TotalDoF)
-
-        MemberDisplacementGlobal = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber, DisplacementDict, self.Members)
+            MemberDisplacementGlobal = self.MemberDisplacementAll()[MemberNo-1]
+        else:
+            MemberDisplacementGlobal = Computer.ModelDisplacement_To_MemberDisplacement(MemberNumber, DisplacementDict, self.Members)
         MemberDisplacementLocal = np.dot((self.Members[MemberNumber-1].Transformation_Matrix()),MemberDisplacementGlobal)
         self.DeflectionPosition, BeamDisplacement = Computer.Qudaratic_Interpolate_Displacements(MemberDisplacementLocal, length, FEDivision, ScaleFactor)
         
@@ -623,10 +798,7 @@ class SecondOrderMemberResponse(SecondOrderGlobalResponse):
             computer_instance = Computer()
             computer_instance.PlotStructuralElements(ax,self.Members, self.Points, ShowNodeNumber = False)
         
-        iteration_steps = 5
-        DisplacementList = self.DisplacementVector(5)
-        DisplacementDict = Computer.ModelDisplacementList_To_Dict(DisplacementList, self.UnConstrainedDoF, self.TotalDoF)
-
+        DisplacementList = self.DisplacementVector()
 
         # Determine global maximum absolute moment for scaling
         max_abs_deflection = max(DisplacementList)
@@ -640,7 +812,7 @@ class SecondOrderMemberResponse(SecondOrderGlobalResponse):
             L = member.length()
             
             # Get BMD values and positions
-            deflections = self.MemberDeflection(member_idx+1, scale_factor, DisplacementDict = DisplacementDict)
+            deflections = self.MemberDeflection(member_idx+1, scale_factor)
             positions = self.DeflectionPosition
             
             # Calculate member orientation
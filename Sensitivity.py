@@ -16,88 +16,108 @@ except:
 
 class Senstivity(FirstOrderGlobalResponse):
 
-    def AxialMemberSensitivity(self,MemberNumber,scale):
+    def MemberSizeSensitivity(self, SensitivityType):
+        """
+        u_eᵀ (∂k_e/∂p) u_e of every member for p = area ("Axial"), moment of inertia ("Bending") or Young's
+        modulus ("Material"), from the one cached first order solution and the analytic element derivatives.
+        The model is not modified. This is the negative derivative of the compliance Fᵀu, see ComplianceSizeSensitivity.
+        """
+        Cache = self.AnalysisCache()
+        Key = ("MemberSizeSensitivity", SensitivityType)
+        if Key not in Cache:
+            DerivativeTensor = Computer.StiffnessDerivativeTensor(self.Members, SensitivityType)
+            Cache[Key] = Computer.MemberEnergyDerivative(self.Members, DerivativeTensor, self.MemberDisplacementAll())
+        return Cache[Key].copy()
 
-        UnMOdifiedSM = self.GlobalStiffnessMatrixCondensed()
-        for i in range(len(self.Members)):
-            if i == MemberNumber-1:
-                self.Members[i].area += scale
-                
-        ModifiedSM= self.GlobalStiffnessMatrixCondensed()
-        d_AxialStiffness_ds = (np.array(ModifiedSM) - np.array(UnMOdifiedSM))/scale
-        sensitivity = np.dot(np.dot(np.transpose(self.DisplacementVector()),d_AxialStiffness_ds),self.DisplacementVector())
+    def ComplianceSizeSensitivity(self, SensitivityType):
+        """ d(Fᵀu)/dp = -u_eᵀ (∂k_e/∂p) u_e of every member, the loads do not depend on A, I or E """
+        return -self.MemberSizeSensitivity(SensitivityType)
 
-        return sensitivity
+    def AxialMemberSensitivity(self,MemberNumber,scale = None):
+        """ uᵀ (∂K/∂A) u of one member, analytic - scale (the old finite difference step) is not used """
+        return self.MemberSizeSensitivity("Axial")[MemberNumber-1]
     
-    def BendingMemberSensitivity(self,MemberNumber,scale):
-        
-        UnMOdifiedSM = self.GlobalStiffnessMatrixCondensed()
-        for i in range(len(self.Members)):
-            if i == MemberNumber-1:
-                self.Members[i].moment_of_inertia += scale
-        
-        ModifiedSM= self.GlobalStiffnessMatrixCondensed()
-        d_AxialStiffness_ds = (np.array(ModifiedSM) - np.array(UnMOdifiedSM))/scale
-        sensitivity = np.dot(np.dot(np.transpose(self.DisplacementVector()),d_AxialStiffness_ds),self.DisplacementVector())
-
-        return sensitivity
+    def BendingMemberSensitivity(self,MemberNumber,scale = None):
+        """ uᵀ (∂K/∂I) u of one member, analytic - scale (the old finite difference step) is not used """
+        return self.MemberSizeSensitivity("Bending")[MemberNumber-1]
     
-    def MaterialSensitivity(self,MemberNumber,scale):
-        
-        UnMOdifiedSM = self.GlobalStiffnessMatrixCondensed()
-        for i in range(len(self.Members)):
-            if i == MemberNumber-1:
-                self.Members[i].youngs_modulus += scale
-        
-        ModifiedSM= self.GlobalStiffnessMatrixCondensed()
-        d_AxialStiffness_ds = (np.array(ModifiedSM) - np.array(UnMOdifiedSM))/scale
-        sensitivity = np.dot(np.dot(np.transpose(self.DisplacementVector()),d_AxialStiffness_ds),self.DisplacementVector())
-
-        return sensitivity
+    def MaterialSensitivity(self,MemberNumber,scale = None):
+        """ uᵀ (∂K/∂E) u of one member, analytic - scale (the old finite difference step) is not used """
+        return self.MemberSizeSensitivity("Material")[MemberNumber-1]
     
-    def NodeXSensitivity(self,NodeNumber,scale):
+    def MemberShapeSensitivity(self):
+        """
+        Derivatives with respect to the end node coordinates [x_start, y_start, x_end, y_end] of every member,
+        from the one cached first order solution, member length and direction cosines differentiated analytically:
+            Stiffness - (M, 4) u_eᵀ (∂k_e/∂X) u_e of the global element stiffness Tᵀ k(L) T
+            Load      - (M, 4) u_eᵀ (∂F_e/∂X) of the equivalent nodal loads Tᵀ f(L), at fixed load positions
+        """
+        Cache = self.AnalysisCache()
+        if "MemberShapeSensitivity" not in Cache:
+            Prop = Computer.MemberPropertyArrays(self.Members)
+            T = Computer.TransformationTensor(Prop["cos"], Prop["sin"])
+            dTdc, dTds = Computer.TransformationDerivativeTensor()
+            dL, dcos, dsin = Computer.GeometryDerivativeArrays(Prop["cos"], Prop["sin"], Prop["L"])
 
-        UnMOdifiedSM = self.GlobalStiffnessMatrixCondensed()
-        for i in range(len(self.Points)):
-            if self.Points[i].node_number == NodeNumber:
-                self.Points[i].xcoordinate += scale
-        
-        ModifiedSM= self.GlobalStiffnessMatrixCondensed()
-        d_AxialStiffness_ds = (np.array(ModifiedSM) - np.array(UnMOdifiedSM))/scale
-        sensitivity = np.dot(np.dot(np.transpose(self.DisplacementVector()),d_AxialStiffness_ds),self.DisplacementVector())
+            MemberDisplacement = self.MemberDisplacementAll()
+            Local = np.einsum("mij,mj->mi", T, MemberDisplacement)
+            LocalForce = np.einsum("mij,mj->mi", Computer.LocalStiffnessTensor(Prop["EA"], Prop["EI"], Prop["L"]), Local)
+            RotatedC = MemberDisplacement @ dTdc.T
+            RotatedS = MemberDisplacement @ dTds.T
 
-        return sensitivity
-    
-    def NodeYSensitivity(self,NodeNumber,scale):
-        
-        UnMOdifiedSM = self.GlobalStiffnessMatrixCondensed()
-        for i in range(len(self.Points)):
-            if self.Points[i].node_number == NodeNumber:
-                self.Points[i].ycoordinate += scale
-        
-        ModifiedSM= self.GlobalStiffnessMatrixCondensed()
-        d_AxialStiffness_ds = (np.array(ModifiedSM) - np.array(UnMOdifiedSM))/scale
-        sensitivity = np.dot(np.dot(np.transpose(self.DisplacementVector()),d_AxialStiffness_ds),self.DisplacementVector())
+            # d(uᵀTᵀkTu) = 2 (dT u)ᵀ k T u + (T u)ᵀ dk/dL (T u) dL
+            Stiffness = (2 * np.einsum("mi,mi->m", RotatedC, LocalForce)[:, None] * dcos
+                         + 2 * np.einsum("mi,mi->m", RotatedS, LocalForce)[:, None] * dsin
+                         + np.einsum("mi,mij,mj->m", Local, Computer.LocalStiffnessLengthDerivative(Prop["EA"], Prop["EI"], Prop["L"]), Local)[:, None] * dL)
+
+            FixedEndForceLengthDerivative = np.zeros((len(self.Members), 6))
+            for MemberIndex, MemberLoads in self.MemberLoads().items():
+                for load in MemberLoads:
+                    FixedEndForceLengthDerivative[MemberIndex] += load.LocalFixedEndForceLengthDerivative()
+            FixedEndForce = self.FixedEndForceArray()
 
-        return sensitivity
+            # d(uᵀTᵀf) = (dT u)ᵀ f + (T u)ᵀ df/dL dL
+            Load = (np.einsum("mi,mi->m", RotatedC, FixedEndForce)[:, None] * dcos
+                    + np.einsum("mi,mi->m", RotatedS, FixedEndForce)[:, None] * dsin
+                    + np.einsum("mi,mi->m", Local, FixedEndForceLengthDerivative)[:, None] * dL)
+            Cache["MemberShapeSensitivity"] = {"Stiffness": Stiffness, "Load": Load}
+        return {Name: Value.copy() for Name, Value in Cache["MemberShapeSensitivity"].items()}
+
+    def NodeShapeSensitivity(self, Term = "Stiffness"):
+        """ (N, 2) x and y derivatives of every node (Points order) of one term of MemberShapeSensitivity """
+        NodeIndex = {id(node): i for i, node in enumerate(self.Points)}
+        Ends = np.array([[NodeIndex[id(member.Start_Node)], NodeIndex[id(member.End_Node)]] for member in self.Members], dtype=int).reshape(-1, 2)
+        Member = self.MemberShapeSensitivity()[Term]
+        NodeSensitivity = np.zeros((len(self.Points), 2))
+        np.add.at(NodeSensitivity, (np.repeat(Ends, 2, axis=1), np.tile([0, 1], (len(Ends), 2))), Member)
+        return NodeSensitivity
+
+    def ComplianceShapeSensitivity(self):
+        """
+        (N, 2) derivatives of the compliance Fᵀu with respect to the x and y coordinates of every node
+        (Points order), 2 uᵀ ∂F/∂X - uᵀ ∂K/∂X u for all nodes in one pass after the single first order solve.
+        """
+        return 2 * self.NodeShapeSensitivity("Load") - self.NodeShapeSensitivity("Stiffness")
+
+    def NodeXSensitivity(self,NodeNumber,scale = None):
+        """ uᵀ (∂K/∂x) u of one node, analytic - scale (the old finite difference step) is not used """
+        Index = [node.node_number for node in self.Points].index(NodeNumber)
+        return self.NodeShapeSensitivity()[Index, 0]
+    
+    def NodeYSensitivity(self,NodeNumber,scale = None):
+        """ uᵀ (∂K/∂y) u of one node, analytic - scale (the old finite difference step) is not used """
+        Index = [node.node_number for node in self.Points].index(NodeNumber)
+        return self.NodeShapeSensitivity()[Index, 1]
     
     def GlobalShapeSensitivity(self,SensitivityType):
-        return None
+        if SensitivityType not in ("X", "Y"):
+            raise ValueError("Unsupported SensitivityType. Use 'X' or 'Y'.")
+        return self.NodeShapeSensitivity()[:, 0 if SensitivityType == "X" else 1].tolist()
     
     def GlobalSizeSensitivity(self,SensitivityType):
-        sensitivities = []
-        for i in range(len(self.Members)):
-            # Calculate the sensitivity for each member
-            if SensitivityType == "Axial":
-                sensitivity = self.AxialMemberSensitivity(i+1, 1e-6)  # Using a small scale factor 
-            elif SensitivityType == "Bending":
-                sensitivity = self.BendingMemberSensitivity(i+1, 1e-6)  # Using a small scale factor 
-            elif SensitivityType == "Material":
-                sensitivity = self.MaterialSensitivity(i+1, 1e-6)  # Using a small scale factor 
-            else:
-                raise ValueError("Unsupported SensitivityType. Currently, only 'Bending' is supported.")
-            sensitivities.append(sensitivity)
-        return sensitivities
+        if SensitivityType not in ("Axial", "Bending", "Material"):
+            raise ValueError("Unsupported SensitivityType. Use 'Axial', 'Bending' or 'Material'.")
+        return self.MemberSizeSensitivity(SensitivityType).tolist()
     
     def PlotSensitivity(self,SensitivityType):
         sensitivities = self.GlobalSizeSensitivity(SensitivityType)
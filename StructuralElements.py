@@ -1,14 +1,58 @@
 
+import itertools
+import weakref
 import numpy as np
 
+try:
+    from config import config
+    from Computer import Computer
+except:
+    from .config import config
+    from .Computer import Computer
+
 # Finite element Division
 
 
+_Unset = object()
+# Revision stamps: a changed object gets the next number
+_RevisionStamps = itertools.count(1)
+
+def TrackedSetAttr(obj, name, value, TrackedAttributes):
+    """
+    Sets an attribute. If a tracked input actually changed, the object gets a new revision stamp and the
+    analysis caches of the models using it (see TrackedBy) are emptied.
+    """
+    if name in TrackedAttributes:
+        old = obj.__dict__.get(name, _Unset)
+        try:
+            unchanged = old is value or bool(old == value)
+        except (TypeError, ValueError):
+            unchanged = False
+        if not unchanged:
+            object.__setattr__(obj, "_Revision", next(_RevisionStamps))
+            for model in list(obj.__dict__.get("_Models", ())):
+                model.ObjectChanged()
+    object.__setattr__(obj, name, value)
+
+def TrackedBy(obj, model):
+    """ Registers a model to be notified when obj changes, the model is only weakly referenced """
+    Models = obj.__dict__.get("_Models")
+    if Models is None:
+        Models = weakref.WeakSet()
+        object.__setattr__(obj, "_Models", Models)
+    Models.add(model)
+
+
 class Node():
     
     i=1
     titam = 1
     titay = 1
+    TrackedAttributes = ("node_number", "xcoordinate", "ycoordinate", "support_condition", "dof_x", "dof_y", "dof_tita")
+
+    def __setattr__(self, name, value):
+        TrackedSetAttr(self, name, value, Node.TrackedAttributes)
+
     def __init__ (self, Node_Number, xcoordinate, ycoordinate, Support_Condition):
         self.node_number = Node_Number
         self.xcoordinate = xcoordinate
@@ -38,6 +82,14 @@ class Node():
             raise ValueError(f"Unsupported support condition: '{self.support_condition}'")
         
         
+    def Revision(self):
+        """ Stamp of the last change of the node input """
+        return self.__dict__.get("_Revision", 0)
+
+    def Track(self, model):
+        """ Notifies model of every change of the node """
+        TrackedBy(self, model)
+
     def DoF(self):
         self.check1 = [self.dof_x, self.dof_y, self.dof_tita]    
         return [self.dof_x, self.dof_y, self.dof_tita]
@@ -45,6 +97,21 @@ class Node():
     
 class Member():
     
+    TrackedAttributes = ("Beam_Number", "Start_Node", "End_Node", "area", "youngs_modulus", "moment_of_inertia", "Density")
+
+    def __setattr__(self, name, value):
+        TrackedSetAttr(self, name, value, Member.TrackedAttributes)
+
+    def Revision(self):
+        """ Stamp of the last change of the member or of its end nodes """
+        return max(self.__dict__.get("_Revision", 0), self.Start_Node.Revision(), self.End_Node.Revision())
+
+    def Track(self, model):
+        """ Notifies model of every change of the member or of its end nodes """
+        TrackedBy(self, model)
+        self.Start_Node.Track(model)
+        self.End_Node.Track(model)
+
     def __init__ (self, Beam_Number, Start_Node, End_Node, Area, Youngs_Modulus, Moment_of_Inertia, Density = 7850 ):
         
         self.Beam_Number = Beam_Number
@@ -178,6 +245,22 @@ class Member():
 
         return np.transpose(self.Transformation_Matrix()) @ np.array(self.Second_Order_Local_Stiffness_Matrix_2(NormalForce)) @ np.array(self.Transformation_Matrix())
 
+    def Second_Order_Local_Stiffness_Matrix_3(self, NormalForce):
+        """ Exact beam-column stiffness from the stability functions, valid for any normal force with one element per member """
+        return Computer.LocalStabilityTensor([self.area * self.youngs_modulus], [self.youngs_modulus * self.moment_of_inertia],
+                                             [self.length()], [NormalForce])[0]
+
+    def Second_Order_Global_Stiffness_Matrix_3(self, NormalForce):
+
+        return np.transpose(self.Transformation_Matrix()) @ np.array(self.Second_Order_Local_Stiffness_Matrix_3(NormalForce)) @ np.array(self.Transformation_Matrix())
+
+    def Second_Order_Reduction_Matrix_3(self, NormalForce):
+        # change of the exact stiffness against the first order stiffness, not linear in NormalForce
+        return self.Second_Order_Local_Stiffness_Matrix_3(NormalForce) - np.array(self.First_Order_Local_Stiffness_Matrix_1())
+
+    def Second_Order_Global_Reduction_Matrix_3(self, NormalForce):
+        return np.transpose(self.Transformation_Matrix()) @ np.array(self.Second_Order_Reduction_Matrix_3(NormalForce)) @ np.array(self.Transformation_Matrix())
+
     def Local_Mass_Matrix(self):
 
         L = self.length()
@@ -199,6 +282,16 @@ class Member():
         
         return np.transpose(self.Transformation_Matrix()) @ np.array(self.Local_Mass_Matrix()) @ np.array(self.Transformation_Matrix())
 
+    def Local_Lumped_Mass_Matrix(self):
+        """ Half of the member mass at each end node in both translations, no rotary inertia """
+        m = self.area * self.Density * self.length() / 2
+
+        return np.diag([m, m, 0, m, m, 0])
+
+    def Global_Lumped_Mass_Matrix(self):
+        # translational point masses are the same in every direction
+        return self.Local_Lumped_Mass_Matrix()
+
 
 class Stiffness_Matrix():
     
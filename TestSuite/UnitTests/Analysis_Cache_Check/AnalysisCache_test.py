@@ -0,0 +1,123 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from FirstOrderResponse import FirstOrderMemberResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(1000)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=10, ycoordinate=0, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=20, ycoordinate=0, Support_Condition="Fixed Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1),
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-5, Distance1=0, Distance2=10, AssignedTo="Member 1", Members = MembersT),
+        NeumanBC(type="UDL", Magnitude=-5, Distance1=0, Distance2=10, AssignedTo="Member 2", Members = MembersT)
+    ]
+    MemberResponseT = FirstOrderMemberResponse(Points=PointsT, Members=MembersT, Loads=LoadsT)
+    return MemberResponseT
+
+
+def test_DisplacementSolvedOnce(setup_model):
+    MemberResponseT = setup_model
+
+    Displacement1 = MemberResponseT.DisplacementVector()
+    Factorization = MemberResponseT.AnalysisCache()["Factorization"]
+    MemberResponseT.MemberForceLocal(1, All = True)
+    MemberResponseT.MemberBMD(2)
+    Displacement2 = MemberResponseT.DisplacementVector()
+
+    assert MemberResponseT.AnalysisCache()["Factorization"] is Factorization, "Model was solved again without any change."
+    assert np.allclose(Displacement1, Displacement2), "Cached displacement is wrong."
+
+
+def test_CacheInvalidatedOnChange(setup_model):
+    MemberResponseT = setup_model
+
+    Displacement1 = MemberResponseT.DisplacementVector()
+    MemberResponseT.Loads[0].Magnitude = -10
+    Displacement2 = MemberResponseT.DisplacementVector()
+    assert not np.allclose(Displacement1, Displacement2), "Cache not invalidated after a load change."
+
+    MemberResponseT.Members[0].moment_of_inertia = 2
+    Displacement3 = MemberResponseT.DisplacementVector()
+    assert not np.allclose(Displacement2, Displacement3), "Cache not invalidated after a member change."
+
+    Factorization = MemberResponseT.AnalysisCache()["Factorization"]
+    MemberResponseT.Points[1].ycoordinate = 0.0
+    assert MemberResponseT.AnalysisCache().get("Factorization") is Factorization, "Cache invalidated without an actual change."
+
+
+def test_CacheIndependentOfOtherModels(setup_model):
+    MemberResponseT = setup_model
+
+    MemberResponseT.DisplacementVector()
+    Factorization = MemberResponseT.AnalysisCache()["Factorization"]
+
+    # a second model and FE division create and change their own nodes, members and loads only
+    OtherPoints = [Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+                   Node(Node_Number=2, xcoordinate=5, ycoordinate=0, Support_Condition="Rigid Joint")]
+    OtherMembers = [Member(Beam_Number=1, Start_Node=OtherPoints[0], End_Node=OtherPoints[1], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1)]
+    OtherLoads = [NeumanBC(type="PL", Magnitude=-1, Distance1=2, AssignedTo="Member 1", Members = OtherMembers)]
+    OtherPoints, OtherMembers, OtherLoads = divide_into_finite_elements(OtherPoints, OtherMembers, OtherLoads, 4)
+    OtherResponse = FirstOrderMemberResponse(Points=OtherPoints, Members=OtherMembers, Loads=OtherLoads)
+    OtherResponse.DisplacementVector()
+    OtherLoads[0].Magnitude = -2
+    assert MemberResponseT.AnalysisCache().get("Factorization") is Factorization, "Another model invalidated this cache."
+
+    # replacing a node by an older one with the same number of objects is still a change
+    MemberResponseT.Points[1] = OtherPoints[1]
+    assert "Factorization" not in MemberResponseT.AnalysisCache(), "Cache not invalidated after a node was replaced."
+
+
+def test_CacheCheckedInConstantTime(setup_model, monkeypatch):
+    MemberResponseT = setup_model
+
+    MemberResponseT.MemberForceLocal(1)
+    Factorization = MemberResponseT.AnalysisCache()["Factorization"]
+    # a valid cache is used without visiting the nodes, members and loads
+    for Class in (Node, Member, NeumanBC):
+        monkeypatch.setattr(Class, "Track", None)
+        monkeypatch.setattr(Class, "Revision", None)
+    MemberResponseT.DisplacementVector()
+    MemberResponseT.MemberForceLocal(2)
+    assert MemberResponseT.AnalysisCache()["Factorization"] is Factorization, "Cached lookup must not rebuild the cache."
+    monkeypatch.undo()
+
+    MemberResponseT.Loads.append(NeumanBC(type="PL", Magnitude=-1, Distance1=5, AssignedTo="Member 1", Members = MemberResponseT.Members))
+    assert "Factorization" not in MemberResponseT.AnalysisCache(), "Cache not invalidated after a load was added."
+
+
+def test_FEDivisionKeepsCache(setup_model):
+    MemberResponseT = setup_model
+
+    MemberResponseT.DisplacementVector()
+    Factorization = MemberResponseT.AnalysisCache()["Factorization"]
+    config.set_FEDivision(50)
+    assert len(MemberResponseT.MemberBMD(1)) == 50, "Diagrams must follow the new FEDivision."
+    assert MemberResponseT.AnalysisCache().get("Factorization") is Factorization, "FEDivision only sets the diagram sampling."
+    config.set_FEDivision(1000)
+
+
+def test_DoFPartition(setup_model):
+    MemberResponseT = setup_model
+
+    Partition = MemberResponseT.DoFPartition()
+    assert MemberResponseT.UnConstrainedDoF() == [4, 5, 6], "Wrong free DoFs."
+    assert MemberResponseT.TotalDoF() == [4, 5, 6, 1, 2, 3, 7, 8, 9], "Wrong DoF order."
+    assert np.array_equal(Partition["MemberEquation"], [[3, 4, 5, 0, 1, 2], [0, 1, 2, 6, 7, 8]]), "Wrong member equation numbers."
+    assert np.array_equal(MemberResponseT.MemberEquationIndex()[1], [0, 1, 2, -1, -1, -1]), "Restrained DoFs must be -1."
+    assert MemberResponseT.DoFPartition() is Partition, "Partition rebuilt without any change."
+
+    MemberResponseT.Points[2].support_condition = "Hinged Support"
+    assert MemberResponseT.UnConstrainedDoF() == [4, 5, 6, 9], "Partition not rebuilt after a support change."
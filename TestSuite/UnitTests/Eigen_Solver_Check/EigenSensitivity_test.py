@@ -0,0 +1,110 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from SecondOrderResponse import SecondOrderGlobalResponse
+from DynamicResponse import DynamicGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    # Cantilevered L-frame, statically determinate so that the normal forces do not depend on the stiffness
+    config.set_FEDivision(20)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=3, ycoordinate=5, Support_Condition="Rigid Joint")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.05, Youngs_Modulus=200000000, Moment_of_Inertia=0.0004),
+    ]
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-10000, Distance1=2.9, AssignedTo="Member 2", Members = MembersT)
+    ]
+    return divide_into_finite_elements(PointsT, MembersT, LoadsT, 3)
+
+
+def CriticalLoad(SecondOrderResponseT):
+    Operator = SecondOrderResponseT.SecondOrderStiffnessOperator()
+    K = Computer.SecondOrderStiffnessMatrix(Operator, Sparse = True)
+    KG = Computer.SecondOrderStiffnessMatrix(Operator, SecondOrderResponseT.NormalForce(), Linear = False, Sparse = True)
+    return Computer.BucklingEigenSolver(K, KG, 1)[0][0]
+
+
+def FiniteDifference(ResponseT, Attribute, Function, Step = 1e-6):
+    Gradient = []
+    for member in ResponseT.Members:
+        Value = getattr(member, Attribute)
+        setattr(member, Attribute, Value * (1 + Step))
+        Plus = Function(ResponseT)
+        setattr(member, Attribute, Value * (1 - Step))
+        Minus = Function(ResponseT)
+        setattr(member, Attribute, Value)
+        Gradient.append((Plus - Minus) / (2 * Step * Value))
+    return np.array(Gradient)
+
+
+@pytest.mark.parametrize("SensitivityType, Attribute", [("Bending", "moment_of_inertia"), ("Material", "youngs_modulus")])
+def test_BucklingLoadSensitivity(setup_model, SensitivityType, Attribute):
+    SecondOrderResponseT = SecondOrderGlobalResponse(Points = setup_model[0], Members = setup_model[1], Loads = setup_model[2])
+    GradientT = SecondOrderResponseT.BucklingLoadSensitivity(SensitivityType)
+    GradientR = FiniteDifference(SecondOrderResponseT, Attribute, CriticalLoad)
+
+    assert np.allclose(GradientT, GradientR, rtol=1e-4, atol=1e-5 * np.abs(GradientR).max()), f"{SensitivityType} buckling load sensitivity is wrong."
+
+
+def IndeterminateFrame():
+    # portal frame with a fixed and a hinged base, the normal forces depend on the member stiffnesses
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=5, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.02, Youngs_Modulus=200000000, Moment_of_Inertia=0.0004),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.05, Youngs_Modulus=200000000, Moment_of_Inertia=0.0002),
+    ]
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-10000, Distance1=1.5, AssignedTo="Member 2", Members = MembersT)
+    ]
+    return divide_into_finite_elements(PointsT, MembersT, LoadsT, 2)
+
+
+def UnroundedCriticalLoad(SecondOrderResponseT):
+    # NormalForce() is rounded to 0.01, too coarse for the finite differences of the normal forces
+    Operator = SecondOrderResponseT.SecondOrderStiffnessOperator()
+    K = Computer.SecondOrderStiffnessMatrix(Operator, Sparse = True)
+    Displacement = Computer.DisplacementSolver(K.toarray(), SecondOrderResponseT.ForceVector())
+    NormalForce = (Computer.MemberDisplacement_To_ForceLocalStack("First_Order_Local_Stiffness_Matrix_1", SecondOrderResponseT.Members,
+                                                                  SecondOrderResponseT.MemberDisplacementArray(Displacement))[:, 0]
+                   - SecondOrderResponseT.FixedEndForceArray()[:, 0])
+    KG = Computer.SecondOrderStiffnessMatrix(Operator, NormalForce, Linear = False, Sparse = True)
+    return Computer.BucklingEigenSolver(K, KG, 1)[0][0]
+
+
+@pytest.mark.parametrize("SensitivityType, Attribute", [("Axial", "area"), ("Bending", "moment_of_inertia"), ("Material", "youngs_modulus")])
+def test_BucklingLoadSensitivityIndeterminate(SensitivityType, Attribute):
+    PointsT, MembersT, LoadsT = IndeterminateFrame()
+    SecondOrderResponseT = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    GradientT = SecondOrderResponseT.BucklingLoadSensitivity(SensitivityType)
+    # the normal forces barely move with the area, a larger step keeps the roundoff out of the difference
+    GradientR = FiniteDifference(SecondOrderResponseT, Attribute, UnroundedCriticalLoad, Step = 1e-3)
+
+    assert np.allclose(GradientT, GradientR, rtol=1e-4, atol=1e-5 * np.abs(GradientR).max()), f"{SensitivityType} buckling load sensitivity of an indeterminate frame is wrong."
+
+
+@pytest.mark.parametrize("MassType", ["Consistent", "Lumped"])
+@pytest.mark.parametrize("SensitivityType, Attribute", [("Axial", "area"), ("Bending", "moment_of_inertia")])
+def test_FrequencySensitivity(setup_model, MassType, SensitivityType, Attribute):
+    DynamicResponseT = DynamicGlobalResponse(Points = setup_model[0], Members = setup_model[1], Loads = setup_model[2], MassType = MassType)
+    GradientT = DynamicResponseT.FrequencySensitivity(SensitivityType)
+    GradientR = FiniteDifference(DynamicResponseT, Attribute, lambda ResponseT: ResponseT.ModalAnalysis(NumModes = 1)["Frequency"][0])
+
+    assert np.allclose(GradientT, GradientR, rtol=1e-4, atol=1e-5 * np.abs(GradientR).max()), f"{SensitivityType} frequency sensitivity is wrong."
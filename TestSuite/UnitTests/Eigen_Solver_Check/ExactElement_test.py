@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+def PortalFrame(Division, SecondOrderElement):
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=5, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    # loads at the member ends act as nodal loads, so that one exact element per member is exact
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-15000, Distance1=0, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=-15000, Distance1=5, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=-500, Distance1=5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    if Division > 1:
+        PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, Division)
+    return SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, SecondOrderElement = SecondOrderElement)
+
+
+def test_StabilityFunctions():
+    MemberT = Member(Beam_Number=1, Start_Node=Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+                     End_Node=Node(Node_Number=2, xcoordinate=3, ycoordinate=4, Support_Condition="Rigid Joint"),
+                     Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675)
+    EI = MemberT.youngs_modulus * MemberT.moment_of_inertia
+
+    # series and closed forms meet at |N| L^2 / EI = 1
+    for Sign in (1, -1):
+        Series = np.array(Computer.StabilityFunctions(Sign * (1 - 1e-9), 1.0, 1.0))
+        Closed = np.array(Computer.StabilityFunctions(Sign * (1 + 1e-9), 1.0, 1.0))
+        assert np.allclose(Series, Closed, rtol=1e-8), "Series and closed form stability functions differ."
+    # large tension must stay finite
+    assert np.all(np.isfinite(Computer.StabilityFunctions(1e6, 1.0, 1.0))), "Stability functions overflow in tension."
+
+    for NormalForce in (-1e-2, 25.0):
+        Linearized = np.array(MemberT.Second_Order_Local_Stiffness_Matrix_1(NormalForce))
+        assert np.allclose(MemberT.Second_Order_Local_Stiffness_Matrix_3(NormalForce), Linearized, rtol=1e-6, atol=1e-6), \
+            "Exact element must tend to the linearized element for small normal forces."
+    NormalForce = -0.8 * np.pi**2 * EI / MemberT.length()**2
+    assert np.allclose(Computer.ElementMatrixTensor([MemberT], "Second_Order_Global_Stiffness_Matrix_3", [NormalForce])[0],
+                       MemberT.Second_Order_Global_Stiffness_Matrix_3(NormalForce)), "Batched exact element matrix is wrong."
+
+
+def test_ClampedBucklingCount():
+    # clamped-clamped loads: u = 2 pi, 8.9868 (tan(u/2) = u/2), 4 pi
+    u = np.array([0.5, 2 * np.pi * 0.99, 2 * np.pi * 1.01, 8.98, 8.99, 4 * np.pi * 1.01])
+    assert np.array_equal(Computer.ClampedBucklingCount(-u**2, 1.0, 1.0), [0, 0, 1, 1, 2, 3]), "Clamped buckling count is wrong."
+    assert np.array_equal(Computer.ClampedBucklingCount(u**2, 1.0, 1.0), np.zeros(6)), "Tension members have no buckling loads."
+
+
+def test_ExactBucklingSingleElement():
+    CriticalLoadR = PortalFrame(20, "Linearized").BucklingEigenLoad()[1]
+    CriticalLoadT = PortalFrame(1, "Exact").BucklingEigenLoad(NumModes = 3)[1]
+    CriticalLoadL = PortalFrame(1, "Linearized").BucklingEigenLoad()[1]
+
+    assert np.allclose(CriticalLoadT, CriticalLoadR[:3], rtol=1e-3), "One exact element per member must give the refined buckling loads."
+    assert not np.allclose(CriticalLoadL[:3], CriticalLoadR[:3], rtol=1e-3), "Reference check: the linearized element needs the refinement."
+
+
+def test_ExactSecondOrderSingleElement():
+    ResponseR = PortalFrame(20, "Linearized")
+    ResponseT = PortalFrame(1, "Exact")
+    DisplacementR = ResponseR.DisplacementVector()
+    DisplacementT = ResponseT.DisplacementVector()
+
+    # the original joints carry the first free DoFs in both models
+    assert np.allclose(DisplacementT, DisplacementR[:len(DisplacementT)], rtol=1e-6), "Exact second order displacements are wrong."
+    assert ResponseT.ConvergenceHistory["Converged"], "P-Delta iteration with the exact element did not converge."
@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+import scipy.sparse as sp
+
+import SecondOrderResponse
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(20)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=5, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-10000, Distance1=2.5, AssignedTo="Member 2", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 10)
+    return SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+
+@pytest.mark.parametrize("Solver", ["eigsh", "lobpcg"])
+def test_SparseBucklingModes(setup_model, monkeypatch, Solver):
+    SecondOrderResponseT = setup_model
+    EigenValueR = SecondOrderResponseT.BucklingEigenLoad()[1][:6]
+
+    # the sparse path must not fall back on the dense eigen solver
+    monkeypatch.setattr(SecondOrderResponse, "eig", None)
+    CriticalLoadT, EigenValueT, EigenModeT = SecondOrderResponseT.BucklingEigenLoad(Solver = Solver, NumModes = 6)
+
+    assert np.allclose(EigenValueT, EigenValueR, atol=0.02), f"{Solver} buckling load factors are wrong."
+    assert np.isclose(CriticalLoadT, EigenValueR[0], atol=0.02), f"{Solver} critical load factor is wrong."
+    assert EigenModeT.shape == (len(SecondOrderResponseT.UnConstrainedDoF()), 6), "Only the requested modes must be returned."
+
+
+def test_SturmCount(setup_model):
+    SecondOrderResponseT = setup_model
+    EigenValueR = np.array(SecondOrderResponseT.BucklingEigenLoad()[1])
+    Operator = SecondOrderResponseT.SecondOrderStiffnessOperator()
+    K = Computer.SecondOrderStiffnessMatrix(Operator, Sparse = True)
+    KG = Computer.SecondOrderStiffnessMatrix(Operator, SecondOrderResponseT.NormalForce(), Linear = False, Sparse = True)
+
+    for Shift in (10, 100, 500):
+        CountR = int(np.sum((EigenValueR > 0) & (EigenValueR < Shift)))
+        assert Computer.SturmCount(K, KG, Shift) == CountR, "Sparse Sturm count is wrong."
+        assert Computer.SturmCount(K.toarray(), KG.toarray(), Shift) == CountR, "Dense Sturm count is wrong."
+
+
+def test_SturmCountUnsymmetricPivoting():
+    # zero diagonal: SuperLU pivots off the diagonal, the count must come from the dense LDL^T instead
+    Matrix = np.array([[0.0, 1.0], [1.0, 0.0]])
+    with pytest.warns(RuntimeWarning):
+        assert Computer.NegativePivotCount(sp.csc_matrix(Matrix)) == 1, "Sparse inertia with unsymmetric pivoting is wrong."
+    assert Computer.NegativePivotCount(Matrix) == 1, "Dense inertia is wrong."
+
+
+def test_SparseModelDefaultsToSparseSolver(setup_model, monkeypatch):
+    SecondOrderResponseT = setup_model
+    EigenValueR = SecondOrderResponseT.BucklingEigenLoad()[1][:10]
+
+    SecondOrderResponseT.Sparse = True
+    monkeypatch.setattr(SecondOrderResponse, "eig", None)
+    EigenValueT = SecondOrderResponseT.BucklingEigenLoad()[1]
+    assert np.allclose(EigenValueT, EigenValueR, atol=0.02), "Sparse model has to use the sparse buckling solver by default."
+
+
+def test_NumModesDefaultsToSparseSolver(setup_model, monkeypatch):
+    SecondOrderResponseT = setup_model
+    EigenValueR = SecondOrderResponseT.BucklingEigenLoad()[1][:3]
+
+    # NumModes alone routes the default solver to the sparse path, also on a model that is not Sparse
+    monkeypatch.setattr(SecondOrderResponse, "eig", None)
+    EigenValueT = SecondOrderResponseT.BucklingEigenLoad(NumModes = 3)[1]
+    assert np.allclose(EigenValueT, EigenValueR, atol=0.02), "NumModes has to use the sparse buckling solver by default."
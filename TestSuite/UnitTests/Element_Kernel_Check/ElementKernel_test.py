@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+
+from StructuralElements import Node, Member
+from Computer import Computer
+from Loads import NeumanBC
+
+
+@pytest.fixture
+def setup_members():
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=3, ycoordinate=4, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=7, ycoordinate=2, Support_Condition="Hinge Joint")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07, Density=2500),
+    ]
+    return MembersT
+
+
+@pytest.mark.parametrize("MatrixType", ["First_Order_Global_Stiffness_Matrix_1",
+                                        "Second_Order_Global_Reduction_Matrix_1",
+                                        "Second_Order_Global_Stiffness_Matrix_1",
+                                        "Global_Mass_Matrix"])
+def test_BatchedElementMatrices(setup_members, MatrixType):
+    MembersT = setup_members
+    NormalForce = [-1500.0, 320.0] if "Second" in MatrixType else None
+
+    BatchedT = Computer.ElementMatrixTensor(MembersT, MatrixType, NormalForce)
+    if NormalForce is None:
+        BatchedR = [getattr(member, MatrixType)() for member in MembersT]
+    else:
+        BatchedR = [getattr(member, MatrixType)(NormalForce[i]) for i, member in enumerate(MembersT)]
+
+    assert BatchedT.shape == (2, 6, 6), "Batched element tensor has the wrong shape."
+    assert np.allclose(BatchedT, BatchedR), f"Batched {MatrixType} is wrong."
+
+
+@pytest.mark.parametrize("MatrixType", ["First_Order_Local_Stiffness_Matrix_1",
+                                        "Second_Order_Local_Stiffness_Matrix_1"])
+def test_BatchedMemberForceLocal(setup_members, MatrixType):
+    MembersT = setup_members
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-5, Distance1=0, Distance2=5, AssignedTo="Member 1", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=-20, Distance1=2, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=8, Distance1=1, AssignedTo="Member 2", Members = MembersT)
+    ]
+    NormalForce = [-1500.0, 320.0] if "Second" in MatrixType else None
+    MemberDisplacementAll = np.array([[0, 0, 0, 1e-3, -2e-3, 5e-4], [1e-3, -2e-3, 5e-4, 3e-3, 0, -1e-3]])
+
+    ForceT = Computer.MemberDisplacement_To_ForceLocalAll(MatrixType, MembersT, MemberDisplacementAll, LoadsT, NormalForce)
+    ForceR = [Computer.MemberDisplacement_To_ForceLocal(MatrixType, i+1, MembersT, MemberDisplacementAll[i], LoadsT,
+                                                        None if NormalForce is None else NormalForce[i]) for i in range(2)]
+
+    assert np.allclose(ForceT, ForceR), f"Batched end forces with {MatrixType} are wrong."
@@ -0,0 +1,24 @@
+import pytest
+import numpy as np
+
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Model import Model
+
+
+def test_LoadOnDoFWithoutEquation():
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=5, ycoordinate=0, Support_Condition="Glided Support"),
+        Node(Node_Number=3, xcoordinate=10, ycoordinate=0, Support_Condition="Rigid Joint")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1),
+    ]
+    # a point load at the start of member 2 is a nodal load on the y DoF of the Glided Support
+    LoadsT = [NeumanBC(type="PL", Magnitude=-10, Distance1=0, AssignedTo="Member 2", Members = MembersT)]
+    ModelT = Model(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+    assert ModelT.DoFPartition()["EquationIndex"][PointsT[1].dof_y] == -1, "Reference check: the DoF has no equation."
+    assert np.allclose(ModelT.LoadVector(LoadsT), 0), "A load on a DoF without equation must not reach any other equation."
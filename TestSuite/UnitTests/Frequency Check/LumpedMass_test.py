@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from DynamicResponse import DynamicGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    # L-frame, fixed at the base and hinged at the tip of the beam
+    config.set_FEDivision(20)
+    PointsT = [
+    Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+    Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+    Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Hinged Support"),
+    ]
+    MembersT = [
+    Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07),
+    Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07),
+    ]
+    LoadsT = [
+    NeumanBC(type="PL", Magnitude=-10000, Distance1= 2.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 10)
+    return DynamicGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, MassType = "Lumped")
+
+
+def test_LumpedMassVector(setup_model):
+    DynamicResponseT = setup_model
+    MassT = DynamicResponseT.GlobalMassMatrixCondensed()
+    Direction = DynamicResponseT.DoFPartition()["Direction"][:len(MassT)]
+
+    # the halves of the members at the fixed base and the hinged tip sit on restrained DoFs
+    MassR = 0.016 * 7850 * (10 - 0.25 - 0.25)
+    assert MassT.ndim == 1, "Lumped mass must be stored as a vector."
+    assert np.allclose(MassT[Direction == 2], 0), "Rotations must be massless."
+    assert np.isclose(MassT[Direction == 0].sum(), MassR) and np.isclose(MassT[Direction == 1].sum(), MassR), "Lumped mass is wrong."
+
+
+def test_LumpedModes(setup_model):
+    DynamicResponseT = setup_model
+    FullT = DynamicResponseT.ModalAnalysis()
+    ConsistentT = DynamicResponseT.ModalAnalysis(MassType = "Consistent")
+    DynamicResponseT._AnalysisCache = None
+    LowestT = DynamicResponseT.ModalAnalysis(NumModes = 6)
+
+    K = Computer.StiffnessMatrixAssembler(DynamicResponseT.UnConstrainedDoF(), DynamicResponseT.Members, "First_Order_Global_Stiffness_Matrix_1")
+    MassT = DynamicResponseT.GlobalMassMatrixCondensed()
+    Phi = LowestT["EigenMode"]
+
+    assert np.allclose(LowestT["Frequency"], FullT["Frequency"][:6]), "Sparse and dense lumped frequencies differ."
+    assert np.allclose(K @ Phi, MassT[:, None] * Phi * LowestT["EigenValue"], atol=1e-6 * np.abs(K @ Phi).max()), "Lumped modes are wrong."
+    assert np.allclose(Phi.T @ (MassT[:, None] * Phi), np.eye(6), atol=1e-8), "Lumped modes are not mass normalized."
+    assert np.allclose(FullT["Frequency"][:3], ConsistentT["Frequency"][:3], rtol=1e-3), "Lumped and consistent fundamental frequencies differ."
+    assert len(FullT["Frequency"]) == np.count_nonzero(MassT), "Condensed problem must have one mode per mass."
+
+
+def test_UnknownMassType(setup_model):
+    DynamicResponseT = setup_model
+    with pytest.raises(ValueError):
+        DynamicResponseT.EigenFrequency(MassType = "Diagonal")
@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from DynamicResponse import DynamicGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(20)
+    PointsT = [
+    Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+    Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Fixed Support"),
+    ]
+    MembersT = [
+    Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07),
+    ]
+    LoadsT = [
+    NeumanBC(type="PL", Magnitude=-10000, Distance1= 2.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 10)
+    return DynamicGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+
+def test_SparseLowestModes(setup_model):
+    DynamicResponseT = setup_model
+    FullT = DynamicResponseT.ModalAnalysis()
+    DynamicResponseT._AnalysisCache = None
+
+    LowestT = DynamicResponseT.ModalAnalysis(NumModes = 5)
+    assert np.allclose(LowestT["Frequency"], FullT["Frequency"][:5]), "Lowest frequencies of the sparse solver are wrong."
+    assert LowestT["EigenMode"].shape == (27, 5), "Only the requested modes must be returned."
+    assert np.allclose(np.abs(LowestT["EigenMode"]), np.abs(FullT["EigenMode"][:, :5]), atol=1e-6), "Modes of the sparse solver are wrong."
+
+    BandT = DynamicResponseT.ModalAnalysis(FrequencyBand = (1, 20))["Frequency"]
+    BandR = FullT["Frequency"][(FullT["Frequency"] >= 1) & (FullT["Frequency"] <= 20)]
+    assert np.allclose(BandT, BandR), "Frequencies inside the band are wrong."
+
+
+def test_MassNormalizedParticipation(setup_model):
+    DynamicResponseT = setup_model
+    ModalT = DynamicResponseT.ModalAnalysis()
+    MassT = Computer.StiffnessMatrixAssembler(DynamicResponseT.UnConstrainedDoF(), DynamicResponseT.Members, "Global_Mass_Matrix")
+
+    Phi = ModalT["EigenMode"]
+    assert np.allclose(Phi.T @ MassT @ Phi, np.eye(Phi.shape[1]), atol=1e-8), "Modes are not mass normalized."
+    assert np.allclose(ModalT["EffectiveMass"].sum(axis=0), ModalT["TotalMass"]), "Effective masses of all modes must add up to the total mass."
+
+
+def test_ModesReused(setup_model, monkeypatch):
+    DynamicResponseT = setup_model
+    DynamicResponseT.EigenFrequency(NumModes = 4)
+
+    def Resolve(*args, **kwargs):
+        raise AssertionError("Modal problem solved again.")
+    monkeypatch.setattr(Computer, "ModalEigenSolver", Resolve)
+
+    DynamicResponseT.MemberEigenMode(3, EigenModeNo = 2)
+    assert len(DynamicResponseT.EigenFrequency(EigenModeNo = 3)[1]) == 3, "Cached modes are not reused."
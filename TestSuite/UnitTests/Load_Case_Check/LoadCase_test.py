@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from FirstOrderResponse import FirstOrderMemberResponse
+
+
+def Frame():
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=6, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=6, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675)
+    ]
+    LoadCasesT = {
+        "Dead": [NeumanBC(type="UDL", Magnitude=-10, Distance1=0, Distance2=6, AssignedTo="Member 2", Members = MembersT)],
+        "Live": [NeumanBC(type="PL", Magnitude=-25, Distance1=2, AssignedTo="Member 2", Members = MembersT)],
+        "Wind": [NeumanBC(type="UDL", Magnitude=-4, Distance1=0, Distance2=5, AssignedTo="Member 1", Members = MembersT)]
+    }
+    return PointsT, MembersT, LoadCasesT
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(1000)
+    PointsT, MembersT, LoadCasesT = Frame()
+    LoadCombinationsT = {"ULS": {"Dead": 1.35, "Live": 1.5}, "ULS-W": {"Dead": 1.0, "Wind": 1.5}}
+    return FirstOrderMemberResponse(Points=PointsT, Members=MembersT, LoadCases=LoadCasesT, LoadCombinations=LoadCombinationsT)
+
+
+def SingleCaseModel(Factors):
+    PointsT, MembersT, LoadCasesT = Frame()
+    LoadsT = []
+    for Case, Factor in Factors.items():
+        for load in LoadCasesT[Case]:
+            LoadsT.append(NeumanBC(type=load.type, Magnitude=Factor*load.Magnitude, Distance1=load.Distance1, Distance2=load.Distance2,
+                                   AssignedTo=load.AssignedTo, Members = MembersT))
+    return FirstOrderMemberResponse(Points=PointsT, Members=MembersT, Loads=LoadsT)
+
+
+def test_LoadCaseDisplacement(setup_model):
+    MemberResponseT = setup_model
+
+    DisplacementT = MemberResponseT.LoadCaseDisplacement()
+    assert DisplacementT.shape == (len(MemberResponseT.UnConstrainedDoF()), 3), "One displacement column per load case expected."
+    for i, Case in enumerate(MemberResponseT.LoadCaseNames()):
+        DisplacementR = SingleCaseModel({Case: 1.0}).DisplacementVector()
+        assert np.allclose(DisplacementT[:, i], DisplacementR), f"Displacement of load case {Case} is wrong."
+
+
+def test_LoadCombination(setup_model):
+    MemberResponseT = setup_model
+
+    for Name in ("ULS", "ULS-W"):
+        ModelR = SingleCaseModel(MemberResponseT.LoadCombinations[Name])
+        assert np.allclose(MemberResponseT.LoadCaseDisplacement(Name), ModelR.DisplacementVector()), f"Displacement of combination {Name} is wrong."
+        assert np.allclose(MemberResponseT.LoadCaseMemberForceLocal(Name), ModelR.MemberForceLocalAll(), atol=0.02), f"Member forces of combination {Name} are wrong."
+
+    Factorization = MemberResponseT.StiffnessFactorization()
+    for Name in ("Dead", "ULS", "ULS-W"):
+        MemberResponseT.LoadCaseMemberForceLocal(Name)
+    assert MemberResponseT.StiffnessFactorization() is Factorization, "Load cases must share a single factorization."
+
+    with pytest.raises(ValueError):
+        MemberResponseT.LoadCaseDisplacement("SLS")
@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from FirstOrderResponse import FirstOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_members():
+    config.set_FEDivision(1000)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=6, ycoordinate=8, Support_Condition="Fixed Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=1, Youngs_Modulus=1, Moment_of_Inertia=1)
+    ]
+    return MembersT
+
+
+def test_PointLoadFixedEndForce(setup_members):
+    MembersT = setup_members
+    P, a, L = -12, 3, 10
+    b = L - a
+    LoadT = NeumanBC(type="PL", Magnitude=P, Distance1=a, AssignedTo="Member 1", Members = MembersT)
+
+    # Equivalent nodal loads are the textbook fixed end reactions with the opposite sign
+    FixedEndForceR = [0, P*b**2*(L+2*a)/L**3, P*a*b**2/L**2, 0, P*a**2*(L+2*b)/L**3, -P*a**2*b/L**2]
+    assert np.allclose(LoadT.EquivalentLoad(ReturnLocal = True), FixedEndForceR), "Closed form PL fixed end forces are wrong."
+
+
+def test_UDLFixedEndForce(setup_members):
+    MembersT = setup_members
+    w, L = -5, 10
+    LoadT = NeumanBC(type="UDL", Magnitude=w, Distance1=0, Distance2=L, AssignedTo="Member 1", Members = MembersT)
+
+    FixedEndForceR = [0, w*L/2, w*L**2/12, 0, w*L/2, -w*L**2/12]
+    assert np.allclose(LoadT.EquivalentLoad(ReturnLocal = True), FixedEndForceR), "Closed form UDL fixed end forces are wrong."
+
+
+def test_PartialUDLFreeMoment(setup_members):
+    MembersT = setup_members
+    LoadT = NeumanBC(type="UDL", Magnitude=-4, Distance1=2, Distance2=7, AssignedTo="Member 1", Members = MembersT)
+
+    Positions = np.linspace(0, 10, 100001)
+    FreeMoment = np.array(LoadT.FreeMoment(Positions))
+    va, vb, A, Ac = LoadT.FreeMomentIntegrals()
+
+    assert np.isclose(FreeMoment[0], 0) and np.isclose(FreeMoment[-1], 0), "Free moment must vanish at the supports."
+    assert np.isclose(np.trapezoid(FreeMoment, Positions), A, rtol=1e-6), "Closed form free moment area is wrong."
+    assert np.isclose(np.trapezoid(FreeMoment*Positions, Positions), Ac, rtol=1e-6), "Closed form free moment first moment is wrong."
+    assert len(LoadT.FreeMoment()) == config.get_FEDivision(), "Default free moment grid must follow FEDivision."
+
+
+def test_UnsymmetricLoadNodalDisplacement():
+    def Frame():
+        PointsT = [Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Hinged Support"),
+                   Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+                   Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Hinged Support")]
+        MembersT = [Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+                    Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675)]
+        LoadsT = [NeumanBC(type="UDL", Magnitude=-20, Distance1=0, Distance2=3, AssignedTo="Member 1", Members = MembersT),
+                  NeumanBC(type="PL", Magnitude=-10, Distance1=1, AssignedTo="Member 2", Members = MembersT)]
+        return PointsT, MembersT, LoadsT
+
+    # Exact fixed end forces give the exact nodal displacement, whatever the element division
+    PointsT, MembersT, LoadsT = Frame()
+    DisplacementT = FirstOrderGlobalResponse(Points=PointsT, Members=MembersT, Loads=LoadsT).DisplacementVectorDict()
+    NodeDoF = PointsT[1].DoF()
+    PointsR, MembersR, LoadsR = divide_into_finite_elements(*Frame(), 10)
+    DisplacementR = FirstOrderGlobalResponse(Points=PointsR, Members=MembersR, Loads=LoadsR).DisplacementVectorDict()
+    NodeR = [node for node in PointsR if node.xcoordinate == 0 and node.ycoordinate == 5][0]
+
+    assert np.allclose([DisplacementT[str(dof)] for dof in NodeDoF], [DisplacementR[str(dof)] for dof in NodeR.DoF()], rtol=1e-6, atol=1e-12), "Nodal displacement depends on the element division."
+
+
+def test_EquivalentLoadCache(setup_members):
+    MembersT = setup_members
+    LoadT = NeumanBC(type="UDL", Magnitude=-5, Distance1=0, Distance2=10, AssignedTo="Member 1", Members = MembersT)
+
+    FixedEndForce1 = LoadT.EquivalentLoad(ReturnLocal = True)
+    FixedEndForce1[2] = 0
+    assert np.isclose(LoadT.EquivalentLoad(ReturnLocal = True)[2], -5*10**2/12), "Cached fixed end forces were modified by the caller."
+
+    LoadT.Magnitude = -10
+    assert np.isclose(LoadT.EquivalentLoad(ReturnLocal = True)[2], -10*10**2/12), "Cache not invalidated after a load change."
+
+    MembersT[0].End_Node.xcoordinate = 0
+    MembersT[0].End_Node.ycoordinate = 12
+    assert not np.isclose(LoadT.EquivalentLoad(ReturnLocal = True)[2], -10*10**2/12), "Cache not invalidated after a geometry change."
@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from SecondOrderResponse import SecondOrderGlobalResponse
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(1000)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=10, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=6, ycoordinate=10, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=6, ycoordinate=0, Support_Condition="Fixed Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.01, Youngs_Modulus=200000000, Moment_of_Inertia=0.00002),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.01, Youngs_Modulus=200000000, Moment_of_Inertia=0.00002),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.01, Youngs_Modulus=200000000, Moment_of_Inertia=0.00002)
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-60, Distance1=0, Distance2=6, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=-10, Distance1=5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    return SecondOrderGlobalResponse(Points=PointsT, Members=MembersT, Loads=LoadsT)
+
+
+def test_ConvergedPDelta(setup_model):
+    ResponseT = setup_model
+
+    DisplacementT, HistoryT = ResponseT.DisplacementVector(ReturnHistory = True)
+    DisplacementR = ResponseT.DisplacementVector(50, Tolerance = 0)
+
+    assert HistoryT["Converged"], "P-Delta iteration did not converge."
+    assert HistoryT["Iterations"] < ResponseT.PDeltaMaxIterations, "Converged iteration must stop early."
+    assert len(HistoryT["NormalForceResidual"]) == HistoryT["Iterations"] == len(HistoryT["Time"]), "Convergence history is incomplete."
+    assert np.allclose(DisplacementT, DisplacementR, rtol=1e-6), "Converged displacement is wrong."
+
+
+def test_AitkenAndWarmStart(setup_model):
+    ResponseT = setup_model
+
+    DisplacementR = ResponseT.DisplacementVector()
+    ColdIterations = ResponseT.ConvergenceHistory["Iterations"]
+    DisplacementT = ResponseT.DisplacementVector(Acceleration = "Aitken")
+    assert np.allclose(DisplacementT, DisplacementR, rtol=1e-6), "Aitken accelerated displacement is wrong."
+
+    DisplacementT, HistoryT = ResponseT.DisplacementVector(WarmStart = True, ReturnHistory = True)
+    assert np.allclose(DisplacementT, DisplacementR, rtol=1e-6), "Warm started displacement is wrong."
+    assert HistoryT["Iterations"] < ColdIterations, "Warm start from the converged state must need fewer iterations."
+
+    with pytest.raises(ValueError):
+        ResponseT.DisplacementVector(Acceleration = "Anderson")
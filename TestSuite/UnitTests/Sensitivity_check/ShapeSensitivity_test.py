@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Sensitivity import Senstivity
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(20)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0.5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=6, ycoordinate=7, Support_Condition="Hinge Joint"),
+        Node(Node_Number=4, xcoordinate=8, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.05, Youngs_Modulus=200000000, Moment_of_Inertia=0.0004),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=210000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-10, Distance1=1, Distance2=4, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=5, Distance1=2, AssignedTo="Member 1", Members = MembersT)
+    ]
+    return Senstivity(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+
+def Compliance(SensitivityT):
+    return float(np.dot(SensitivityT.ForceVector(), SensitivityT.DisplacementVector()))
+
+
+def StiffnessEnergy(SensitivityT, Displacement):
+    return float(Displacement @ SensitivityT.GlobalStiffnessMatrixCondensed() @ Displacement)
+
+
+def test_ShapeSensitivity(setup_model):
+    SensitivityT = setup_model
+    ComplianceGradient = SensitivityT.ComplianceShapeSensitivity()
+    StiffnessGradient = SensitivityT.NodeShapeSensitivity()
+    Displacement = SensitivityT.DisplacementVector()
+
+    # central finite differences, every coordinate restored afterwards
+    Step = 1e-6
+    for NodeIndex, node in enumerate(SensitivityT.Points):
+        for Direction, Attribute in enumerate(("xcoordinate", "ycoordinate")):
+            Value = getattr(node, Attribute)
+            setattr(node, Attribute, Value + Step)
+            CompliancePlus, EnergyPlus = Compliance(SensitivityT), StiffnessEnergy(SensitivityT, Displacement)
+            setattr(node, Attribute, Value - Step)
+            ComplianceMinus, EnergyMinus = Compliance(SensitivityT), StiffnessEnergy(SensitivityT, Displacement)
+            setattr(node, Attribute, Value)
+
+            assert np.isclose(ComplianceGradient[NodeIndex, Direction], (CompliancePlus - ComplianceMinus) / (2 * Step), rtol=1e-4, atol=1e-9), "Compliance shape sensitivity is wrong."
+            assert np.isclose(StiffnessGradient[NodeIndex, Direction], (EnergyPlus - EnergyMinus) / (2 * Step), rtol=1e-4, atol=1e-9), "Stiffness shape sensitivity is wrong."
+
+    assert np.isclose(SensitivityT.NodeYSensitivity(3), StiffnessGradient[2, 1]), "Node sensitivity picks the wrong node."
+    assert SensitivityT.GlobalShapeSensitivity("X") == StiffnessGradient[:, 0].tolist(), "Global shape sensitivity is wrong."
+
+
+def test_FixedEndForceLengthDerivative(setup_model):
+    SensitivityT = setup_model
+    load = SensitivityT.Loads[0]
+    Length = SensitivityT.Members[1].length()
+    DerivativeR = (np.array(load.LocalFixedEndForce(Length + 1e-6)) - np.array(load.LocalFixedEndForce(Length - 1e-6))) / 2e-6
+    assert np.allclose(load.LocalFixedEndForceLengthDerivative(), DerivativeR, rtol=1e-6), "Length derivative of the fixed end forces is wrong."
+    assert np.allclose(load.LocalFixedEndForce(), load.EquivalentLoad(ReturnLocal = True)), "Fixed end forces changed."
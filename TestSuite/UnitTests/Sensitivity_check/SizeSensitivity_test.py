@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Sensitivity import Senstivity
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(20)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=6, ycoordinate=7, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=8, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.05, Youngs_Modulus=200000000, Moment_of_Inertia=0.0004),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=210000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-10, Distance1=0, Distance2=6.3, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=5, Distance1=2, AssignedTo="Member 1", Members = MembersT)
+    ]
+    return Senstivity(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+
+def Compliance(SensitivityT):
+    return float(np.dot(SensitivityT.ForceVector(), SensitivityT.DisplacementVector()))
+
+
+@pytest.mark.parametrize("SensitivityType, Attribute", [("Axial", "area"), ("Bending", "moment_of_inertia"), ("Material", "youngs_modulus")])
+def test_SizeSensitivity(setup_model, SensitivityType, Attribute):
+    SensitivityT = setup_model
+    ComplianceGradient = SensitivityT.ComplianceSizeSensitivity(SensitivityType)
+    Properties = [getattr(member, Attribute) for member in SensitivityT.Members]
+
+    # central finite differences of the compliance, every member restored afterwards
+    ComplianceGradientR = []
+    for member, Value in zip(SensitivityT.Members, Properties):
+        Step = 1e-6 * Value
+        setattr(member, Attribute, Value + Step)
+        Plus = Compliance(SensitivityT)
+        setattr(member, Attribute, Value - Step)
+        Minus = Compliance(SensitivityT)
+        setattr(member, Attribute, Value)
+        ComplianceGradientR.append((Plus - Minus) / (2 * Step))
+
+    assert np.allclose(ComplianceGradient, ComplianceGradientR, rtol=1e-5), f"{SensitivityType} sensitivity is wrong."
+    assert np.allclose(SensitivityT.GlobalSizeSensitivity(SensitivityType), -ComplianceGradient), "Member sensitivities have the wrong sign."
+
+
+def test_ModelUnchanged(setup_model):
+    SensitivityT = setup_model
+    Displacement = SensitivityT.DisplacementVector()
+    Areas = [member.area for member in SensitivityT.Members]
+
+    for MemberNumber in (1, 2, 3):
+        SensitivityT.AxialMemberSensitivity(MemberNumber, 1e-6)
+        SensitivityT.BendingMemberSensitivity(MemberNumber, 1e-6)
+        SensitivityT.MaterialSensitivity(MemberNumber, 1e-6)
+
+    assert [member.area for member in SensitivityT.Members] == Areas, "Sensitivity analysis modified the members."
+    assert np.allclose(SensitivityT.DisplacementVector(), Displacement), "Sensitivity analysis modified the model."
+    with pytest.raises(ValueError):
+        SensitivityT.GlobalSizeSensitivity("Shear")
@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from FirstOrderResponse import FirstOrderGlobalResponse
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(100)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=5, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-10000, Distance1=2.5, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="UDL", Magnitude=-2000, Distance1=0, Distance2=5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 4)
+    return PointsT, MembersT, LoadsT
+
+
+@pytest.mark.parametrize("Solver", ["Cholesky", "DenseLU", "LU", "Banded", "CG"])
+def test_DisplacementSolvers(setup_model, Solver):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Solver = Solver)
+
+    K = ResponseT.GlobalStiffnessMatrixCondensed()
+    F = np.array(ResponseT.ForceVector())
+    DisplacementR = np.linalg.solve(K, F)
+
+    assert np.allclose(ResponseT.DisplacementVector(), DisplacementR, rtol=1e-6, atol=1e-12), f"{Solver} displacement is wrong."
+
+    # Multiple right hand sides against one factorization
+    Solve = Computer.Factorize(K, Solver)
+    assert np.allclose(Solve(np.column_stack([F, 2 * F])), np.column_stack([DisplacementR, 2 * DisplacementR]), rtol=1e-6, atol=1e-12), f"{Solver} multi RHS solve is wrong."
+
+
+def test_SecondOrderSolver(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    CholeskyResponse = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Solver = "Cholesky")
+    LUResponse = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Solver = "LU", Sparse = True)
+
+    assert np.allclose(CholeskyResponse.DisplacementVector(5), LUResponse.DisplacementVector(5)), "Second order displacement depends on the solver."
+
+
+def test_UnknownSolver(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Solver = "Inverse")
+    with pytest.raises(ValueError):
+        ResponseT.DisplacementVector()
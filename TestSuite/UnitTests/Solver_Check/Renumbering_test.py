@@ -0,0 +1,98 @@
+import os
+import timeit
+import pytest
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from FirstOrderResponse import FirstOrderGlobalResponse
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+def GridFrame(Bays, Division):
+    # Bays bay, Bays storey frame, the nodes of the divided members are numbered after all frame nodes
+    PointsT = [Node(Node_Number=j*(Bays+1)+i+1, xcoordinate=4*i, ycoordinate=3*j,
+                    Support_Condition="Fixed Support" if j == 0 else "Rigid Joint")
+               for j in range(Bays+1) for i in range(Bays+1)]
+    MembersT = []
+    for j in range(Bays+1):
+        for i in range(Bays+1):
+            if j < Bays:
+                MembersT.append(Member(Beam_Number=len(MembersT)+1, Start_Node=PointsT[j*(Bays+1)+i], End_Node=PointsT[(j+1)*(Bays+1)+i],
+                                       Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675))
+            if i < Bays and j > 0:
+                MembersT.append(Member(Beam_Number=len(MembersT)+1, Start_Node=PointsT[j*(Bays+1)+i], End_Node=PointsT[j*(Bays+1)+i+1],
+                                       Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675))
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-100, Distance1=2, AssignedTo=f"Member {len(MembersT)}", Members = MembersT),
+        NeumanBC(type="UDL", Magnitude=-20, Distance1=0, Distance2=3, AssignedTo="Member 1", Members = MembersT)
+    ]
+    return divide_into_finite_elements(PointsT, MembersT, LoadsT, Division)
+
+
+@pytest.fixture
+def setup_model():
+    return GridFrame(4, 4)
+
+
+@pytest.mark.parametrize("Renumbering", ["RCM", "NestedDissection"])
+@pytest.mark.parametrize("Solver", ["LU", "Banded", "Cholesky"])
+def test_RenumberedDisplacement(setup_model, Renumbering, Solver):
+    PointsT, MembersT, LoadsT = setup_model
+    DisplacementR = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT).DisplacementVector()
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Renumbering = Renumbering, Solver = Solver)
+
+    Permutation = ResponseT.EquationPermutation()
+    assert np.array_equal(np.sort(Permutation), np.arange(len(DisplacementR))), "Equation renumbering is not a permutation."
+    assert np.allclose(ResponseT.DisplacementVector(), DisplacementR, rtol=1e-8, atol=1e-14), "Renumbering must not change the displacements."
+
+
+def test_RenumberingStatistics(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    RCM = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Renumbering = "RCM").RenumberingStatistics()
+    ND = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Renumbering = "NestedDissection").RenumberingStatistics()
+
+    assert RCM["After"]["Bandwidth"] < RCM["Before"]["Bandwidth"] / 5, "RCM must narrow the band of the divided frame."
+    assert RCM["After"]["Profile"] < RCM["Before"]["Profile"], "RCM must reduce the profile."
+    assert ND["After"]["Fill"] < ND["Before"]["Fill"], "Nested dissection must reduce the factor fill."
+    assert ND["After"]["Fill"] < RCM["After"]["Fill"], "Nested dissection must fill less than RCM on a grid frame."
+
+
+def test_NestedDissectionFill():
+    # about 2200 equations
+    PointsT, MembersT, LoadsT = GridFrame(8, 6)
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Renumbering = "NestedDissection")
+    K = ResponseT.GlobalStiffnessMatrixCondensed(Sparse = True).tocsc()
+    Permutation = ResponseT.EquationPermutation()
+
+    Default = splu(K)
+    Ordered = splu(K[Permutation][:, Permutation], permc_spec = "NATURAL")
+    assert Ordered.L.nnz + Ordered.U.nnz < (Default.L.nnz + Default.U.nnz) / 2, "Nested dissection must halve the sparse LU factors."
+
+
+# wall clock benchmark, only run with RUN_BENCHMARKS=1
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason = "benchmark, set RUN_BENCHMARKS=1 to run it")
+def test_NestedDissectionOrderingTime():
+    PointsT, MembersT, LoadsT = GridFrame(8, 6)
+    K = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT).GlobalStiffnessMatrixCondensed(Sparse = True).tocsc()
+
+    Ordering = min(timeit.repeat(lambda: Computer.EquationOrdering(K, "NestedDissection"), number = 1, repeat = 5))
+    Factorization = min(timeit.repeat(lambda: splu(K), number = 1, repeat = 5))
+    assert Ordering < 5 * Factorization, "Nested dissection ordering must not cost more than a few factorizations."
+
+
+def test_RenumberedSecondOrder(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseR = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    ResponseT = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Renumbering = "RCM", Solver = "LU")
+
+    assert np.allclose(ResponseT.DisplacementVector(5), ResponseR.DisplacementVector(5), rtol=1e-8, atol=1e-14), "Renumbered second order displacement is wrong."
+
+
+def test_UnknownOrdering():
+    with pytest.raises(ValueError):
+        Computer.EquationOrdering(np.eye(3), "Metis")
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+import scipy.sparse as sp
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from FirstOrderResponse import FirstOrderGlobalResponse
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(100)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=4, xcoordinate=5, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="PL", Magnitude=-10000, Distance1=2.5, AssignedTo="Member 2", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 5)
+    return PointsT, MembersT, LoadsT
+
+
+def test_SparseAssemblyMatchesDense(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+    DenseK = ResponseT.GlobalStiffnessMatrixCondensed(Sparse = False)
+    SparseK = ResponseT.GlobalStiffnessMatrixCondensed(Sparse = True)
+
+    assert sp.issparse(SparseK), "Sparse assembly did not return a scipy.sparse matrix."
+    assert np.allclose(SparseK.toarray(), DenseK), "Sparse and dense stiffness matrices differ."
+
+    DenseM = Computer.StiffnessMatrixAssembler(ResponseT.UnConstrainedDoF(), MembersT, "Global_Mass_Matrix")
+    SparseM = Computer.SparseStiffnessMatrixAssembler(ResponseT.UnConstrainedDoF(), MembersT, "Global_Mass_Matrix", Format = "csc")
+    assert np.allclose(SparseM.toarray(), DenseM), "Sparse and dense mass matrices differ."
+
+
+def test_SparseSecondOrderDisplacement(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    DenseResponse = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    SparseResponse = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Sparse = True)
+
+    assert np.allclose(SparseResponse.DisplacementVector(5), DenseResponse.DisplacementVector(5)), "Sparse second order displacement is wrong."
+    assert np.allclose(SparseResponse.BucklingEigenLoad()[0], DenseResponse.BucklingEigenLoad()[0]), "Sparse buckling load is wrong."
+
+
+def test_SecondOrderOperatorUpdate(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    DoF = ResponseT.UnConstrainedDoF()
+    Operator = ResponseT.SecondOrderStiffnessOperator()
+
+    for NormalForce in (np.linspace(-5000, 3000, len(MembersT)), np.full(len(MembersT), 250.0)):
+        KT = Computer.SecondOrderStiffnessMatrix(Operator, NormalForce, Sparse = True)
+        KR = Computer.StiffnessMatrixAssembler(DoF, MembersT, "Second_Order_Global_Stiffness_Matrix_1", NormalForce)
+        GT = Computer.SecondOrderStiffnessMatrix(Operator, NormalForce, Linear = False)
+        GR = Computer.StiffnessMatrixAssembler(DoF, MembersT, "Second_Order_Global_Reduction_Matrix_1", NormalForce)
+        assert np.allclose(KT.toarray(), KR), "Updated second order stiffness matrix is wrong."
+        assert np.allclose(GT, GR), "Updated geometric matrix is wrong."
+
+    assert ResponseT.SecondOrderStiffnessOperator() is Operator, "Operator must be built once per model revision."
+
+
+def test_SymbolicNumericAssembly(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    DoF = ResponseT.UnConstrainedDoF()
+    Pattern = ResponseT.AssemblyPattern()
+
+    for MatrixType in ("First_Order_Global_Stiffness_Matrix_1", "Global_Mass_Matrix"):
+        MatrixT = Computer.NumericAssembly(Pattern, Computer.ElementMatrixTensor(MembersT, MatrixType))
+        MatrixR = Computer.StiffnessMatrixAssembler(DoF, MembersT, MatrixType)
+        assert np.allclose(MatrixT.toarray(), MatrixR), f"Numeric assembly of {MatrixType} is wrong."
+        assert MatrixT.nnz == Pattern["nnz"], "Numeric assembly must keep the symbolic pattern."
+
+    assert ResponseT.AssemblyPattern() is Pattern, "Pattern must be built once per model revision."
@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from FirstOrderResponse import FirstOrderGlobalResponse, FirstOrderMemberResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(100)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=6, ycoordinate=5, Support_Condition="Hinge Joint"),
+        Node(Node_Number=4, xcoordinate=12, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=5, xcoordinate=12, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[3], End_Node=PointsT[2], Area=0.12, Youngs_Modulus=200000000, Moment_of_Inertia=0.0009),
+        Member(Beam_Number=4, Start_Node=PointsT[3], End_Node=PointsT[4], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-5, Distance1=0, Distance2=6, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=-20, Distance1=2.5, AssignedTo="Member 3", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=8, Distance1=1.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 6)
+    return PointsT, MembersT, LoadsT
+
+
+def test_SuperelementDisplacement(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    Reference = FirstOrderMemberResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    ResponseT = FirstOrderMemberResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Condensation = True)
+
+    assert np.allclose(ResponseT.DisplacementVector(), Reference.DisplacementVector(), rtol = 1e-8, atol = 1e-12), \
+        "Condensed displacements differ from the full solve."
+    assert np.allclose(ResponseT.MemberForceLocal(1, All = True), Reference.MemberForceLocal(1, All = True)), \
+        "Member forces from the condensed solve are wrong."
+
+
+def test_SuperelementChains(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT, Condensation = True)
+    Chains = ResponseT.SuperelementChains()
+
+    assert list(Chains["Groups"]) == [6], "Every original member has to become one chain of 6 elements."
+    assert Chains["Groups"][6]["Members"].shape == (4, 6), "Wrong number of chains."
+    assert len(Chains["Plain"]) == 0, "No member is left outside a chain."
+    # only the free DoFs of the original joints remain, every interior node removes its 3 DoFs
+    NumInterior = Chains["Groups"][6]["Interior"].size
+    assert ResponseT.SuperelementFactorization()["NumEquations"] == ResponseT.DoFPartition()["NumFree"] - 3 * NumInterior, "Reduced system must contain the original joints only."
@@ -0,0 +1,65 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from FirstOrderResponse import FirstOrderNodalResponse
+from SecondOrderResponse import SecondOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(100)
+    PointsT = [
+        Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+        Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=3, xcoordinate=5, ycoordinate=5, Support_Condition="Hinge Joint"),
+        Node(Node_Number=4, xcoordinate=10, ycoordinate=5, Support_Condition="Rigid Joint"),
+        Node(Node_Number=5, xcoordinate=10, ycoordinate=0, Support_Condition="Hinged Support")
+    ]
+    MembersT = [
+        Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=2, Start_Node=PointsT[1], End_Node=PointsT[2], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=3, Start_Node=PointsT[2], End_Node=PointsT[3], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+        Member(Beam_Number=4, Start_Node=PointsT[3], End_Node=PointsT[4], Area=0.09, Youngs_Modulus=200000000, Moment_of_Inertia=0.000675),
+    ]
+    LoadsT = [
+        NeumanBC(type="UDL", Magnitude=-20, Distance1=0, Distance2=5, AssignedTo="Member 2", Members = MembersT),
+        NeumanBC(type="PL", Magnitude=15, Distance1=2.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 5)
+    return PointsT, MembersT, LoadsT
+
+
+def test_StiffnessMatrixA21(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = FirstOrderNodalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    NumFree = len(ResponseT.UnConstrainedDoF())
+
+    KR = Computer.StiffnessMatrixAssembler(ResponseT.TotalDoF(), MembersT, "First_Order_Global_Stiffness_Matrix_1")
+    assert np.allclose(ResponseT.GlobalStiffnessMatrixCondensedA21(), KR[NumFree:, :NumFree]), "Sliced A21 is wrong."
+
+    SupportForces = ResponseT.SupportForcesVector()
+    assert np.allclose(SupportForces, KR[NumFree:, :NumFree] @ ResponseT.DisplacementVector()), "Support forces are wrong."
+    # the fixed support node carries the first three support forces
+    assert np.allclose(ResponseT.NodeForce(1), SupportForces[:3]), "Support forces are assigned to the wrong DoFs."
+    assert ResponseT.NodeForce(2) == [0, 0, 0], "A free node has no support forces."
+
+
+def test_SecondOrderStiffnessMatrixA21(setup_model):
+    PointsT, MembersT, LoadsT = setup_model
+    ResponseT = SecondOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+    NumFree = len(ResponseT.UnConstrainedDoF())
+    NormalForce = np.linspace(-50, 20, len(MembersT))
+
+    KR = Computer.StiffnessMatrixAssembler(ResponseT.TotalDoF(), MembersT, "Second_Order_Global_Stiffness_Matrix_1", NormalForce)
+    assert np.allclose(ResponseT.SecondOrderGlobalStiffnessMatrixCondensedA21(NormalForce), KR[NumFree:, :NumFree]), "Second order A21 is wrong."
+
+    SupportForces = ResponseT.SecondOrderSupportForcesVector()
+    assert np.allclose(SupportForces, ResponseT.SecondOrderGlobalStiffnessMatrixCondensedA21(ResponseT.NormalForceList) @ ResponseT.DisplacementVector()), \
+        "Second order support forces are wrong."
+    Restrained = ResponseT.ConstrainedDoF()
+    assert np.allclose([ResponseT.ForceVectorDict[str(dof)] for dof in Restrained], SupportForces), "Second order support force dict is wrong."
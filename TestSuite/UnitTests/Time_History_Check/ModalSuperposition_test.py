@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from DynamicResponse import DynamicGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    config.set_FEDivision(20)
+    PointsT = [
+    Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+    Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+    ]
+    MembersT = [
+    Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07),
+    ]
+    LoadsT = [
+    NeumanBC(type="PL", Magnitude=-10, Distance1= 2.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 10)
+    return DynamicGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT)
+
+
+def test_SDOFStepLoad():
+    Omega = np.array([2.0, 5.0])
+    Zeta = 0.05
+    Time = np.arange(2001) * 0.01
+    q, v, a = Computer.ModalResponseHistory(Omega, Zeta, np.ones((len(Time), 2)), 0.01)
+
+    OmegaD = Omega * np.sqrt(1 - Zeta**2)
+    Decay = np.exp(-Zeta * Omega * Time[:, None])
+    qR = (1 - Decay * (np.cos(OmegaD * Time[:, None]) + Zeta / np.sqrt(1 - Zeta**2) * np.sin(OmegaD * Time[:, None]))) / Omega**2
+    vR = Decay * np.sin(OmegaD * Time[:, None]) / OmegaD
+
+    assert np.allclose(q, qR, atol=1e-10), "Modal displacement of a step load is wrong."
+    assert np.allclose(v, vR, atol=1e-10), "Modal velocity of a step load is wrong."
+    assert np.allclose(a, 1 - 2 * Zeta * Omega * v - Omega**2 * q), "Modal acceleration is wrong."
+
+
+def test_ModalAgainstDirectIntegration(setup_model):
+    DynamicResponseT = setup_model
+    GroundAcceleration = np.sin(np.arange(401) * 0.5 * 0.1)
+
+    ModalT = DynamicResponseT.ModalTimeHistory(0.5, 400, NumModes = 10, GroundAcceleration = GroundAcceleration, DampingRatio = 0.02)
+    DirectR = DynamicResponseT.TimeHistory(0.05, 4000, GroundAcceleration = np.sin(np.arange(4001) * 0.05 * 0.1), DampingRatio = 0.02)
+
+    Scale = np.abs(DirectR["Displacement"]).max()
+    assert np.allclose(ModalT["Displacement"], DirectR["Displacement"][::10], atol=1e-3 * Scale), "Modal superposition differs from direct integration."
+
+
+def test_ResponseSpectrum(setup_model):
+    DynamicResponseT = setup_model
+    Modal = DynamicResponseT.ModalAnalysis(NumModes = 5)
+
+    SingleCQC = DynamicResponseT.ResponseSpectrum(lambda T: 2.0, NumModes = 1)
+    SingleSRSS = DynamicResponseT.ResponseSpectrum([[0, 2.0], [1000, 2.0]], NumModes = 1, Combination = "SRSS")
+    DisplacementR = np.abs(Modal["EigenMode"][:, 0] * Modal["ParticipationFactor"][0, 0] * 2.0 / Modal["AngularFrequency"][0]**2)
+    MemberForceR = Computer.MemberDisplacement_To_ForceLocalAll("First_Order_Local_Stiffness_Matrix_1", DynamicResponseT.Members,
+                                                                DynamicResponseT.MemberDisplacementArray(DisplacementR * np.sign(Modal["EigenMode"][:, 0])),
+                                                                [], FixedEndForce = np.zeros((len(DynamicResponseT.Members), 6)))
+
+    assert np.allclose(SingleCQC["Displacement"], DisplacementR), "Peak displacement of a single mode is wrong."
+    assert np.allclose(SingleSRSS["Displacement"], DisplacementR), "SRSS and CQC must agree for a single mode."
+    assert np.allclose(SingleCQC["MemberForceLocal"], np.abs(MemberForceR), atol=0.01), "Peak member forces are wrong."
+
+    Rho = Computer.CQCCorrelation(Modal["AngularFrequency"], 0.05)
+    assert np.allclose(np.diag(Rho), 1) and np.allclose(Rho, Rho.T), "CQC correlation is wrong."
+    FiveModes = DynamicResponseT.ResponseSpectrum(lambda T: 2.0, NumModes = 5, Combination = "SRSS")
+    assert np.all(FiveModes["Displacement"] >= SingleSRSS["Displacement"] - 1e-9), "Higher modes must not reduce the SRSS peak response."
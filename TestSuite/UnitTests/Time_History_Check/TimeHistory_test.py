@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+
+from config import config
+from StructuralElements import Node, Member
+from Loads import NeumanBC
+from Computer import Computer
+from DynamicResponse import DynamicGlobalResponse
+from FirstOrderResponse import FirstOrderGlobalResponse
+from FiniteElementDivisor import divide_into_finite_elements
+
+
+@pytest.fixture
+def setup_model():
+    # Cantilever column with a lateral point load at mid height
+    config.set_FEDivision(20)
+    PointsT = [
+    Node(Node_Number=1, xcoordinate=0, ycoordinate=0, Support_Condition="Fixed Support"),
+    Node(Node_Number=2, xcoordinate=0, ycoordinate=5, Support_Condition="Rigid Joint"),
+    ]
+    MembersT = [
+    Member(Beam_Number=1, Start_Node=PointsT[0], End_Node=PointsT[1], Area=0.016, Youngs_Modulus=200000000, Moment_of_Inertia=2.13333E-07),
+    ]
+    LoadsT = [
+    NeumanBC(type="PL", Magnitude=-10, Distance1= 2.5, AssignedTo="Member 1", Members = MembersT)
+    ]
+    PointsT, MembersT, LoadsT = divide_into_finite_elements(PointsT, MembersT, LoadsT, 10)
+    StaticDisplacement = FirstOrderGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT).DisplacementVector()
+    return DynamicGlobalResponse(Points = PointsT, Members = MembersT, Loads = LoadsT), StaticDisplacement
+
+
+def test_FreeVibration(setup_model):
+    DynamicResponseT, _ = setup_model
+    Modal = DynamicResponseT.ModalAnalysis(NumModes = 1)
+    Period = 1 / Modal["Frequency"][0]
+    Mode = Modal["EigenMode"][:, 0]
+
+    # undamped free vibration in the first mode is u = phi cos(omega t)
+    ResultT = DynamicResponseT.TimeHistory(Period / 400, 200, InitialDisplacement = Mode, DampingRatio = 0)
+    assert np.allclose(ResultT["Time"][-1], Period / 2), "Time axis is wrong."
+    assert np.allclose(ResultT["Displacement"][-1], -Mode, atol=1e-4 * np.abs(Mode).max()), "Free vibration after half a period is wrong."
+
+
+@pytest.mark.parametrize("Method, MassType", [("Newmark", "Consistent"), ("HHT", "Lumped")])
+def test_StepLoad(setup_model, Method, MassType):
+    DynamicResponseT, StaticDisplacement = setup_model
+    Period = 1 / DynamicResponseT.ModalAnalysis(NumModes = 1)["Frequency"][0]
+
+    # a suddenly applied load overshoots to about twice the static response and settles at the static one
+    ResultT = DynamicResponseT.TimeHistory(Period / 50, 2000, LoadHistory = np.ones(2001), DampingRatio = 0.05, Method = Method, MassType = MassType)
+    Peak = np.abs(ResultT["Displacement"]).max() / np.abs(StaticDisplacement).max()
+    assert 1.7 < Peak < 2.0, "Dynamic amplification of a step load is wrong."
+    assert np.allclose(ResultT["Displacement"][-1], StaticDisplacement, atol=1e-3 * np.abs(StaticDisplacement).max()), "Damped response does not settle at the static displacement."
+
+
+def test_StreamedOutput(setup_model, tmp_path, monkeypatch):
+    DynamicResponseT, _ = setup_model
+    ResultR = DynamicResponseT.TimeHistory(0.5, 250, LoadHistory = lambda t: np.sin(t) * np.array(DynamicResponseT.ForceVector()))
+
+    Factorizations = []
+    Factorize = Computer.Factorize
+    monkeypatch.setattr(Computer, "Factorize", lambda *args: Factorizations.append(args) or Factorize(*args))
+    FileName = DynamicResponseT.TimeHistory(0.5, 250, OutputFile = tmp_path / "History", ChunkSize = 100, MassType = "Lumped",
+                                            LoadHistory = lambda t: np.sin(t) * np.array(DynamicResponseT.ForceVector()))
+    assert len(Factorizations) == 1, "Effective stiffness has to be factorized once."
+
+    ResultT = DynamicGlobalResponse.ReadTimeHistory(FileName)
+    with np.load(FileName) as Data:
+        assert len(Data.files) == 4 * 3, "History was not written in chunks."
+    assert ResultT["Displacement"].shape == (251, len(DynamicResponseT.UnConstrainedDoF())), "Streamed history is incomplete."
+    assert np.allclose(ResultT["Time"], ResultR["Time"]), "Streamed time axis is wrong."
+    assert np.allclose(DynamicResponseT.ReadTimeHistory(FileName)["Displacement"], ResultT["Displacement"]), "ReadTimeHistory fails on an instance."